@@ -0,0 +1,140 @@
+"""
+Batched value iteration over many scenarios sharing one grid shape.
+"""
+import numpy as np
+from src.core.transition_kernel import DEFAULT_KERNEL
+from src.utils.config import DISCOUNT, EPSILON
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.display_manager import DisplayManager
+
+class BatchValueIteration:
+    """
+    Implementation of Value Iteration for a batch of B scenarios at once.
+
+    Rewards are stacked as a (B, num_cols, num_rows) tensor. Walls and
+    discount factors are either shared or given per scenario. Every sweep
+    updates all unfinished scenarios with one vectorized Bellman update.
+    Each scenario has its own convergence threshold and drops out of the
+    batch once its largest utility change falls below it. The result of
+    every scenario is the same as a numpy-backend ValueIteration run on it.
+    """
+
+    def __init__(self, rewards, walls, discounts=DISCOUNT, epsilon=EPSILON):
+        """
+        Initialize the Batch Value Iteration algorithm.
+
+        Args:
+            rewards (np.ndarray): Rewards of shape (B, num_cols, num_rows).
+            walls (np.ndarray): Wall mask of shape (num_cols, num_rows), shared
+                by all scenarios, or (B, num_cols, num_rows).
+            discounts (float or np.ndarray): Discount factor, shared or one per scenario.
+            epsilon (float): Maximum error allowed in the utility of any state.
+        """
+        rewards = np.asarray(rewards, dtype=np.float64)
+        if rewards.ndim != 3:
+            raise ValueError(f"Expected rewards of shape (B, num_cols, num_rows), got {rewards.shape}")
+
+        self.batch_size = rewards.shape[0]
+        self.rewards = rewards
+        self.walls = np.broadcast_to(np.asarray(walls, dtype=bool), rewards.shape).copy()
+        self.discounts = np.broadcast_to(np.asarray(discounts, dtype=np.float64), (self.batch_size,)).copy()
+        self.converge_thresholds = epsilon * ((1.0 - self.discounts) / self.discounts)
+        self.util_arr = None
+        self.policy_arr = None
+        self.iterations = np.zeros(self.batch_size, dtype=np.int64)
+        self.active_counts = []
+
+    @staticmethod
+    def stack_environments(grid_environments):
+        """
+        Stacks the rewards and walls of grid environments of the same shape.
+
+        The batched sweeps shift whole grids, so every environment must use
+        the default transition kernel.
+
+        Args:
+            grid_environments (list): Grid environments, e.g. built from different seeds.
+
+        Returns:
+            tuple: (rewards, walls) arrays of shape (B, num_cols, num_rows).
+        """
+        if any(env.kernel != DEFAULT_KERNEL for env in grid_environments):
+            raise ValueError("Batch Value Iteration only supports the default transition kernel")
+        rewards = np.stack([env.get_reward_array() for env in grid_environments])
+        walls = np.stack([env.get_wall_mask() for env in grid_environments])
+        return rewards, walls
+
+    def run(self):
+        """
+        Run the Batch Value Iteration algorithm.
+
+        Returns:
+            tuple: (util_arr, policy_arr) of shape (B, num_cols, num_rows).
+        """
+        # Initialize utility and policy arrays
+        util_arr = np.zeros(self.rewards.shape, dtype=np.float64)
+        policy_arr = np.full(self.rewards.shape, NO_ACTION, dtype=np.int8)
+
+        self.iterations = np.zeros(self.batch_size, dtype=np.int64)
+        self.active_counts = []
+
+        # Scenarios that have not converged yet
+        active = np.arange(self.batch_size)
+        rewards, walls = self.rewards, self.walls
+        discounts = self.discounts[:, np.newaxis, np.newaxis]
+        thresholds = self.converge_thresholds
+
+        # Main loop
+        while active.size > 0:
+            self.active_counts.append(active.size)
+
+            # Update every active scenario at once
+            curr_util_arr = util_arr[active]
+            new_util_arr, new_policy_arr = VectorizedUtilityManager.get_best_utilities(
+                curr_util_arr, rewards, walls, discounts
+            )
+
+            # Largest utility change of each scenario
+            changes = np.where(walls, float('-inf'), np.abs(new_util_arr - curr_util_arr))
+            deltas = changes.reshape(active.size, -1).max(axis=1)
+
+            self.iterations[active] += 1
+
+            # Converged scenarios keep the utilities the last sweep started from,
+            # like ValueIteration; the others take the update
+            running = deltas >= thresholds
+            util_arr[active[running]] = new_util_arr[running]
+            policy_arr[active[running]] = new_policy_arr[running]
+
+            # Drop converged scenarios from the batch
+            if not running.all():
+                active = active[running]
+                rewards, walls = rewards[running], walls[running]
+                discounts, thresholds = discounts[running], thresholds[running]
+
+        self.util_arr = util_arr
+        self.policy_arr = policy_arr
+        return util_arr, policy_arr
+
+    def get_utility_array(self, index):
+        """
+        Returns the result of one scenario as a UtilityGrid.
+
+        Args:
+            index (int): Index of the scenario in the batch.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        return VectorizedUtilityManager.to_utility_array(self.util_arr[index], self.policy_arr[index])
+
+    def display_results(self):
+        """
+        Display the results of the Batch Value Iteration algorithm.
+        """
+        sb = DisplayManager.frame_title("Batch Value Iteration")
+        sb += f"Scenarios\t\t:\t{self.batch_size}\n"
+        sb += f"Sweeps\t\t\t:\t{len(self.active_counts)}\n"
+        sb += f"Iterations per scenario\t:\t{self.iterations.min()} to {self.iterations.max()}"
+        sb += f" (mean {self.iterations.mean():.1f})\n"
+        print(sb)
@@ -0,0 +1,191 @@
+"""
+Discount-factor continuation solver implementation.
+"""
+import time
+import numpy as np
+from src.utils.config import EPSILON
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.display_manager import DisplayManager
+
+class DiscountContinuation:
+    """
+    Solves the grid for an increasing sequence of discount factors, starting
+    every solve from the solution of the previous discount.
+
+    Utilities grow roughly like R / (1 - discount), so the previous utilities
+    are rescaled by (1 - previous discount) / (1 - discount) before use as the
+    starting point. The environment's transition model is built once and
+    shared by every step. With the "policy" method the previous optimal
+    policy is the starting policy, and its transition matrix is reused while
+    the policy does not change. The LU factorization of I - discount * P_pi
+    depends on the discount itself and is redone at every step.
+    """
+
+    METHODS = ("value", "policy")
+
+    # Minimum utility gain for a policy change, as in PolicyIteration
+    IMPROVEMENT_TOLERANCE = 1e-9
+
+    def __init__(self, grid_environment, discounts, method="value", epsilon=EPSILON):
+        """
+        Initialize the Discount Continuation solver.
+
+        Args:
+            grid_environment: The grid environment.
+            discounts (list): Discount factors to solve, in increasing order.
+            method (str): "value" for warm-started Value Iteration, "policy"
+                for warm-started Policy Iteration with exact evaluation.
+            epsilon (float): Maximum error allowed in the utility of any
+                state (Value Iteration only).
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+        if list(discounts) != sorted(discounts):
+            raise ValueError("Discount factors must be in increasing order")
+
+        self.grid_environment = grid_environment
+        self.grid = grid_environment.get_grid()
+        self.discounts = list(discounts)
+        self.method = method
+        self.epsilon = epsilon
+        self.results = []
+
+    def run(self):
+        """
+        Run the Discount Continuation solver.
+
+        Returns:
+            list: One dict per discount factor with keys 'discount',
+                'iterations', 'policy_changes', 'elapsed_time', 'util_arr'
+                and 'policy_arr'.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+
+        util_arr = np.zeros(walls.shape, dtype=np.float64)
+        policy_arr = np.full(walls.shape, NO_ACTION, dtype=np.int8)
+        prev_discount = None
+        self.results = []
+
+        for discount in self.discounts:
+            # Rescale the previous solution to the scale of the new discount
+            if prev_discount is not None:
+                util_arr = util_arr * ((1.0 - prev_discount) / (1.0 - discount))
+
+            start_time = time.time()
+            if self.method == "value":
+                new_util_arr, new_policy_arr, iterations = self._solve_value(
+                    transition_model, util_arr, walls, discount
+                )
+            else:
+                new_util_arr, new_policy_arr, iterations = self._solve_policy(
+                    transition_model, policy_arr, walls, discount
+                )
+            elapsed_time = time.time() - start_time
+
+            policy_changes = 0
+            if prev_discount is not None:
+                policy_changes = int(np.count_nonzero(new_policy_arr != policy_arr))
+
+            self.results.append({
+                'discount': discount,
+                'iterations': iterations,
+                'policy_changes': policy_changes,
+                'elapsed_time': elapsed_time,
+                'util_arr': new_util_arr,
+                'policy_arr': new_policy_arr,
+            })
+
+            util_arr, policy_arr = new_util_arr, new_policy_arr
+            prev_discount = discount
+
+        return self.results
+
+    def _solve_value(self, transition_model, util_arr, walls, discount):
+        """
+        Runs Value Iteration from the given utilities until the largest change
+        is below the threshold of the discount.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            util_arr (np.ndarray): Starting utilities.
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (util_arr, policy_arr, iterations)
+        """
+        converge_threshold = self.epsilon * ((1.0 - discount) / discount)
+        iterations = 0
+        while True:
+            new_util_arr, policy_arr = transition_model.get_best_utilities(util_arr, discount)
+            delta = VectorizedUtilityManager.get_max_delta(new_util_arr, util_arr, walls)
+            util_arr = new_util_arr
+            iterations += 1
+
+            if delta < converge_threshold:
+                break
+
+        return util_arr, policy_arr, iterations
+
+    def _solve_policy(self, transition_model, policy_arr, walls, discount):
+        """
+        Runs Policy Iteration with exact evaluation from the given policy.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            policy_arr (np.ndarray): Starting policy (NO_ACTION everywhere on the first step).
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (util_arr, policy_arr, iterations)
+        """
+        # Start the first step from the greedy policy of zero utilities
+        if (policy_arr[~walls] == NO_ACTION).all():
+            _, policy_arr = transition_model.get_best_utilities(np.zeros(walls.shape), discount)
+
+        iterations = 0
+        while True:
+            util_arr = transition_model.evaluate_policy(policy_arr, discount)
+
+            # Policy improvement step
+            action_utils = transition_model.get_action_utilities(util_arr, discount)
+            best_policy_arr = np.argmax(action_utils, axis=0).astype(np.int8)
+            policy_util_arr = np.take_along_axis(
+                action_utils, np.maximum(policy_arr, 0)[np.newaxis].astype(np.intp), axis=0
+            )[0]
+
+            improved = (np.max(action_utils, axis=0) > policy_util_arr + self.IMPROVEMENT_TOLERANCE) & ~walls
+            policy_arr = np.where(improved, best_policy_arr, policy_arr)
+            iterations += 1
+
+            if not improved.any():
+                break
+
+        return util_arr, policy_arr, iterations
+
+    def get_utility_array(self, index):
+        """
+        Returns the result for one discount factor as a UtilityGrid.
+
+        Args:
+            index (int): Index of the discount factor.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        result = self.results[index]
+        return VectorizedUtilityManager.to_utility_array(
+            result['util_arr'], result['policy_arr'], self.grid_environment.get_actions()
+        )
+
+    def display_results(self):
+        """
+        Display the results of the Discount Continuation solver.
+        """
+        sb = DisplayManager.frame_title(f"Discount Continuation ({self.method})")
+        for result in self.results:
+            sb += (f"Discount {result['discount']:.4f}\t:\t{result['iterations']} iterations, "
+                   f"{result['policy_changes']} policy changes, {result['elapsed_time']:.4f}s\n")
+        print(sb)
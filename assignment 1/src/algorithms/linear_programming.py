@@ -0,0 +1,148 @@
+"""
+Linear programming solver implementation.
+"""
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from src.utils.config import DISCOUNT
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.display_manager import DisplayManager
+from src.utils.file_manager import FileManager
+from src.utils.utility_history import UtilityHistory
+
+class LinearProgramming:
+    """
+    Exact MDP solver based on the linear programming formulation.
+
+    The optimal utilities are the smallest utilities that satisfy
+    U(s) >= R(s) + discount * sum_s' P(s' | s, a) U(s') for every state and
+    action, so they solve
+
+        minimize    sum_s U(s)
+        subject to  (discount * P_a - I) U <= -R    for every action a
+
+    over the non-wall states. The constraint matrix is stacked from the
+    environment's sparse transition model and the program is solved with
+    SciPy's HiGHS backend. The optimal policy is greedy with respect to U*.
+    """
+
+    METHODS = ("highs", "highs-ds", "highs-ipm")
+
+    def __init__(self, grid_environment, method="highs"):
+        """
+        Initialize the Linear Programming solver.
+
+        Args:
+            grid_environment: The grid environment.
+            method (str): HiGHS method passed to scipy.optimize.linprog.
+                "highs" lets HiGHS choose, "highs-ds" is the dual simplex and
+                "highs-ipm" the interior point method (with crossover to an
+                exact vertex), which is usually faster on large grids.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+
+        self.grid_environment = grid_environment
+        self.method = method
+        self.grid = grid_environment.get_grid()
+        self.history = None
+        self.optimal_policy = None
+        self.iterations = 0
+        self.solve_time = 0.0
+
+    def build_program(self):
+        """
+        Builds the linear program over the non-wall states.
+
+        Returns:
+            tuple: (c, A_ub, b_ub, states), where states holds the flattened
+                index of the state behind each variable.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        states = np.flatnonzero(~transition_model.walls)
+        identity = sp.identity(len(states), format='csr')
+
+        # Moves into walls bounce back, so no probability flows into a wall state
+        A_ub = sp.vstack([
+            DISCOUNT * matrix[states][:, states] - identity
+            for matrix in transition_model.matrices
+        ], format='csr')
+        b_ub = -np.tile(transition_model.rewards[states], len(transition_model.matrices))
+        c = np.ones(len(states))
+
+        return c, A_ub, b_ub, states
+
+    def run(self):
+        """
+        Run the Linear Programming solver.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        c, A_ub, b_ub, states = self.build_program()
+
+        start_time = time.time()
+        result = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=(None, None), method=self.method)
+        self.solve_time = time.time() - start_time
+
+        if not result.success:
+            raise RuntimeError(f"Linear program did not solve: {result.message}")
+        self.iterations = result.nit
+
+        util_vec = np.zeros(walls.size, dtype=np.float64)
+        util_vec[states] = result.x
+        util_arr = util_vec.reshape(walls.shape)
+
+        # The optimal policy is greedy with respect to the optimal utilities
+        _, policy_arr = transition_model.get_best_utilities(util_arr)
+
+        self.history = UtilityHistory(walls.shape)
+        self.history.append(np.zeros(walls.shape), np.full(walls.shape, NO_ACTION, dtype=np.int8))
+        self.history.append(util_arr, policy_arr)
+        self.optimal_policy = VectorizedUtilityManager.to_utility_array(
+            util_arr, policy_arr, self.grid_environment.get_actions()
+        )
+        return self.optimal_policy
+
+    def get_max_error(self, util_arr):
+        """
+        Calculates the largest distance of a utility estimate from U*.
+
+        Args:
+            util_arr (UtilityGrid): Utilities as returned by the run method
+                of any solver on the same environment.
+
+        Returns:
+            float: The maximum absolute error over all non-wall states.
+        """
+        if self.optimal_policy is None:
+            self.run()
+
+        walls = self.grid_environment.get_wall_mask()
+        if walls.all():
+            return 0.0
+        return float(np.max(np.abs(util_arr.utilities - self.optimal_policy.utilities)[~walls]))
+
+    def display_results(self):
+        """
+        Display the results of the Linear Programming solver.
+        """
+        # Display solver statistics
+        sb = DisplayManager.frame_title("Linear Program")
+        num_states = sum(not state.is_wall for column in self.grid for state in column)
+        sb += f"Variables\t\t:\t{num_states}\n"
+        sb += f"Solver iterations\t:\t{self.iterations}\n"
+        sb += f"Solve time\t\t:\t{self.solve_time:.4f}s\n"
+        print(sb)
+
+        # Display utilities
+        DisplayManager.display_utilities(self.grid, self.optimal_policy)
+
+    def save_utilities(self):
+        """
+        Save utility estimates to CSV file.
+        """
+        FileManager.write_to_file(self.history, "linear_programming_utilities")
@@ -0,0 +1,271 @@
+"""
+Multigrid (coarse-to-fine) value iteration implementation.
+"""
+import time
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from src.core.transition_kernel import DEFAULT_KERNEL
+from src.core.transition_model import TransitionModel
+from src.utils.config import DISCOUNT, EPSILON
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.display_manager import DisplayManager
+from src.utils.file_manager import FileManager
+from src.utils.utility_history import UtilityHistory
+
+class MultigridValueIteration:
+    """
+    Implementation of coarse-to-fine (multigrid) Value Iteration.
+
+    The grid is repeatedly downsampled by 2 in each direction. A coarse cell
+    is a wall only if all of its fine cells are walls, and its reward is the
+    mean reward of its non-wall fine cells. Since one coarse move covers two
+    fine moves, a coarse level uses the discount squared and scales rewards by
+    (1 + discount), which keeps its utilities on the same scale as the fine
+    grid's. The coarsest level is solved from zero. Each finer level starts
+    from the prolonged utilities of the level below and runs until its own
+    residual meets the threshold, ending with the fine grid.
+
+    Each level runs correction cycles. A Bellman sweep smooths the utilities
+    and gives the greedy policy, then the error of the swept utilities is
+    corrected by loosely solving the linearized Bellman equation
+    (I - discount * P_pi) e = discount * P_pi (new - old) with BiCGSTAB.
+    This is a Newton step, so a level needs tens of sweeps instead of
+    hundreds. Spatial coarse-grid corrections do not work here: a greedy
+    policy has period-2 modes (eigenvalue -1 of P_pi) that a 2x2 aggregate
+    averages away, and those corrections diverge or stall. A correction that
+    takes a utility past max |R| / (1 - discount), which no policy can reach,
+    is dropped and the cycle keeps the plain sweep.
+    """
+
+    # Levels are not coarsened below this many columns or rows
+    MIN_COARSE_SIZE = 4
+
+    # Relative residual and iteration cap of the BiCGSTAB solve of each correction
+    CORRECTION_TOLERANCE = 0.01
+    CORRECTION_MAX_ITERATIONS = 20
+
+    def __init__(self, grid_environment, num_levels=None):
+        """
+        Initialize the Multigrid Value Iteration algorithm.
+
+        Args:
+            grid_environment: The grid environment.
+            num_levels (int): Number of levels including the fine grid
+                (defaults to coarsening down to MIN_COARSE_SIZE).
+        """
+        # Coarse levels are built for the default slip model
+        if grid_environment.kernel != DEFAULT_KERNEL:
+            raise ValueError("Multigrid Value Iteration only supports the default transition kernel")
+
+        self.grid_environment = grid_environment
+        self.grid = grid_environment.get_grid()
+        self.num_levels = num_levels
+        self.history = None
+        self.optimal_policy = None
+        self.iterations = 0
+        self.level_stats = []
+        self.converge_threshold = EPSILON * ((1.0 - DISCOUNT) / DISCOUNT)
+
+    @staticmethod
+    def restrict(rewards, walls):
+        """
+        Downsamples a level by 2 in each direction.
+
+        Args:
+            rewards (np.ndarray): Reward array of the fine level.
+            walls (np.ndarray): Wall mask of the fine level.
+
+        Returns:
+            tuple: (rewards, walls) of the coarse level.
+        """
+        num_cols, num_rows = walls.shape
+        pad = ((0, num_cols % 2), (0, num_rows % 2))
+
+        # Padding cells count as walls so they never contribute to a coarse cell
+        padded_walls = np.pad(walls, pad, constant_values=True)
+        padded_rewards = np.pad(np.where(walls, 0.0, rewards), pad)
+        shape = (padded_walls.shape[0] // 2, 2, padded_walls.shape[1] // 2, 2)
+
+        num_open = (~padded_walls).reshape(shape).sum(axis=(1, 3))
+        reward_sum = padded_rewards.reshape(shape).sum(axis=(1, 3))
+
+        coarse_walls = num_open == 0
+        coarse_rewards = np.where(coarse_walls, 0.0, reward_sum / np.maximum(num_open, 1))
+        return coarse_rewards, coarse_walls
+
+    @staticmethod
+    def prolong(coarse_util_arr, fine_walls):
+        """
+        Copies every coarse utility onto its 2x2 block of fine states.
+
+        Args:
+            coarse_util_arr (np.ndarray): Utilities of the coarse level.
+            fine_walls (np.ndarray): Wall mask of the fine level.
+
+        Returns:
+            np.ndarray: Utilities of the fine level.
+        """
+        fine_util_arr = np.repeat(np.repeat(coarse_util_arr, 2, axis=0), 2, axis=1)
+        fine_util_arr = fine_util_arr[:fine_walls.shape[0], :fine_walls.shape[1]]
+        return np.where(fine_walls, 0.0, fine_util_arr)
+
+    def build_levels(self):
+        """
+        Builds the level hierarchy from the fine grid down.
+
+        Returns:
+            list: (rewards, walls) of each level, finest first.
+        """
+        levels = [(self.grid_environment.get_reward_array(), self.grid_environment.get_wall_mask())]
+        while self.num_levels is None or len(levels) < self.num_levels:
+            rewards, walls = levels[-1]
+            if min(walls.shape) // 2 < self.MIN_COARSE_SIZE:
+                break
+            levels.append(self.restrict(rewards, walls))
+        return levels
+
+    def run(self):
+        """
+        Run the Multigrid Value Iteration algorithm.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        levels = self.build_levels()
+        self.level_stats = []
+        util_arr = None
+
+        # Solve from the coarsest level up to the fine grid
+        for level in reversed(range(len(levels))):
+            rewards, walls = levels[level]
+
+            # One coarse move stands for 2 ** level fine moves
+            steps = 2 ** level
+            discount = DISCOUNT ** steps
+            level_rewards = rewards * sum(DISCOUNT ** i for i in range(steps))
+            threshold = EPSILON * ((1.0 - discount) / discount)
+
+            if util_arr is None:
+                util_arr = np.zeros(walls.shape, dtype=np.float64)
+            else:
+                util_arr = self.prolong(util_arr, walls)
+
+            start_time = time.time()
+            util_arr, policy_arr, sweeps, krylov_iterations = self._solve_level(
+                util_arr, level_rewards, walls, discount, threshold, record=(level == 0)
+            )
+            elapsed_time = time.time() - start_time
+
+            self.level_stats.append({
+                'level': level,
+                'shape': walls.shape,
+                'sweeps': sweeps,
+                'krylov_iterations': krylov_iterations,
+                'time': elapsed_time,
+            })
+
+        self.iterations = self.level_stats[-1]['sweeps']
+        self.optimal_policy = self.history.get_utility_array(-1)
+        return self.optimal_policy
+
+    def _solve_level(self, util_arr, rewards, walls, discount, threshold, record):
+        """
+        Runs correction cycles on one level until the residual meets the threshold.
+
+        Args:
+            util_arr (np.ndarray): Starting utilities.
+            rewards (np.ndarray): Reward array of the level.
+            walls (np.ndarray): Wall mask of the level.
+            discount (float): Discount factor of the level.
+            threshold (float): Convergence threshold of the level.
+            record (bool): Whether to keep the utility history (fine level only).
+
+        Returns:
+            tuple: (util_arr, policy_arr, sweeps, krylov_iterations)
+        """
+        policy_arr = np.full(walls.shape, NO_ACTION, dtype=np.int8)
+        if record:
+            self.history = UtilityHistory(walls.shape)
+
+        transition_model = TransitionModel(rewards, walls)
+        identity = sp.identity(walls.size, format='csr')
+        util_bound = float(np.max(np.abs(rewards), initial=0.0)) / (1.0 - discount)
+
+        sweeps = 0
+        krylov_iterations = 0
+        while True:
+            if record:
+                self.history.append(util_arr, policy_arr)
+
+            new_util_arr, policy_arr = VectorizedUtilityManager.get_best_utilities(
+                util_arr, rewards, walls, discount
+            )
+            delta = VectorizedUtilityManager.get_max_delta(new_util_arr, util_arr, walls)
+            sweeps += 1
+
+            if delta < threshold:
+                util_arr = new_util_arr
+                break
+
+            # Newton correction of the swept utilities under the greedy policy
+            policy_matrix = transition_model.get_policy_matrix(policy_arr)
+            residual = discount * (policy_matrix @ (new_util_arr - util_arr).ravel())
+            correction, iterations = self._solve_correction(identity - discount * policy_matrix, residual)
+            krylov_iterations += iterations
+
+            util_arr = new_util_arr + correction.reshape(walls.shape)
+            if not np.abs(util_arr).max() <= util_bound:
+                util_arr = new_util_arr
+
+        return util_arr, policy_arr, sweeps, krylov_iterations
+
+    def _solve_correction(self, system, residual):
+        """
+        Loosely solves the linear correction equation of one cycle.
+
+        Wall rows of the system are the identity with a zero residual, so
+        walls get no correction.
+
+        Args:
+            system (scipy.sparse.csr_matrix): I - discount * P_pi.
+            residual (np.ndarray): Flattened right-hand side.
+
+        Returns:
+            tuple: (correction, iterations). An unconverged solve still
+                returns its best iterate; the next sweep checks it.
+        """
+        iterations = [0]
+
+        def count(_):
+            iterations[0] += 1
+
+        correction, _ = spla.bicgstab(
+            system, residual, rtol=self.CORRECTION_TOLERANCE, atol=0.0,
+            maxiter=self.CORRECTION_MAX_ITERATIONS, callback=count
+        )
+        return correction, iterations[0]
+
+    def display_results(self):
+        """
+        Display the results of the Multigrid Value Iteration algorithm.
+        """
+        # Display experiment setup
+        DisplayManager.display_experiment_setup(True, self.converge_threshold)
+
+        # Display per-level sweeps, corrections and timings
+        sb = DisplayManager.frame_title("Multigrid Levels")
+        for stats in self.level_stats:
+            num_cols, num_rows = stats['shape']
+            sb += (f"Level {stats['level']} ({num_cols}x{num_rows})\t:\t{stats['sweeps']} sweeps, "
+                   f"{stats['krylov_iterations']} BiCGSTAB iterations, {stats['time']:.4f}s\n")
+        print(sb)
+
+        # Display utilities
+        DisplayManager.display_utilities(self.grid, self.optimal_policy)
+
+    def save_utilities(self):
+        """
+        Save fine-level utility estimates to CSV file.
+        """
+        FileManager.write_to_file(self.history, "multigrid_value_iteration_utilities")
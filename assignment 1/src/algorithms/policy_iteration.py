@@ -2,10 +2,14 @@
 Policy iteration algorithm implementation.
 """
 import copy
-from src.core.actions import Action
-from src.core.utility import Utility
-from src.utils.config import NUM_COLS, NUM_ROWS
+import random
+import numpy as np
+from src.core.utility_grid import UtilityGrid
+from src.utils.config import DISCOUNT, EPSILON, K
 from src.utils.utility_manager import UtilityManager
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.numba_kernels import CompiledUtilityManager, HAS_NUMBA
+from src.utils.utility_history import UtilityHistory
 from src.utils.display_manager import DisplayManager
 from src.utils.file_manager import FileManager
 
@@ -14,76 +18,168 @@ class PolicyIteration:
     Implementation of the Policy Iteration algorithm.
     """
     
-    def __init__(self, grid_environment):
+    EVALUATIONS = ("iterative", "direct", "krylov", "adaptive")
+    
+    # Adaptive evaluation stops once the evaluation residual falls below
+    # this fraction of the improvement gap (the Bellman residual of the
+    # improvement step)
+    EVALUATION_GAP_FRACTION = 0.1
+    
+    # Minimum utility gain for a policy change when evaluation is exact,
+    # so solver round-off cannot make the policy flip between tied actions
+    IMPROVEMENT_TOLERANCE = 1e-9
+    
+    def __init__(self, grid_environment, evaluation="iterative", history_dtype=np.float64,
+                 retention="full", retention_size=1, retention_cells=None, history_path=None):
         """
         Initialize the Policy Iteration algorithm.
         
         Args:
             grid_environment: The grid environment.
+            evaluation (str): Policy evaluation method. "iterative" runs K
+                simplified Bellman updates per step, "direct" solves the
+                policy's linear system with a sparse LU solver, "krylov"
+                solves it with BiCGSTAB for very large grids and "adaptive"
+                (modified policy iteration) picks the number of simplified
+                Bellman updates per step from the Bellman residual and the
+                number of policy changes.
+            history_dtype: Dtype of the recorded utility history, np.float64
+                or np.float32 to halve its memory.
+            retention (str): Which iterations the utility history keeps,
+                one of UtilityHistory.RETENTIONS.
+            retention_size (int): Decimation interval ("every") or number of
+                iterations kept ("last").
+            retention_cells (list): (col, row) cells to keep ("cells").
+            history_path (str): Optional path prefix of .npy files the kept
+                iterations are streamed to instead of being held in memory.
         """
+        if evaluation not in self.EVALUATIONS:
+            raise ValueError(f"Unknown evaluation '{evaluation}', expected one of {self.EVALUATIONS}")
+        if retention not in UtilityHistory.RETENTIONS:
+            raise ValueError(f"Unknown retention '{retention}', expected one of {UtilityHistory.RETENTIONS}")
+        
         self.grid_environment = grid_environment
         self.grid = grid_environment.get_grid()
-        self.utility_list = []
+        self.evaluation = evaluation
+        self.history_dtype = history_dtype
+        self.retention = retention
+        self.retention_size = retention_size
+        self.retention_cells = retention_cells
+        self.history_path = history_path
+        self.history = None
+        self.optimal_policy = None
         self.iterations = 0
+        self.converge_threshold = EPSILON * ((1.0 - DISCOUNT) / DISCOUNT)
+        self.total_backups = 0
+        self.evaluation_depths = []
         
     def run(self):
         """
         Run the Policy Iteration algorithm.
+        
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        self.history = UtilityHistory(
+            self.grid_environment.get_wall_mask().shape, self.history_dtype,
+            retention=self.retention, size=self.retention_size, cells=self.retention_cells,
+            path=self.history_path
+        )
+        
+        if self.evaluation == "iterative":
+            self.optimal_policy = self._run_object()
+        elif self.evaluation == "adaptive":
+            self.optimal_policy = self._run_adaptive()
+        else:
+            self.optimal_policy = self._run_exact()
+        self.history.close()
+        return self.optimal_policy
+    
+    def _run_object(self):
+        """
+        Run Policy Iteration one cell at a time.
+        
+        The current and new utilities live in two preallocated UtilityGrids
+        that swap roles every step. Evaluation and improvement back states up
+        through the successor table of the environment and read and write the
+        grid arrays through flat views, with the intermediate evaluation
+        updates and the action utilities of every state in buffers that are
+        reused across steps, so the steps build no lists, arrays or Utility
+        objects.
+        
+        Unlike Value Iteration, this does not eliminate actions. The bounds
+        on the optimal utilities are wider than the largest gain of the
+        policy still to come divided by 1 - DISCOUNT, so they only exclude
+        actions once the policy has settled, and an improvement step costs
+        a single sweep next to the K of the evaluation.
         """
-        # Initialize utility arrays
-        curr_util_arr = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
-        new_util_arr = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
+        walls = self.grid_environment.get_wall_mask()
+        num_cols, num_rows = walls.shape
+        rewards = self.grid_environment.get_reward_array().ravel().tolist()
+        successor_table = self.grid_environment.get_successor_table()
+        successors = UtilityManager.get_state_successors(
+            successor_table, self.grid_environment.get_outcome_probabilities()
+        )
+        action_set = self.grid_environment.get_actions()
         
-        # Initialize default utilities and policies for each state
-        for col in range(NUM_COLS):
-            for row in range(NUM_ROWS):
-                new_util_arr[col][row] = Utility()
-                if not self.grid[col][row].is_wall:
-                    random_action = Action.get_random_action()
-                    new_util_arr[col][row].set_action(random_action)
+        # Non-wall states in sweep order
+        states = [col * num_rows + row for row in range(num_rows) for col in range(num_cols) if not walls[col, row]]
         
-        # Initialize the utility list
-        self.utility_list = []
+        # Initialize utility arrays with default utilities and a random policy
+        curr_util_arr = UtilityGrid(shape=walls.shape, action_set=action_set)
+        new_util_arr = UtilityGrid(
+            actions=self._get_random_policy(walls, len(action_set)), shape=walls.shape, action_set=action_set
+        )
+        
+        # Action indices of the kernel and the utilities of every state's actions in the current step
+        actions = list(range(len(successor_table)))
+        action_utilities = [[0.0] * len(actions) for _ in range(walls.size)]
+        
+        # Flat views the steps read and write the grids through, with buffers for the policy evaluation
+        curr_values, curr_policy = UtilityManager.get_flat_views(curr_util_arr)
+        new_values, new_policy = UtilityManager.get_flat_views(new_util_arr)
+        scratch_values = ([0.0] * walls.size, [0.0] * walls.size)
+        policy_outcomes = [None] * len(states)
         
         # Flag to check if the current policy is already optimal
         unchanged = True
         
         # Main loop
         while True:
-            # Update current utilities with new utilities
-            UtilityManager.update_utilities(new_util_arr, curr_util_arr)
+            # Swap buffers: the utilities of the last step become the current ones
+            curr_util_arr, new_util_arr = new_util_arr, curr_util_arr
+            curr_values, new_values = new_values, curr_values
+            curr_policy, new_policy = new_policy, curr_policy
             
-            # Make a copy of current utilities for tracking
-            curr_util_arr_copy = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
-            UtilityManager.update_utilities(curr_util_arr, curr_util_arr_copy)
-            self.utility_list.append(curr_util_arr_copy)
+            # Record the current utilities for tracking
+            self.history.append(curr_util_arr.utilities, curr_util_arr.actions)
             
             # Policy estimation based on the current actions and utilities
-            new_util_arr = UtilityManager.estimate_next_utilities(curr_util_arr, self.grid)
+            UtilityManager.estimate_next_utilities(
+                curr_values, curr_policy, rewards, successors, states, new_values, scratch_values, policy_outcomes
+            )
             
             # Reset unchanged flag
             unchanged = True
             
             # Policy improvement step
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    # Skip walls
-                    if not self.grid[col][row].is_wall:
-                        # Calculate best action and utility
-                        best_action_util = UtilityManager.get_best_utility(
-                            col, row, new_util_arr, self.grid
-                        )
-                        
-                        # Get current policy action and utility
-                        policy_action = new_util_arr[col][row].get_action()
-                        policy_action_util = UtilityManager.get_fixed_utility(
-                            policy_action, col, row, new_util_arr, self.grid
-                        )
-                        
-                        # Update policy if better action is found
-                        if best_action_util.get_util() > policy_action_util.get_util():
-                            new_util_arr[col][row].set_action(best_action_util.get_action())
-                            unchanged = False
+            for state in states:
+                # Calculate best action and utility
+                utilities = UtilityManager.get_action_utilities(
+                    state, new_values, rewards, successors, actions, action_utilities[state]
+                )
+                best = UtilityManager.get_best_index(utilities)
+                
+                # Get current policy action utility
+                policy_action = curr_policy[state]
+                policy_action_util = utilities[policy_action]
+                
+                # Update policy if better action is found
+                if utilities[best] > policy_action_util:
+                    new_policy[state] = best
+                    unchanged = False
+                else:
+                    new_policy[state] = policy_action
             
             self.iterations += 1
             
@@ -91,20 +187,169 @@ class PolicyIteration:
             if unchanged:
                 break
         
-        return self.utility_list[-1]  # Return the optimal policy
+        return curr_util_arr.copy()  # Return the optimal policy
+    
+    @staticmethod
+    def _get_random_policy(walls, num_actions):
+        """
+        Draws a random action for every non-wall state, in the same order as _run_object.
+        
+        Args:
+            walls (np.ndarray): Wall mask.
+            num_actions (int): Number of actions of the transition kernel.
+            
+        Returns:
+            np.ndarray: Policy array of action indices.
+        """
+        policy_arr = np.full(walls.shape, NO_ACTION, dtype=np.int8)
+        for col in range(walls.shape[0]):
+            for row in range(walls.shape[1]):
+                if not walls[col][row]:
+                    # Same draws as Action.get_random_action for the default kernel
+                    policy_arr[col][row] = random.randrange(num_actions)
+        return policy_arr
+    
+    def _run_exact(self):
+        """
+        Run Policy Iteration with exact policy evaluation on the sparse transition model.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        
+        # Initialize default utilities and a random policy
+        util_arr = np.zeros(walls.shape, dtype=np.float64)
+        policy_arr = self._get_random_policy(walls, len(self.grid_environment.get_actions()))
+        
+        # Initialize the utility history
+        self.history.append(util_arr, policy_arr)
+        
+        # Main loop
+        while True:
+            # Policy evaluation: exact utilities of the current policy
+            util_arr = transition_model.evaluate_policy(
+                policy_arr, method=self.evaluation, initial_util_arr=util_arr
+            )
+            
+            # Policy improvement step
+            action_utils = transition_model.get_action_utilities(util_arr)
+            best_policy_arr = np.argmax(action_utils, axis=0).astype(np.int8)
+            best_util_arr = np.max(action_utils, axis=0)
+            policy_util_arr = np.take_along_axis(
+                action_utils, np.maximum(policy_arr, 0)[np.newaxis].astype(np.intp), axis=0
+            )[0]
+            
+            improved = (best_util_arr > policy_util_arr + self.IMPROVEMENT_TOLERANCE) & ~walls
+            policy_arr = np.where(improved, best_policy_arr, policy_arr)
+            
+            self.iterations += 1
+            
+            # Keep the evaluated utilities and improved policy for tracking
+            self.history.append(util_arr, policy_arr)
+            
+            # Check if policy is optimal; the last entry then holds its exact utilities
+            if not improved.any():
+                break
+        
+        return VectorizedUtilityManager.to_utility_array(util_arr, policy_arr, self.grid_environment.get_actions())
+    
+    def _run_adaptive(self):
+        """
+        Run modified Policy Iteration with an adaptive evaluation depth.
+        
+        Each outer iteration is one full Bellman update (policy improvement)
+        followed by simplified Bellman updates of the new policy. The depth
+        limit shrinks with the fraction of states whose action changed, since
+        evaluating a policy that is still changing a lot is wasted work, and
+        evaluation stops early once its residual is below
+        EVALUATION_GAP_FRACTION times the improvement gap. The algorithm stops
+        on the same Bellman residual threshold as Value Iteration. Both steps
+        run as compiled loops when Numba is installed.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        rewards = np.where(walls, 0.0, self.grid_environment.get_reward_array())
+        num_states = int(np.count_nonzero(~walls))
+        
+        # Initialize default utilities and a random policy
+        util_arr = np.zeros(walls.shape, dtype=np.float64)
+        policy_arr = self._get_random_policy(walls, len(self.grid_environment.get_actions()))
+        
+        # Initialize the utility history and counters
+        self.history.append(util_arr, policy_arr)
+        self.total_backups = 0
+        self.evaluation_depths = []
+        
+        # Main loop
+        while True:
+            # Policy improvement step: one full Bellman update
+            if HAS_NUMBA:
+                best_util_arr, policy_arr, num_changes = CompiledUtilityManager.improve_policy(
+                    transition_model, util_arr, policy_arr
+                )
+            else:
+                action_utils = transition_model.get_action_utilities(util_arr)
+                best_policy_arr = np.argmax(action_utils, axis=0).astype(np.int8)
+                best_util_arr = np.where(walls, 0.0, np.max(action_utils, axis=0))
+                policy_util_arr = np.take_along_axis(
+                    action_utils, np.maximum(policy_arr, 0)[np.newaxis].astype(np.intp), axis=0
+                )[0]
+                
+                improved = (best_util_arr > policy_util_arr) & ~walls
+                policy_arr = np.where(improved, best_policy_arr, policy_arr)
+                num_changes = int(np.count_nonzero(improved))
+            
+            # Improvement gap (Bellman residual of the current utilities)
+            gap = VectorizedUtilityManager.get_max_delta(best_util_arr, util_arr, walls)
+            util_arr = best_util_arr
+            self.total_backups += num_states
+            self.iterations += 1
+            
+            # Check convergence
+            if gap < self.converge_threshold:
+                self.evaluation_depths.append(0)
+                self.history.append(util_arr, policy_arr)
+                break
+            
+            # Policy evaluation: simplified Bellman updates of the new policy
+            depth_limit = max(1, int(round(K * (1.0 - num_changes / max(num_states, 1)))))
+            if HAS_NUMBA:
+                util_arr, depth = CompiledUtilityManager.evaluate_policy(
+                    transition_model, util_arr, policy_arr, depth_limit, self.EVALUATION_GAP_FRACTION * gap
+                )
+            else:
+                policy_matrix = transition_model.get_policy_matrix(policy_arr)
+                depth = 0
+                while depth < depth_limit:
+                    new_util_arr = rewards + DISCOUNT * (policy_matrix @ util_arr.ravel()).reshape(walls.shape)
+                    residual = VectorizedUtilityManager.get_max_delta(new_util_arr, util_arr, walls)
+                    util_arr = new_util_arr
+                    depth += 1
+                    if residual < self.EVALUATION_GAP_FRACTION * gap:
+                        break
+            
+            self.total_backups += depth * num_states
+            self.evaluation_depths.append(depth)
+            
+            # Keep the current utilities and policy for tracking
+            self.history.append(util_arr, policy_arr)
+        
+        return VectorizedUtilityManager.to_utility_array(util_arr, policy_arr, self.grid_environment.get_actions())
     
     def display_results(self):
         """
         Display the results of the Policy Iteration algorithm.
         """
         # Get the optimal policy
-        optimal_policy = self.utility_list[-1]
+        optimal_policy = self.optimal_policy
         
         # Display experiment setup
         DisplayManager.display_experiment_setup(False)
         
         # Display iterations count
         DisplayManager.display_iterations_count(self.iterations)
+        if self.evaluation == "adaptive":
+            print(f"Total state backups: {self.total_backups}")
+        DisplayManager.display_history_usage(self.history)
         
         # Display utilities
         DisplayManager.display_utilities(self.grid, optimal_policy)
@@ -113,4 +358,4 @@ class PolicyIteration:
         """
         Save utility estimates to CSV file.
         """
-        FileManager.write_to_file(self.utility_list, "policy_iteration_utilities")
\ No newline at end of file
+        FileManager.write_to_file(self.history, "policy_iteration_utilities")
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+Prioritized sweeping value iteration implementation.
+"""
+import heapq
+import numpy as np
+from src.utils.config import DISCOUNT, EPSILON
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.numba_kernels import CompiledUtilityManager, HAS_NUMBA
+from src.utils.display_manager import DisplayManager
+from src.utils.file_manager import FileManager
+from src.utils.utility_history import UtilityHistory
+
+class PrioritizedSweeping:
+    """
+    Implementation of Value Iteration with prioritized sweeping.
+
+    Instead of backing up every state on every sweep, states are kept in a
+    max-heap keyed by their Bellman residual |max_a Q(s, a) - U(s)|. The state
+    with the largest residual is backed up first.
+
+    The expected next-state utility sum_s' P(s' | s, a) U(s') of every state
+    and action is kept up to date: when a backup changes U(state), the rows
+    that depend on it (found through the column layout of the transition
+    model) move by P(state | s, a) * change. Each predecessor's residual is
+    then recomputed exactly from its expected utilities in O(num_actions),
+    and it is pushed if the residual reaches the Value Iteration convergence
+    threshold. Priorities are therefore the true residuals, and the sweep
+    ends once no residual reaches the threshold.
+    """
+
+    def __init__(self, grid_environment):
+        """
+        Initialize the Prioritized Sweeping algorithm.
+
+        Args:
+            grid_environment: The grid environment.
+        """
+        self.grid_environment = grid_environment
+        self.grid = grid_environment.get_grid()
+        self.history = None
+        self.optimal_policy = None
+        self.backups = 0
+        self.touched_cells = 0
+        self.converge_threshold = EPSILON * ((1.0 - DISCOUNT) / DISCOUNT)
+
+    def run(self):
+        """
+        Run the Prioritized Sweeping algorithm.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        self._load_model(transition_model)
+
+        self.util = [0.0] * self.num_states
+        self.policy = [NO_ACTION] * self.num_states
+        self.expected = [0.0] * (self.num_actions * self.num_states)
+        self.backups = 0
+
+        # Initial residuals of every state in one vectorized sweep
+        best_util_arr, _ = transition_model.get_best_utilities(np.zeros(walls.shape))
+        residuals = np.abs(best_util_arr).ravel()
+        residuals[transition_model.walls] = 0.0
+        self.backups += int(np.count_nonzero(~walls))
+
+        self._sweep_residuals(transition_model, residuals)
+        self.touched_cells = int(np.count_nonzero(~walls))
+        return self._finish(transition_model, walls)
+
+    def repair(self, edits):
+        """
+        Applies cell edits to the solved environment and repairs the solution.
+
+        Only the Bellman updates of the edited cells and of the cells that
+        could move into them before or after the edit change, so those are
+        the only states whose expected utilities and residual are recomputed.
+        Every other state keeps the residual from the previous solve, which
+        is already below the threshold. Prioritized sweeping then propagates the changes
+        outward, and the repaired solution meets the same convergence
+        criterion as a cold solve.
+
+        Args:
+            edits (list): (col, row, reward, is_wall) tuples, as taken by
+                GridEnvironment.apply_edits.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        if self.optimal_policy is None:
+            raise RuntimeError("Run the solver before repairing it")
+
+        # Predecessors of the edited cells before the edit
+        num_rows = self.grid_environment.num_rows
+        cells = [col * num_rows + row for col, row, _, _ in edits]
+        seeds = set(cells)
+        for cell in cells:
+            seeds.update(self.pred_indices[self.pred_indptr[cell]:self.pred_indptr[cell + 1]])
+
+        self.grid_environment.apply_edits(edits)
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        self._load_model(transition_model)
+
+        # Predecessors of the edited cells after the edit
+        for cell in cells:
+            seeds.update(self.pred_indices[self.pred_indptr[cell]:self.pred_indptr[cell + 1]])
+
+        residuals = np.array(self.priority)
+        for cell in cells:
+            if self.is_wall[cell]:
+                self.util[cell] = 0.0
+                self.policy[cell] = NO_ACTION
+                residuals[cell] = 0.0
+
+        # Expected utilities and residuals of the states whose Bellman update changed
+        for state in seeds:
+            self._set_expected(state)
+        for state in seeds:
+            if not self.is_wall[state]:
+                best_util, _ = self._get_best_utility(state)
+                residuals[state] = abs(best_util - self.util[state])
+
+        util_before = np.array(self.util)
+        self.backups = len(seeds)
+        self._sweep_residuals(transition_model, residuals)
+        self.touched_cells = int(np.count_nonzero(np.array(self.util) != util_before))
+
+        return self._finish(transition_model, walls)
+
+    def _load_model(self, transition_model):
+        """
+        Copies the transition model into plain Python lists.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+        """
+        # Plain Python lists are much faster than NumPy for single-state updates
+        self.num_states = transition_model.num_states
+        self.num_actions = transition_model.num_actions
+        self.rewards = transition_model.rewards.tolist()
+        self.is_wall = transition_model.walls.tolist()
+        self.indptr = transition_model.stacked_matrix.indptr.tolist()
+        self.indices = transition_model.stacked_matrix.indices.tolist()
+        self.data = transition_model.stacked_matrix.data.tolist()
+        col_indptr, col_indices, col_data = transition_model.get_dependent_index()
+        self.col_indptr = col_indptr.tolist()
+        self.col_indices = col_indices.tolist()
+        self.col_data = col_data.tolist()
+        pred_indptr, pred_indices, _ = transition_model.get_predecessor_index()
+        self.pred_indptr = pred_indptr.tolist()
+        self.pred_indices = pred_indices.tolist()
+
+    def _sweep_residuals(self, transition_model, residuals):
+        """
+        Runs prioritized sweeping from the current utilities and residuals.
+
+        Uses the compiled kernel when Numba is installed. Afterwards
+        self.priority holds the residual of every state, all below the threshold.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            residuals (np.ndarray): Flattened residuals of every state.
+        """
+        if HAS_NUMBA:
+            util_vec = np.array(self.util, dtype=np.float64)
+            policy_vec = np.array(self.policy, dtype=np.int8)
+            expected_vec = np.array(self.expected, dtype=np.float64)
+            self.backups += CompiledUtilityManager.sweep_by_priority(
+                transition_model, util_vec, policy_vec, residuals, expected_vec, self.converge_threshold
+            )
+            self.util = util_vec.tolist()
+            self.policy = policy_vec.tolist()
+            self.expected = expected_vec.tolist()
+            self.priority = residuals.tolist()
+        else:
+            self.priority = residuals.tolist()
+            self.heap = [(-residual, state) for state, residual in enumerate(self.priority)
+                         if residual >= self.converge_threshold]
+            heapq.heapify(self.heap)
+
+            self._sweep()
+
+    def _finish(self, transition_model, walls):
+        """
+        Applies a final Bellman update and records the result.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            walls (np.ndarray): Wall mask.
+
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
+        """
+        # Final Bellman update, so the returned utilities carry the same
+        # error bound as Value Iteration's
+        util_arr = np.array(self.util).reshape(walls.shape)
+        policy_arr = np.array(self.policy, dtype=np.int8).reshape(walls.shape)
+        self.history = UtilityHistory(walls.shape)
+        self.history.append(np.zeros(walls.shape), np.full(walls.shape, NO_ACTION, dtype=np.int8))
+        self.history.append(util_arr, policy_arr)
+        best_util_arr, best_policy_arr = transition_model.get_best_utilities(util_arr)
+        self.history.append(best_util_arr, best_policy_arr)
+        self.backups += int(np.count_nonzero(~walls))
+
+        self.optimal_policy = VectorizedUtilityManager.to_utility_array(
+            best_util_arr, best_policy_arr, self.grid_environment.get_actions()
+        )
+        return self.optimal_policy
+
+    def _sweep(self):
+        """
+        Back up states in order of priority until every residual is below the threshold.
+        """
+        heap = self.heap
+        priority = self.priority
+        util = self.util
+        expected = self.expected
+
+        while heap:
+            neg_residual, state = heapq.heappop(heap)
+
+            # Skip entries whose priority has been updated since they were pushed
+            if -neg_residual != priority[state]:
+                continue
+
+            # Back up the state with the largest residual
+            best_util, self.policy[state] = self._get_best_utility(state)
+            change = best_util - util[state]
+            util[state] = best_util
+            priority[state] = 0.0
+            self.backups += 1
+
+            # Move the expected utilities that depend on the state
+            for k in range(self.col_indptr[state], self.col_indptr[state + 1]):
+                expected[self.col_indices[k]] += self.col_data[k] * change
+
+            # Recompute the residuals of the states that can move into it
+            for k in range(self.pred_indptr[state], self.pred_indptr[state + 1]):
+                pred = self.pred_indices[k]
+                if self.is_wall[pred]:
+                    continue
+
+                pred_util, _ = self._get_best_utility(pred)
+                priority[pred] = abs(pred_util - util[pred])
+                if priority[pred] >= self.converge_threshold:
+                    heapq.heappush(heap, (-priority[pred], pred))
+
+    def _set_expected(self, state):
+        """
+        Recomputes the expected next-state utilities of every action of one state.
+
+        Args:
+            state (int): Flattened index of the state.
+        """
+        for action in range(self.num_actions):
+            row = action * self.num_states + state
+            expected = 0.0
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                expected += self.data[k] * self.util[self.indices[k]]
+            self.expected[row] = expected
+
+    def _get_best_utility(self, state):
+        """
+        Calculates the maximum utility and the corresponding action of one state.
+
+        Args:
+            state (int): Flattened index of the state.
+
+        Returns:
+            tuple: (utility, action index)
+        """
+        best_util = float('-inf')
+        best_action = NO_ACTION
+
+        for action in range(self.num_actions):
+            action_util = self.rewards[state] + DISCOUNT * self.expected[action * self.num_states + state]
+            if action_util > best_util:
+                best_util = action_util
+                best_action = action
+
+        return best_util, best_action
+
+    def display_results(self):
+        """
+        Display the results of the Prioritized Sweeping algorithm.
+        """
+        # Display experiment setup
+        DisplayManager.display_experiment_setup(True, self.converge_threshold)
+
+        # Display work done against a full sweep
+        num_states = sum(not state.is_wall for column in self.grid for state in column)
+        sb = DisplayManager.frame_title("Total Backup Count")
+        sb += f"State backups\t\t:\t{self.backups}\n"
+        sb += f"Equivalent sweeps\t:\t{self.backups / num_states:.1f}\n"
+        sb += f"Touched cells\t\t:\t{self.touched_cells}\n"
+        print(sb)
+
+        # Display utilities
+        DisplayManager.display_utilities(self.grid, self.optimal_policy)
+
+    def save_utilities(self):
+        """
+        Save utility estimates to CSV file.
+        """
+        FileManager.write_to_file(self.history, "prioritized_sweeping_utilities")
@@ -2,9 +2,17 @@
 Value iteration algorithm implementation.
 """
 import copy
-from src.core.utility import Utility
-from src.utils.config import NUM_COLS, NUM_ROWS, DISCOUNT, EPSILON
+import time
+import warnings
+import numpy as np
+from src.core.transition_kernel import DEFAULT_KERNEL
+from src.core.utility_grid import UtilityGrid
+from src.utils.config import DISCOUNT, EPSILON
 from src.utils.utility_manager import UtilityManager
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager, NO_ACTION
+from src.utils.parallel_sweeper import ParallelSweeper
+from src.utils.numba_kernels import CompiledUtilityManager, HAS_NUMBA
+from src.utils.utility_history import UtilityHistory
 from src.utils.display_manager import DisplayManager
 from src.utils.file_manager import FileManager
 
@@ -13,72 +21,524 @@ class ValueIteration:
     Implementation of the Value Iteration algorithm.
     """
     
-    def __init__(self, grid_environment):
+    BACKENDS = ("object", "numpy", "sparse", "parallel", "numba")
+    ORDERINGS = ("jacobi", "gauss_seidel", "red_black")
+    STOPPINGS = ("delta", "span")
+    
+    def __init__(self, grid_environment, backend="object", ordering="jacobi", num_workers=None,
+                 action_elimination=False, stopping="delta", epsilons=None, history_dtype=np.float64,
+                 retention="full", retention_size=1, retention_cells=None, history_path=None):
         """
         Initialize the Value Iteration algorithm.
         
         Args:
             grid_environment: The grid environment.
+            backend (str): "object" for the per-cell implementation,
+                "numpy" for whole-grid sweeps gathered through the successor
+                table, "sparse" for
+                mat-vecs with the environment's cached transition model,
+                "parallel" for numpy sweeps split into column tiles, one
+                worker process per tile, over shared memory, "numba" for
+                compiled loops over the sparse transition model (falls
+                back to "numpy" when Numba is not installed). Every backend
+                but "parallel" follows the environment's transition kernel.
+            ordering (str): Order of the state updates within a sweep.
+                "jacobi" computes every update from the previous sweep,
+                "gauss_seidel" updates states in place so later states use
+                fresh values (object backend only) and "red_black" updates
+                the checkerboard's red states first and then the black
+                states from the fresh red values (object, numpy and sparse
+                backends, with kernels whose moves all change the colour).
+            num_workers (int): Number of worker processes for the parallel
+                backend (defaults to the CPU count).
+            action_elimination (bool): Whether to bound the optimal utilities
+                after every sweep and permanently drop provably suboptimal
+                actions (object backend with Jacobi ordering only).
+            stopping (str): Stopping rule. "delta" stops once the largest
+                utility change is below the threshold. "span" (Jacobi
+                ordering only) stops once the span of the utility changes
+                is below it. The greedy policy is then provably
+                EPSILON-optimal, lower_bounds and upper_bounds hold the
+                MacQueen bounds on the optimal utilities, the returned
+                utilities are the midpoint of the bounds and raw_utilities
+                holds the last Bellman update.
+            epsilons (list): Optional maximum errors to sweep in one run
+                ("delta" stopping only). The run continues to the tightest
+                threshold and snapshots the result at the first sweep that
+                meets each threshold, which is where a separate run with
+                that epsilon would stop.
+            history_dtype: Dtype of the recorded utility history, np.float64
+                or np.float32 to halve its memory. The returned optimal
+                policy keeps full precision either way.
+            retention (str): Which iterations the utility history keeps,
+                one of UtilityHistory.RETENTIONS.
+            retention_size (int): Decimation interval ("every") or number of
+                iterations kept ("last").
+            retention_cells (list): (col, row) cells to keep ("cells").
+            history_path (str): Optional path prefix of .npy files the kept
+                iterations are streamed to instead of being held in memory.
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if ordering not in self.ORDERINGS:
+            raise ValueError(f"Unknown ordering '{ordering}', expected one of {self.ORDERINGS}")
+        if ordering == "gauss_seidel" and backend != "object":
+            raise ValueError("Gauss-Seidel ordering is sequential and needs the object backend")
+        if backend in ("parallel", "numba") and ordering != "jacobi":
+            raise ValueError(f"The {backend} backend only supports Jacobi ordering")
+        if action_elimination and (backend != "object" or ordering != "jacobi"):
+            raise ValueError("Action elimination needs the object backend with Jacobi ordering")
+        if stopping not in self.STOPPINGS:
+            raise ValueError(f"Unknown stopping rule '{stopping}', expected one of {self.STOPPINGS}")
+        if stopping == "span" and ordering != "jacobi":
+            raise ValueError("The span stopping rule needs Jacobi ordering")
+        if epsilons is not None and stopping != "delta":
+            raise ValueError("Epsilon sweeps need the delta stopping rule")
+        if retention not in UtilityHistory.RETENTIONS:
+            raise ValueError(f"Unknown retention '{retention}', expected one of {UtilityHistory.RETENTIONS}")
+        if ordering == "red_black" and not grid_environment.kernel.is_checkerboard():
+            raise ValueError("Red-black ordering needs a kernel whose moves all change the checkerboard colour")
+        if backend == "parallel" and grid_environment.kernel != DEFAULT_KERNEL:
+            raise ValueError("The parallel backend only supports the default transition kernel")
+        
+        if backend == "numba" and not HAS_NUMBA:
+            warnings.warn("Numba is not installed, falling back to the numpy backend", RuntimeWarning, stacklevel=2)
+            backend = "numpy"
+        
         self.grid_environment = grid_environment
         self.grid = grid_environment.get_grid()
-        self.utility_list = []
+        self.backend = backend
+        self.ordering = ordering
+        self.num_workers = num_workers
+        self.action_elimination = action_elimination
+        self.stopping = stopping
+        self.active_action_counts = []
+        self.lower_bounds = None
+        self.upper_bounds = None
+        self.raw_utilities = None
+        self.history_dtype = history_dtype
+        self.retention = retention
+        self.retention_size = retention_size
+        self.retention_cells = retention_cells
+        self.history_path = history_path
+        self.history = None
+        self.optimal_policy = None
         self.iterations = 0
         self.converge_threshold = EPSILON * ((1.0 - DISCOUNT) / DISCOUNT)
         # self.converge_threshold = EPSILON * ((1.0 - DISCOUNT) / DISCOUNT) / (NUM_ROWS * NUM_COLS)
         
+        # Epsilon sweep: run to the tightest threshold, snapshotting each one on the way
+        self.epsilons = None if epsilons is None else sorted(epsilons, reverse=True)
+        self.epsilon_snapshots = []
+        self.start_time = None
+        if self.epsilons:
+            self.converge_threshold = self.epsilons[-1] * ((1.0 - DISCOUNT) / DISCOUNT)
+        
     def run(self):
         """
         Run the Value Iteration algorithm.
+        
+        Returns:
+            UtilityGrid: The utilities and optimal policy.
         """
+        self.epsilon_snapshots = []
+        self.raw_utilities = None
+        self.start_time = time.time()
+        self.history = UtilityHistory(
+            self.grid_environment.get_wall_mask().shape, self.history_dtype,
+            retention=self.retention, size=self.retention_size, cells=self.retention_cells,
+            path=self.history_path
+        )
+        
+        if self.backend == "numpy" and self.ordering == "red_black":
+            self.optimal_policy = self._run_red_black_numpy()
+        elif self.backend == "numpy":
+            rewards = self.grid_environment.get_reward_array()
+            walls = self.grid_environment.get_wall_mask()
+            successors = self.grid_environment.get_successor_table().astype(np.intp)
+            probabilities = self.grid_environment.get_outcome_probabilities()
+            self.optimal_policy = self._run_arrays(
+                lambda util_arr: VectorizedUtilityManager.get_best_utilities(
+                    util_arr, rewards, walls, successors=successors, probabilities=probabilities
+                ),
+                walls
+            )
+        elif self.backend == "parallel":
+            self.optimal_policy = self._run_parallel()
+        elif self.backend == "numba":
+            transition_model = self.grid_environment.get_transition_model()
+            self.optimal_policy = self._run_arrays(
+                lambda util_arr: CompiledUtilityManager.get_best_utilities(transition_model, util_arr),
+                self.grid_environment.get_wall_mask()
+            )
+        elif self.backend == "sparse" and self.ordering == "red_black":
+            self.optimal_policy = self._run_red_black_sparse()
+        elif self.backend == "sparse":
+            transition_model = self.grid_environment.get_transition_model()
+            self.optimal_policy = self._run_arrays(
+                transition_model.get_best_utilities,
+                self.grid_environment.get_wall_mask()
+            )
+        else:
+            self.optimal_policy = self._run_object()
+        self.history.close()
+        return self.optimal_policy
+    
+    def _run_object(self):
+        """
+        Run Value Iteration one cell at a time.
+        
+        The current and new utilities live in two preallocated UtilityGrids
+        that swap roles every sweep. Each sweep backs every state up through
+        the successor table of the environment and reads and writes the grid
+        arrays through flat views, with the action utilities of every state
+        in a list of its own that is reused across sweeps, so the sweeps
+        build no lists, arrays or Utility objects.
+        """
+        walls = self.grid_environment.get_wall_mask()
+        num_cols, num_rows = walls.shape
+        rewards = self.grid_environment.get_reward_array().ravel().tolist()
+        successor_table = self.grid_environment.get_successor_table()
+        successors = UtilityManager.get_state_successors(
+            successor_table, self.grid_environment.get_outcome_probabilities()
+        )
+        action_set = self.grid_environment.get_actions()
+        
         # Initialize utility arrays
-        curr_util_arr = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
-        new_util_arr = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
+        curr_util_arr = UtilityGrid(shape=walls.shape, action_set=action_set)
+        new_util_arr = UtilityGrid(shape=walls.shape, action_set=action_set)
+        
+        # Non-wall states in sweep order; red-black runs one pass over each color of the checkerboard
+        states = [col * num_rows + row for row in range(num_rows) for col in range(num_cols) if not walls[col, row]]
+        if self.ordering == "red_black":
+            passes = [[state for state in states if sum(divmod(state, num_rows)) % 2 == color] for color in (0, 1)]
+        else:
+            passes = [states]
+        
+        # Action indices still considered for each state and their utilities in the current sweep
+        active_actions = [list(range(len(successor_table))) for _ in range(walls.size)]
+        action_utilities = [[0.0] * len(successor_table) for _ in range(walls.size)]
         
-        # Initialize the utility list
-        self.utility_list = []
+        # Flat views the sweeps read and write the grids through
+        curr_values, curr_policy = UtilityManager.get_flat_views(curr_util_arr)
+        new_values, new_policy = UtilityManager.get_flat_views(new_util_arr)
+        
+        self.active_action_counts = []
         
         # Initialize delta
         delta = float('-inf')
         
         # Main loop
         while True:
-            # Update current utilities with new utilities
-            UtilityManager.update_utilities(new_util_arr, curr_util_arr)
+            # Swap buffers: the utilities of the last sweep become the current ones
+            curr_util_arr, new_util_arr = new_util_arr, curr_util_arr
+            curr_values, new_values = new_values, curr_values
+            curr_policy, new_policy = new_policy, curr_policy
             
             # Reset delta for this iteration
             delta = float('-inf')
             
-            # Make a copy of current utilities for tracking
-            curr_util_arr_copy = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
-            UtilityManager.update_utilities(curr_util_arr, curr_util_arr_copy)
-            self.utility_list.append(curr_util_arr_copy)
+            # Record the current utilities for tracking
+            self.history.append(curr_util_arr.utilities, curr_util_arr.actions)
+            
+            # Jacobi reads the previous sweep; the in-place orderings read the values being updated
+            if self.ordering == "jacobi":
+                source_values = curr_values
+            else:
+                new_values[:] = curr_values
+                source_values = new_values
             
             # Update utilities for each state
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    # Skip walls
-                    if not self.grid[col][row].is_wall:
-                        # Calculate best utility for this state
-                        new_util_arr[col][row] = UtilityManager.get_best_utility(
-                            col, row, curr_util_arr, self.grid
-                        )
-                        
-                        # Calculate delta
-                        updated_util = new_util_arr[col][row].get_util()
-                        current_util = curr_util_arr[col][row].get_util()
-                        updated_delta = abs(updated_util - current_util)
-                        
-                        # Update delta if necessary
-                        delta = max(delta, updated_delta)
+            for states_pass in passes:
+                for state in states_pass:
+                    # Calculate best utility for this state over its active actions
+                    utilities = UtilityManager.get_action_utilities(
+                        state, source_values, rewards, successors, active_actions[state], action_utilities[state]
+                    )
+                    best = UtilityManager.get_best_index(utilities)
+                    updated_util = utilities[best]
+                    new_values[state] = updated_util
+                    new_policy[state] = active_actions[state][best]
+                    
+                    # Calculate delta
+                    current_util = curr_values[state]
+                    updated_delta = abs(updated_util - current_util)
+                    
+                    # Update delta if necessary
+                    delta = max(delta, updated_delta)
+            
+            self.iterations += 1
+            self._record_snapshots(delta, curr_util_arr.utilities, curr_util_arr.actions)
+            
+            # Record the number of actions evaluated in this sweep
+            self.active_action_counts.append(sum(len(active_actions[state]) for state in states))
+            
+            # Bound the optimal utilities and drop actions that can no longer be optimal
+            if self.action_elimination or self.stopping == "span":
+                span, self.lower_bounds, self.upper_bounds = VectorizedUtilityManager.get_span_bounds(
+                    new_util_arr.utilities, curr_util_arr.utilities, walls
+                )
+            if self.action_elimination:
+                UtilityManager.eliminate_actions(active_actions, action_utilities, span, states)
+            
+            # Check convergence
+            if self.stopping == "span" and span < self.converge_threshold:
+                # Keep the greedy policy the bounds certify, with the midpoint of the bounds as utilities
+                self.raw_utilities = new_util_arr.utilities.copy()
+                new_util_arr.utilities[:] = VectorizedUtilityManager.get_bound_midpoint(
+                    new_util_arr.utilities, curr_util_arr.utilities, walls
+                )
+                self.history.append(new_util_arr.utilities, new_util_arr.actions)
+                curr_util_arr = new_util_arr
+                break
+            if self.stopping == "delta" and delta < self.converge_threshold:
+                break
+        
+        return curr_util_arr.copy()  # Return the optimal policy
+    
+    def _run_arrays(self, get_best_utilities, walls):
+        """
+        Run Value Iteration with whole-grid array sweeps.
+        
+        Follows the same steps as _run_object, so utilities and policy match.
+        
+        Args:
+            get_best_utilities (callable): Maps a utility array to the
+                (best_util, best_policy) arrays of one Bellman update.
+            walls (np.ndarray): Wall mask.
+        """
+        # Initialize utility and policy arrays
+        new_util_arr = np.zeros(walls.shape, dtype=np.float64)
+        new_policy_arr = np.full(walls.shape, NO_ACTION, dtype=np.int8)
+        
+        # Main loop
+        while True:
+            # Update current utilities with new utilities
+            curr_util_arr = new_util_arr
+            curr_policy_arr = new_policy_arr
+            
+            # Record the current utilities for tracking
+            self.history.append(curr_util_arr, curr_policy_arr)
+            
+            # Update utilities for every state at once
+            new_util_arr, new_policy_arr = get_best_utilities(curr_util_arr)
+            delta = VectorizedUtilityManager.get_max_delta(new_util_arr, curr_util_arr, walls)
+            
+            self.iterations += 1
+            self._record_snapshots(delta, curr_util_arr, curr_policy_arr)
+            
+            # Check convergence
+            if self._is_converged(delta, new_util_arr, new_policy_arr, curr_util_arr, walls):
+                if self.stopping == "span":
+                    curr_util_arr, curr_policy_arr = new_util_arr, new_policy_arr
+                break
+        
+        return VectorizedUtilityManager.to_utility_array(
+            curr_util_arr, curr_policy_arr, self.grid_environment.get_actions()
+        )
+    
+    def _record_snapshots(self, delta, curr_util_arr, curr_policy_arr):
+        """
+        Snapshots the current result for every swept epsilon whose threshold the sweep met.
+        
+        Args:
+            delta (float): Largest utility change of the sweep.
+            curr_util_arr (np.ndarray): Utilities the sweep started from.
+            curr_policy_arr (np.ndarray): Policy the sweep started from.
+        """
+        if not self.epsilons:
+            return
+        
+        while len(self.epsilon_snapshots) < len(self.epsilons):
+            epsilon = self.epsilons[len(self.epsilon_snapshots)]
+            converge_threshold = epsilon * ((1.0 - DISCOUNT) / DISCOUNT)
+            if delta >= converge_threshold:
+                break
+            
+            # Same result a run with this epsilon would return
+            utilities = VectorizedUtilityManager.to_utility_array(
+                curr_util_arr, curr_policy_arr, self.grid_environment.get_actions()
+            )
+            
+            self.epsilon_snapshots.append({
+                'epsilon': epsilon,
+                'converge_threshold': converge_threshold,
+                'iterations': self.iterations,
+                'elapsed_time': time.time() - self.start_time,
+                'utilities': utilities,
+            })
+    
+    def _is_converged(self, delta, new_util_arr, new_policy_arr, curr_util_arr, walls):
+        """
+        Applies the stopping rule after an array sweep.
+        
+        Under the span rule the MacQueen bounds are updated and, on
+        convergence, the new utilities are replaced in place by the midpoint
+        of the bounds (keeping the last update in raw_utilities) and added
+        to the history with the greedy policy, so that its last entry holds
+        the certified result.
+        
+        Args:
+            delta (float): Largest utility change of the sweep.
+            new_util_arr (np.ndarray): Updated utility values.
+            new_policy_arr (np.ndarray): Greedy policy of the sweep.
+            curr_util_arr (np.ndarray): Previous utility values.
+            walls (np.ndarray): Wall mask.
+            
+        Returns:
+            bool: Whether Value Iteration should stop.
+        """
+        if self.stopping == "delta":
+            return delta < self.converge_threshold
+        
+        span, self.lower_bounds, self.upper_bounds = VectorizedUtilityManager.get_span_bounds(
+            new_util_arr, curr_util_arr, walls
+        )
+        if span < self.converge_threshold:
+            self.raw_utilities = np.array(new_util_arr)
+            new_util_arr[...] = VectorizedUtilityManager.get_bound_midpoint(new_util_arr, curr_util_arr, walls)
+            self.history.append(new_util_arr, new_policy_arr)
+            return True
+        return False
+    
+    def _run_parallel(self):
+        """
+        Run Value Iteration with tiled sweeps in worker processes.
+        
+        Follows the same steps as _run_arrays, so results are identical to
+        the numpy backend.
+        """
+        rewards = self.grid_environment.get_reward_array()
+        walls = self.grid_environment.get_wall_mask()
+        
+        with ParallelSweeper(rewards, walls, self.num_workers) as sweeper:
+            parity = 0
+            
+            # Main loop
+            while True:
+                # Views of the current buffers, the sweep only writes the other one
+                curr_util_arr = sweeper.util_bufs[parity]
+                curr_policy_arr = sweeper.policy_bufs[parity]
+                self.history.append(curr_util_arr, curr_policy_arr)
+                
+                # Update every tile, then swap buffers
+                delta = sweeper.sweep(parity)
+                parity = 1 - parity
+                
+                self.iterations += 1
+                self._record_snapshots(delta, curr_util_arr, curr_policy_arr)
+                
+                # Check convergence
+                if self._is_converged(delta, sweeper.util_bufs[parity], sweeper.policy_bufs[parity],
+                                      curr_util_arr, walls):
+                    if self.stopping == "span":
+                        curr_util_arr = sweeper.util_bufs[parity]
+                        curr_policy_arr = sweeper.policy_bufs[parity]
+                    break
+            
+            # Copy the result out before the shared memory is released
+            return VectorizedUtilityManager.to_utility_array(curr_util_arr, curr_policy_arr)
+    
+    def _run_red_black_numpy(self):
+        """
+        Run red-black Value Iteration through the successor table.
+        
+        The successor table is split by checkerboard color once, so each
+        half-sweep only gathers the successors of one color and a sweep
+        costs the same as a Jacobi sweep.
+        """
+        walls = self.grid_environment.get_wall_mask()
+        rewards = self.grid_environment.get_reward_array().ravel()
+        successors = self.grid_environment.get_successor_table().astype(np.intp)
+        probabilities = self.grid_environment.get_outcome_probabilities()
+        
+        # Non-wall states of each color with their columns of the tables
+        cols, rows = np.indices(walls.shape)
+        colors = ((cols + rows) % 2).ravel()
+        blocks = []
+        for color in (0, 1):
+            states = np.flatnonzero((colors == color) & ~walls.ravel())
+            block_probabilities = probabilities[..., states] if probabilities.ndim == 3 else probabilities
+            blocks.append((states, rewards[states], successors[..., states], block_probabilities))
+        
+        # Initialize the double-buffered utility and policy arrays and the change scratch array
+        wall_vec = walls.ravel()
+        curr_util_vec, util_vec = np.zeros((2, walls.size), dtype=np.float64)
+        curr_policy_vec, policy_vec = np.full((2, walls.size), NO_ACTION, dtype=np.int8)
+        delta_vec = np.empty(walls.size, dtype=np.float64)
+        
+        # Main loop
+        while True:
+            # Keep the current utilities for tracking; every sweep writes the whole policy
+            self.history.append(curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape))
+            np.copyto(util_vec, curr_util_vec)
+            
+            # Update the red states, then the black states in place
+            for states, block_rewards, block_successors, block_probabilities in blocks:
+                util_vec[states], policy_vec[states] = VectorizedUtilityManager.get_best_state_utilities(
+                    util_vec, block_rewards, block_successors, block_probabilities
+                )
+            delta = VectorizedUtilityManager.get_max_delta(util_vec, curr_util_vec, wall_vec, delta_vec)
+            
+            self.iterations += 1
+            self._record_snapshots(delta, curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape))
+            
+            # Check convergence
+            if delta < self.converge_threshold:
+                break
+            
+            # Swap buffers: the utilities of this sweep become the current ones
+            curr_util_vec, util_vec = util_vec, curr_util_vec
+            curr_policy_vec, policy_vec = policy_vec, curr_policy_vec
+        
+        return VectorizedUtilityManager.to_utility_array(
+            curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape),
+            self.grid_environment.get_actions()
+        )
+    
+    def _run_red_black_sparse(self):
+        """
+        Run red-black Value Iteration on the sparse transition model.
+        
+        Each half-sweep only multiplies the transition rows of one color,
+        so a sweep costs the same as a Jacobi sweep.
+        """
+        transition_model = self.grid_environment.get_transition_model()
+        walls = self.grid_environment.get_wall_mask()
+        blocks = transition_model.get_checkerboard_blocks()
+        
+        # Initialize the double-buffered utility and policy arrays and the change scratch array
+        wall_vec = walls.ravel()
+        curr_util_vec, util_vec = np.zeros((2, walls.size), dtype=np.float64)
+        curr_policy_vec, policy_vec = np.full((2, walls.size), NO_ACTION, dtype=np.int8)
+        delta_vec = np.empty(walls.size, dtype=np.float64)
+        
+        # Main loop
+        while True:
+            # Keep the current utilities for tracking; every sweep writes the whole policy
+            self.history.append(curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape))
+            np.copyto(util_vec, curr_util_vec)
+            
+            # Update the red states, then the black states in place
+            for block in blocks:
+                transition_model.update_state_block(util_vec, policy_vec, block)
+            delta = VectorizedUtilityManager.get_max_delta(util_vec, curr_util_vec, wall_vec, delta_vec)
             
             self.iterations += 1
+            self._record_snapshots(delta, curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape))
             
             # Check convergence
             if delta < self.converge_threshold:
                 break
+            
+            # Swap buffers: the utilities of this sweep become the current ones
+            curr_util_vec, util_vec = util_vec, curr_util_vec
+            curr_policy_vec, policy_vec = policy_vec, curr_policy_vec
         
-        return self.utility_list[-1]  # Return the optimal policy
+        return VectorizedUtilityManager.to_utility_array(
+            curr_util_vec.reshape(walls.shape), curr_policy_vec.reshape(walls.shape),
+            self.grid_environment.get_actions()
+        )
         
     
     def display_results(self):
@@ -86,7 +546,7 @@ class ValueIteration:
         Display the results of the Value Iteration algorithm.
         """
         # Get the optimal policy
-        optimal_policy = self.utility_list[-1]
+        optimal_policy = self.optimal_policy
         
         # Display experiment setup
         DisplayManager.display_experiment_setup(True, self.converge_threshold)
@@ -94,6 +554,19 @@ class ValueIteration:
         # Display iterations count
         DisplayManager.display_iterations_count(self.iterations)
         
+        # Display the width of the certified bounds on the optimal utilities
+        if self.stopping == "span":
+            walls = self.grid_environment.get_wall_mask()
+            bound_gap = float(np.max((self.upper_bounds - self.lower_bounds)[~walls], initial=0.0))
+            print(f"Largest gap between the bounds on the optimal utilities: {bound_gap:.6f}")
+        
+        # Display the work saved by action elimination
+        if self.action_elimination:
+            DisplayManager.display_active_action_counts(self.active_action_counts)
+        
+        # Display the memory held by the utility history
+        DisplayManager.display_history_usage(self.history)
+        
         # Display utilities
         DisplayManager.display_utilities(self.grid, optimal_policy)
         
@@ -102,4 +575,4 @@ class ValueIteration:
         """
         Save utility estimates to CSV file.
         """
-        FileManager.write_to_file(self.utility_list, "value_iteration_utilities")
\ No newline at end of file
+        FileManager.write_to_file(self.history, "value_iteration_utilities")
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Experiment comparing the update orderings of Value Iteration.
+This script runs Jacobi, Gauss-Seidel and red-black Value Iteration on the same grid
+and reports the iteration and wall-clock reduction of each ordering against Jacobi.
+"""
+import argparse
+import os
+import time
+from src.core.grid_environment import GridEnvironment
+from src.algorithms.value_iteration import ValueIteration
+from src.utils.config import NUM_COLS, NUM_ROWS
+
+def run_ordering(grid_environment, backend, ordering):
+    """
+    Run Value Iteration with one ordering and time it.
+
+    Args:
+        grid_environment: The grid environment.
+        backend (str): Value Iteration backend.
+        ordering (str): Update ordering.
+
+    Returns:
+        tuple: (iterations, elapsed_time)
+    """
+    value_iteration = ValueIteration(grid_environment, backend=backend, ordering=ordering)
+    start_time = time.time()
+    value_iteration.run()
+    elapsed_time = time.time() - start_time
+    return value_iteration.iterations, elapsed_time
+
+def main():
+    """
+    Main entry point.
+    """
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='Compare Value Iteration update orderings')
+    parser.add_argument('--backend', type=str, default='object',
+                        choices=list(ValueIteration.BACKENDS),
+                        help='Value Iteration backend (object, numpy, sparse, parallel or numba)')
+    parser.add_argument('--use-ratios', action='store_true',
+                        help='Generate a random grid based on the 6x6 ratios')
+
+    args = parser.parse_args()
+
+    # Ensure output directory exists
+    os.makedirs('output', exist_ok=True)
+
+    # Create grid environment
+    grid_environment = GridEnvironment(use_ratios=args.use_ratios, seed=42)
+
+    # Gauss-Seidel is inherently sequential and only runs on the object backend,
+    # and the parallel and numba backends only run Jacobi sweeps
+    orderings = [ordering for ordering in ValueIteration.ORDERINGS
+                 if ordering == "jacobi"
+                 or (ordering == "red_black" and args.backend in ("object", "numpy", "sparse"))
+                 or args.backend == "object"]
+
+    results = {ordering: run_ordering(grid_environment, args.backend, ordering) for ordering in orderings}
+    jacobi_iterations, jacobi_time = results["jacobi"]
+
+    sb = f"\n---- Value Iteration Orderings ({NUM_ROWS}x{NUM_COLS} Grid, {args.backend} backend) -----\n"
+    for ordering, (iterations, elapsed_time) in results.items():
+        iteration_reduction = 1.0 - iterations / jacobi_iterations
+        time_reduction = 1.0 - elapsed_time / jacobi_time
+        sb += (f"{ordering:<13}| Iterations: {iterations:>5} ({iteration_reduction:6.1%} fewer) "
+               f"| Time: {elapsed_time:.4f}s ({time_reduction:6.1%} faster)\n")
+
+    with open('output/ordering_performance.txt', 'a') as file:
+        file.write(sb)
+    print(sb)
+
+if __name__ == "__main__":
+    main()
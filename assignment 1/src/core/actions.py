@@ -6,12 +6,18 @@ from enum import Enum
 
 class Action(Enum):
     """
-    Enumeration representing the four possible actions (UP, DOWN, LEFT, RIGHT).
+    Enumeration representing the possible actions: the four moves of the
+    assignment (UP, DOWN, LEFT, RIGHT) and the diagonal moves available to
+    custom transition kernels.
     """
     UP = "UP"
     DOWN = "DOWN"
     LEFT = "LEFT"
     RIGHT = "RIGHT"
+    UP_LEFT = "UP_LEFT"
+    UP_RIGHT = "UP_RIGHT"
+    DOWN_LEFT = "DOWN_LEFT"
+    DOWN_RIGHT = "DOWN_RIGHT"
     
     def __str__(self):
         """String representation of an action."""
@@ -20,5 +26,5 @@ class Action(Enum):
     
     @staticmethod
     def get_random_action():
-        """Returns a random action."""
-        return random.choice(list(Action))
\ No newline at end of file
+        """Returns a random one of the four moves of the assignment."""
+        return random.choice([Action.UP, Action.DOWN, Action.LEFT, Action.RIGHT])
\ No newline at end of file
@@ -3,7 +3,9 @@ Grid environment implementation.
 """
 import numpy as np
 import random
-from src.core.state import State
+from src.core.state import StateGrid
+from src.core.transition_kernel import DEFAULT_KERNEL, TerrainKernel
+from src.core.transition_model import TransitionModel
 from src.utils.config import (
     NUM_COLS, NUM_ROWS, WHITE_REWARD, GREEN_REWARD, 
     BROWN_REWARD, WALL_REWARD, 
@@ -44,8 +46,13 @@ def generate_squares_by_ratio(num_rows, num_cols, seed=None):
 class GridEnvironment:
     """
     Represents the grid environment for the MDP.
+
+    Rewards are stored in a (num_cols, num_rows) float array and walls in a
+    bit mask packed 8 cells per byte, in the column-major order of the flat
+    state index (col * num_rows + row). get_grid() returns State views of
+    these arrays for code that works cell by cell.
     """
-    def __init__(self, config_module=None, use_ratios=False, seed=None):
+    def __init__(self, config_module=None, use_ratios=False, seed=None, kernel=None):
         """
         Initialize the grid environment.
         
@@ -53,6 +60,8 @@ class GridEnvironment:
             config_module: Optional configuration module to use
             use_ratios: If True, ignore config squares and generate based on 6x6 ratios
             seed: Optional seed for reproducibility
+            kernel: Optional TransitionKernel (defaults to the 0.8/0.1/0.1 slip model),
+                or a TerrainKernel for probabilities that differ per cell
         """
         # Use provided config or default
         if config_module is None:
@@ -64,9 +73,10 @@ class GridEnvironment:
         self.num_rows = self.config.NUM_ROWS
         self.num_cols = self.config.NUM_COLS
 
-        # Initialize grid with State objects
-        self.grid = [[State(self.config.WHITE_REWARD) for _ in range(self.num_rows)] 
-                     for _ in range(self.num_cols)]
+        # Initialize rewards and an empty wall mask
+        self.rewards = np.full((self.num_cols, self.num_rows), self.config.WHITE_REWARD, dtype=np.float64)
+        self.wall_bits = bytearray((self.num_cols * self.num_rows + 7) // 8)
+        self.grid = StateGrid(self)
 
         if use_ratios:
             self.green_squares, self.brown_squares, self.wall_squares = generate_squares_by_ratio(
@@ -77,6 +87,11 @@ class GridEnvironment:
             self.brown_squares = self.config.BROWN_SQUARES
             self.wall_squares = self.config.WALLS_SQUARES
 
+        # Successor table and transition model are built on first use and cached
+        self.kernel = DEFAULT_KERNEL if kernel is None else kernel
+        self.successor_table = None
+        self.transition_model = None
+
         self.build_grid()
 
     def build_grid(self):
@@ -84,23 +99,165 @@ class GridEnvironment:
         Initialize the Grid Environment with rewards and walls.
         """
         # Set green squares
-        for col, row in self.green_squares:
-            self.grid[col][row].set_reward(self.config.GREEN_REWARD)
+        self.rewards[self._to_indices(self.green_squares)] = self.config.GREEN_REWARD
 
         # Set brown squares
-        for col, row in self.brown_squares:
-            self.grid[col][row].set_reward(self.config.BROWN_REWARD)
+        self.rewards[self._to_indices(self.brown_squares)] = self.config.BROWN_REWARD
 
         # Set wall squares
-        for col, row in self.wall_squares:
-            self.grid[col][row].set_reward(self.config.WALL_REWARD)
-            self.grid[col][row].set_as_wall(True)
+        walls = np.zeros((self.num_cols, self.num_rows), dtype=bool)
+        walls[self._to_indices(self.wall_squares)] = True
+        self.rewards[walls] = self.config.WALL_REWARD
+        self.wall_bits = bytearray(np.packbits(walls.ravel()).tobytes())
+
+    @staticmethod
+    def _to_indices(squares):
+        """
+        Converts a list of (col, row) squares to an array index.
+
+        Args:
+            squares (list): (col, row) tuples.
+
+        Returns:
+            tuple: (cols, rows) integer arrays.
+        """
+        squares = np.asarray(squares, dtype=np.intp).reshape(-1, 2)
+        return squares[:, 0], squares[:, 1]
+
+    def apply_edits(self, edits):
+        """
+        Changes the reward and wall flag of individual cells.
+
+        The cached successor table and transition model no longer match the
+        grid afterwards, so they are dropped and rebuilt on their next use.
+
+        Args:
+            edits (list): (col, row, reward, is_wall) tuples.
+        """
+        for col, row, reward, is_wall in edits:
+            self.grid[col][row].set_reward(reward)
+            self.grid[col][row].set_as_wall(is_wall)
+
+        self.successor_table = None
+        self.transition_model = None
 
     def get_grid(self):
         """
         Returns the actual grid.
         
         Returns:
-            list: A 2D list of State objects.
+            StateGrid: State views indexed as grid[col][row].
         """
         return self.grid
+
+    def get_reward_array(self):
+        """
+        Returns the rewards of all states as an array.
+
+        Returns:
+            np.ndarray: Rewards of shape (num_cols, num_rows).
+        """
+        return self.rewards.copy()
+
+    def get_wall_mask(self):
+        """
+        Returns the wall flags of all states as an array.
+
+        Returns:
+            np.ndarray: Boolean mask of shape (num_cols, num_rows).
+        """
+        walls = np.unpackbits(np.frombuffer(self.wall_bits, dtype=np.uint8), count=self.rewards.size)
+        return walls.reshape(self.rewards.shape).astype(bool)
+
+    def set_kernel(self, kernel):
+        """
+        Replaces the transition kernel, dropping the cached successor table
+        and transition model.
+
+        Args:
+            kernel (TransitionKernel): The new kernel.
+        """
+        self.kernel = kernel
+        self.successor_table = None
+        self.transition_model = None
+
+    def set_terrain(self, terrain, kernels):
+        """
+        Gives every cell the transition kernel of its terrain type.
+
+        Args:
+            terrain (np.ndarray): Integer terrain type of every cell, of shape
+                (num_cols, num_rows), indexing into kernels.
+            kernels (list): TransitionKernel of every terrain type.
+        """
+        self.set_kernel(TerrainKernel(terrain, kernels))
+
+    def set_slip_maps(self, intent, left, right, back=0.0, stay=0.0, actions=None):
+        """
+        Gives every cell its own slip probabilities.
+
+        Each probability is a scalar or an array of shape (num_cols, num_rows).
+
+        Args:
+            intent (np.ndarray): Probability of moving in the intended direction.
+            left (np.ndarray): Probability of slipping to the left.
+            right (np.ndarray): Probability of slipping to the right.
+            back (np.ndarray): Probability of moving backwards.
+            stay (np.ndarray): Probability of staying in place.
+            actions (list): Actions of the kernel (defaults to ACTIONS).
+        """
+        self.set_kernel(TerrainKernel.slip_maps(actions, intent, left, right, back, stay))
+
+    def get_actions(self):
+        """
+        Returns the actions of the transition kernel, which policy indices refer to.
+
+        Returns:
+            list: The actions, in kernel order.
+        """
+        return self.kernel.actions
+
+    def get_successor_table(self):
+        """
+        Returns the successor index table, building it on the first call.
+
+        Entry [a, o, s] is the flattened index of the state reached from
+        state s when action a of the kernel has outcome o, with wall and edge
+        bounces already resolved. Outcome o has probability
+        kernel.probabilities[a, o], or kernel.probabilities[a, o, s] with a
+        TerrainKernel.
+
+        Returns:
+            np.ndarray: int32 array of shape (num_actions, num_outcomes, num_cols * num_rows).
+        """
+        if self.successor_table is None:
+            self.successor_table = self.kernel.build_successor_table(self.get_wall_mask())
+        return self.successor_table
+
+    def get_outcome_probabilities(self):
+        """
+        Returns the outcome probabilities that go with the successor table.
+
+        Returns:
+            np.ndarray: Array of shape (num_actions, num_outcomes), or
+                (num_actions, num_outcomes, num_cols * num_rows) when the
+                probabilities differ per cell.
+        """
+        return self.kernel.probabilities
+
+    def get_transition_model(self):
+        """
+        Returns the sparse transition model, building it on the first call.
+
+        The transition structure never changes during a solve, so repeated
+        solves on the same environment share one model.
+
+        Returns:
+            TransitionModel: The transition model of this grid.
+        """
+        if self.transition_model is None:
+            self.transition_model = TransitionModel(
+                self.get_reward_array(), self.get_wall_mask(),
+                self.get_successor_table(), self.get_outcome_probabilities()
+            )
+        return self.transition_model
@@ -5,49 +5,120 @@ State representation for a single grid cell.
 class State:
     """
     Represents a single state (cell) in the grid environment.
+
+    A State is a lightweight view of one cell of a GridEnvironment, which
+    keeps the rewards in a float array and the walls in a packed bit mask.
+    Reading or setting the reward and wall flag goes straight to those arrays.
     """
-    def __init__(self, reward=0.0):
+
+    __slots__ = ("environment", "col", "row", "index")
+
+    def __init__(self, environment, col, row):
         """
-        Initialize a state with a reward value.
-        
+        Initialize a view of one cell.
+
         Args:
-            reward (float): The reward associated with this state.
+            environment (GridEnvironment): The environment holding the cell.
+            col (int): Column index of the cell.
+            row (int): Row index of the cell.
         """
-        self.reward = reward
-        self.is_wall = False
-        
+        self.environment = environment
+        self.col = col
+        self.row = row
+        self.index = col * environment.num_rows + row
+
+    @property
+    def reward(self):
+        """
+        The reward associated with this state.
+        """
+        return float(self.environment.rewards[self.col, self.row])
+
+    @reward.setter
+    def reward(self, reward):
+        self.environment.rewards[self.col, self.row] = reward
+
+    @property
+    def is_wall(self):
+        """
+        Whether this state is a wall.
+        """
+        return bool(self.environment.wall_bits[self.index >> 3] & (0x80 >> (self.index & 7)))
+
+    @is_wall.setter
+    def is_wall(self, is_wall):
+        if is_wall:
+            self.environment.wall_bits[self.index >> 3] |= 0x80 >> (self.index & 7)
+        else:
+            self.environment.wall_bits[self.index >> 3] &= ~(0x80 >> (self.index & 7)) & 0xFF
+
     def set_reward(self, reward):
         """
         Sets the reward value for this state.
-        
+
         Args:
             reward (float): The new reward value.
         """
         self.reward = reward
-        
+
     def get_reward(self):
         """
         Returns the reward value for this state.
-        
+
         Returns:
             float: The reward value.
         """
         return self.reward
-        
+
     def set_as_wall(self, is_wall):
         """
         Sets this state as a wall or not.
-        
+
         Args:
             is_wall (bool): Whether this state is a wall.
         """
         self.is_wall = is_wall
-        
-    def is_wall(self):
+
+class StateGrid:
+    """
+    The grid of a GridEnvironment as State views, indexed as grid[col][row].
+
+    Columns of views are only created when first indexed, so large
+    environments that are solved with the array backends never build them.
+    """
+
+    __slots__ = ("environment", "columns")
+
+    def __init__(self, environment):
+        """
+        Initialize the grid view.
+
+        Args:
+            environment (GridEnvironment): The environment to view.
+        """
+        self.environment = environment
+        self.columns = [None] * environment.num_cols
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, col):
         """
-        Returns whether this state is a wall.
-        
+        Returns the State views of one column.
+
+        Args:
+            col (int): Column index.
+
         Returns:
-            bool: True if this state is a wall, False otherwise.
+            list: State views, one per row.
         """
-        return self.is_wall
\ No newline at end of file
+        column = self.columns[col]
+        if column is None:
+            col = range(len(self.columns))[col]
+            column = [State(self.environment, col, row) for row in range(self.environment.num_rows)]
+            self.columns[col] = column
+        return column
+
+    def __iter__(self):
+        for col in range(len(self.columns)):
+            yield self[col]
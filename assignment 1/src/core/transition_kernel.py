@@ -0,0 +1,304 @@
+"""
+Declarative transition kernels for the grid environment.
+"""
+import numpy as np
+from src.core.actions import Action
+from src.core.utility_grid import ACTIONS
+from src.utils.config import PROB_INTENT, PROB_LEFT, PROB_RIGHT
+
+# (col, row) offset of a successful move in each direction
+MOVE_OFFSETS = {
+    Action.UP: (0, -1),
+    Action.DOWN: (0, 1),
+    Action.LEFT: (-1, 0),
+    Action.RIGHT: (1, 0),
+    Action.UP_LEFT: (-1, -1),
+    Action.UP_RIGHT: (1, -1),
+    Action.DOWN_LEFT: (-1, 1),
+    Action.DOWN_RIGHT: (1, 1),
+}
+
+# Largest difference allowed between the total probability of an action and 1
+PROBABILITY_TOLERANCE = 1e-9
+
+class TransitionKernel:
+    """
+    Describes where each action can take the agent and how likely each outcome is.
+
+    Every action has a list of outcomes, each a (d_col, d_row) offset from
+    the current cell with its probability. An outcome that would leave the
+    grid or end on a wall leaves the agent where it is, and (0, 0) stays in
+    place. Policies store indices into the actions, in the order given.
+
+    build_successor_table compiles the kernel for a wall mask into the
+    successor index table that every solver backs states up from, so the
+    solvers need no changes for other slip models or action sets.
+    """
+
+    def __init__(self, outcomes):
+        """
+        Initialize a transition kernel.
+
+        Args:
+            outcomes (dict): Maps each action to a list of
+                ((d_col, d_row), probability) outcomes.
+        """
+        if not outcomes:
+            raise ValueError("A transition kernel needs at least one action")
+
+        self.outcomes = {}
+        for action, action_outcomes in outcomes.items():
+            action_outcomes = [((int(d_col), int(d_row)), float(prob)) for (d_col, d_row), prob in action_outcomes]
+            if not action_outcomes:
+                raise ValueError(f"Action {action!r} has no outcomes")
+            if any(prob < 0.0 for _, prob in action_outcomes):
+                raise ValueError(f"Action {action!r} has a negative outcome probability")
+            total = sum(prob for _, prob in action_outcomes)
+            if abs(total - 1.0) > PROBABILITY_TOLERANCE:
+                raise ValueError(f"Outcome probabilities of action {action!r} sum to {total}, expected 1")
+            self.outcomes[action] = action_outcomes
+
+        self.actions = list(self.outcomes)
+        self.offsets = [[offset for offset, _ in self.outcomes[action]] for action in self.actions]
+        self.num_actions = len(self.actions)
+        self.num_outcomes = max(len(action_outcomes) for action_outcomes in self.outcomes.values())
+
+        # Outcome probabilities of shape (num_actions, num_outcomes), zero-padded
+        self.probabilities = np.zeros((self.num_actions, self.num_outcomes), dtype=np.float64)
+        for index, action in enumerate(self.actions):
+            for outcome, (_, prob) in enumerate(self.outcomes[action]):
+                self.probabilities[index, outcome] = prob
+
+    @classmethod
+    def slip(cls, actions=None, intent=PROB_INTENT, left=PROB_LEFT, right=PROB_RIGHT, back=0.0, stay=0.0):
+        """
+        Builds a kernel where each action moves in its direction or slips.
+
+        Slips are relative to the intended direction: to its left, to its
+        right, backwards, or staying in place. Outcomes with a probability of
+        zero are left out, so the defaults give the assignment's model.
+
+        Args:
+            actions (list): Actions with an entry in MOVE_OFFSETS (defaults to
+                ACTIONS; list(Action) adds the diagonal moves).
+            intent (float): Probability of moving in the intended direction.
+            left (float): Probability of slipping to the left.
+            right (float): Probability of slipping to the right.
+            back (float): Probability of moving backwards.
+            stay (float): Probability of staying in place.
+
+        Returns:
+            TransitionKernel: The kernel.
+        """
+        if actions is None:
+            actions = ACTIONS
+
+        outcomes = {}
+        for action in actions:
+            d_col, d_row = MOVE_OFFSETS[action]
+            candidates = [
+                ((d_col, d_row), intent),
+                ((d_row, -d_col), left),
+                ((-d_row, d_col), right),
+                ((-d_col, -d_row), back),
+                ((0, 0), stay),
+            ]
+            outcomes[action] = [(offset, prob) for offset, prob in candidates if prob > 0.0]
+        return cls(outcomes)
+
+    def __eq__(self, other):
+        # Policies index the actions, so their order matters too
+        return isinstance(other, TransitionKernel) and list(self.outcomes.items()) == list(other.outcomes.items())
+
+    def __hash__(self):
+        return hash(tuple((action, tuple(action_outcomes)) for action, action_outcomes in self.outcomes.items()))
+
+    def is_checkerboard(self):
+        """
+        Checks whether every move changes the colour of the checkerboard.
+
+        Outcomes that stay in place or bounce off a wall keep the colour, but
+        they only reach the state itself. With diagonal or other even moves a
+        state depends on states of its own colour, so the red-black ordering
+        does not apply.
+
+        Returns:
+            bool: True if every outcome other than (0, 0) has an odd d_col + d_row.
+        """
+        return all(
+            (d_col + d_row) % 2 == 1 or (d_col, d_row) == (0, 0)
+            for action_offsets in self.offsets for d_col, d_row in action_offsets
+        )
+
+    def build_successor_table(self, walls):
+        """
+        Compiles the kernel for a grid into a successor index table.
+
+        Entry [a, o, s] is the flattened index (col * num_rows + row) of the
+        state reached from state s when action a has outcome o, weighted by
+        probabilities[a, o]. Actions with fewer outcomes than num_outcomes
+        are padded with zero-probability outcomes that stay in place.
+
+        Args:
+            walls (np.ndarray): Wall mask of shape (num_cols, num_rows).
+
+        Returns:
+            np.ndarray: int32 array of shape (num_actions, num_outcomes, num_cols * num_rows).
+        """
+        num_cols, num_rows = walls.shape
+        states = np.arange(walls.size)
+        cols, rows = np.divmod(states, num_rows)
+
+        # Outcomes shared by several actions are only resolved once
+        moves = {}
+        table = np.tile(states.astype(np.int32), (self.num_actions, self.num_outcomes, 1))
+        for index, action_offsets in enumerate(self.offsets):
+            for outcome, offset in enumerate(action_offsets):
+                if offset not in moves:
+                    moves[offset] = self._get_move_successors(walls, cols, rows, offset)
+                table[index, outcome] = moves[offset]
+        return table
+
+    @staticmethod
+    def _get_move_successors(walls, cols, rows, offset):
+        """
+        Returns the resulting state of a move by the given offset from every state.
+
+        Args:
+            walls (np.ndarray): Wall mask of shape (num_cols, num_rows).
+            cols (np.ndarray): Column of every flattened state.
+            rows (np.ndarray): Row of every flattened state.
+            offset (tuple): (d_col, d_row) offset of the move.
+
+        Returns:
+            np.ndarray: Flattened successor index of every state.
+        """
+        num_cols, num_rows = walls.shape
+        d_col, d_row = offset
+        next_cols = cols + d_col
+        next_rows = rows + d_row
+
+        in_bounds = (next_cols >= 0) & (next_cols < num_cols) & (next_rows >= 0) & (next_rows < num_rows)
+        next_states = np.where(in_bounds, next_cols * num_rows + next_rows, 0)
+
+        # Bounce back when moving off the grid or into a wall
+        blocked = ~in_bounds | walls.ravel()[next_states]
+        return np.where(blocked, cols * num_rows + rows, next_states)
+
+class TerrainKernel(TransitionKernel):
+    """
+    A transition kernel whose outcome probabilities differ from cell to cell.
+
+    Every cell has a terrain type that picks one of a table of kernels, e.g.
+    a slippery kernel for ice and a sticky one for mud. The outcomes of each
+    action are the union of the outcomes of all kernels, and probabilities
+    holds their weights for every state, of shape (num_actions, num_outcomes,
+    num_cols * num_rows) and zero where a terrain lacks an outcome. The
+    successor table is built the same way as for a single kernel, so the
+    solvers only see per-state weights in place of per-action ones.
+    """
+
+    def __init__(self, terrain, kernels):
+        """
+        Initialize a terrain kernel.
+
+        Args:
+            terrain (np.ndarray): Integer terrain type of every cell, of shape
+                (num_cols, num_rows), indexing into kernels.
+            kernels (list): TransitionKernel of every terrain type, all with
+                the same actions in the same order.
+        """
+        terrain = np.asarray(terrain)
+        if not kernels:
+            raise ValueError("A terrain kernel needs at least one kernel")
+        if terrain.ndim != 2 or not np.issubdtype(terrain.dtype, np.integer):
+            raise ValueError("Terrain must be a 2D integer array of shape (num_cols, num_rows)")
+        if terrain.size and (terrain.min() < 0 or terrain.max() >= len(kernels)):
+            raise ValueError(f"Terrain types must be between 0 and {len(kernels) - 1}")
+        if any(kernel.actions != kernels[0].actions for kernel in kernels):
+            raise ValueError("All terrain kernels must have the same actions")
+
+        self.terrain = terrain
+        self.kernels = list(kernels)
+        self.actions = list(kernels[0].actions)
+        self.num_actions = len(self.actions)
+
+        # Outcomes of the first kernel come first, so a single terrain type
+        # gives the same outcome order as its kernel
+        self.offsets = []
+        for index in range(self.num_actions):
+            action_offsets = []
+            for kernel in self.kernels:
+                for offset in kernel.offsets[index]:
+                    if offset not in action_offsets:
+                        action_offsets.append(offset)
+            self.offsets.append(action_offsets)
+        self.num_outcomes = max(len(action_offsets) for action_offsets in self.offsets)
+
+        # Outcome probabilities of every terrain type, then looked up per state
+        terrain_probabilities = np.zeros((len(self.kernels), self.num_actions, self.num_outcomes), dtype=np.float64)
+        for kind, kernel in enumerate(self.kernels):
+            for index, action_offsets in enumerate(self.offsets):
+                for offset, prob in kernel.outcomes[kernel.actions[index]]:
+                    terrain_probabilities[kind, index, action_offsets.index(offset)] += prob
+        self.probabilities = np.ascontiguousarray(
+            terrain_probabilities.transpose(1, 2, 0)[:, :, terrain.ravel()]
+        )
+
+    @classmethod
+    def slip_maps(cls, actions=None, intent=PROB_INTENT, left=PROB_LEFT, right=PROB_RIGHT, back=0.0, stay=0.0):
+        """
+        Builds a terrain kernel from per-cell slip probabilities.
+
+        Each probability is a scalar or an array of shape (num_cols,
+        num_rows), as for TransitionKernel.slip. Cells with the same
+        probabilities share a terrain type.
+
+        Args:
+            actions (list): Actions with an entry in MOVE_OFFSETS (defaults to ACTIONS).
+            intent (np.ndarray): Probability of moving in the intended direction.
+            left (np.ndarray): Probability of slipping to the left.
+            right (np.ndarray): Probability of slipping to the right.
+            back (np.ndarray): Probability of moving backwards.
+            stay (np.ndarray): Probability of staying in place.
+
+        Returns:
+            TerrainKernel: The kernel.
+        """
+        maps = np.broadcast_arrays(*(np.asarray(prob, dtype=np.float64) for prob in (intent, left, right, back, stay)))
+        shape = maps[0].shape
+        if len(shape) != 2:
+            raise ValueError("Slip maps must include an array of shape (num_cols, num_rows)")
+
+        slips, terrain = np.unique(
+            np.stack([prob.ravel() for prob in maps], axis=1), axis=0, return_inverse=True
+        )
+        kernels = [TransitionKernel.slip(actions, *slip) for slip in slips.tolist()]
+        return cls(terrain.reshape(shape), kernels)
+
+    def __eq__(self, other):
+        return (isinstance(other, TerrainKernel) and self.kernels == other.kernels
+                and np.array_equal(self.terrain, other.terrain))
+
+    def __hash__(self):
+        # The terrain array is left out, as equal terrains can differ in dtype
+        return hash((tuple(self.kernels), self.terrain.shape))
+
+    def build_successor_table(self, walls):
+        """
+        Compiles the kernel for a grid into a successor index table.
+
+        Entry [a, o, s] is weighted by probabilities[a, o, s].
+
+        Args:
+            walls (np.ndarray): Wall mask of the same shape as the terrain.
+
+        Returns:
+            np.ndarray: int32 array of shape (num_actions, num_outcomes, num_cols * num_rows).
+        """
+        if walls.shape != self.terrain.shape:
+            raise ValueError(f"Terrain of shape {self.terrain.shape} does not match the grid {walls.shape}")
+        return super().build_successor_table(walls)
+
+# The assignment's model: 0.8 in the intended direction, 0.1 to either side
+DEFAULT_KERNEL = TransitionKernel.slip()
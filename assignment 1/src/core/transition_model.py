@@ -0,0 +1,267 @@
+"""
+Sparse transition model for the grid environment.
+"""
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from src.core.transition_kernel import DEFAULT_KERNEL
+from src.utils.config import DISCOUNT
+from src.utils.vectorized_utility_manager import NO_ACTION
+
+# Relative residual tolerance of the Krylov policy evaluation
+KRYLOV_TOLERANCE = 1e-12
+
+class TransitionModel:
+    """
+    Transition model of a grid environment as one CSR matrix per action.
+
+    States are the grid cells flattened as col * num_rows + row, the same
+    order as np.ravel on a (num_cols, num_rows) array. Row s of the matrix
+    for action a holds P(s' | s, a) with the slip probabilities applied and
+    moves into walls or off the grid folded back onto s. Wall rows are empty.
+    """
+
+    def __init__(self, rewards, walls, successors=None, probabilities=None):
+        """
+        Build the transition model.
+
+        Args:
+            rewards (np.ndarray): Reward array of shape (num_cols, num_rows).
+            walls (np.ndarray): Wall mask of shape (num_cols, num_rows).
+            successors (np.ndarray): Successor index table of the grid, as
+                returned by TransitionKernel.build_successor_table (built
+                from walls with the default kernel if omitted).
+            probabilities (np.ndarray): Outcome probabilities of the kernel
+                the table was built with, per action and outcome or per
+                action, outcome and state.
+        """
+        self.num_cols, self.num_rows = rewards.shape
+        self.num_states = self.num_cols * self.num_rows
+        self.rewards = np.ascontiguousarray(rewards, dtype=np.float64).ravel()
+        self.walls = np.ascontiguousarray(walls, dtype=bool).ravel()
+        if successors is None:
+            successors = DEFAULT_KERNEL.build_successor_table(walls)
+            probabilities = DEFAULT_KERNEL.probabilities
+        self.successors = successors
+        self.probabilities = probabilities
+        self.num_actions = len(successors)
+
+        self.matrices = [self.build_action_matrix(action) for action in range(self.num_actions)]
+
+        # All action matrices stacked so that row a * num_states + s is P(. | s, a)
+        self.stacked_matrix = sp.vstack(self.matrices, format='csr')
+
+        # Red-black (checkerboard) blocks, reverse-neighbour and column indices, built on first use
+        self.checkerboard_blocks = None
+        self.predecessor_index = None
+        self.dependent_index = None
+
+        # Transition matrix of the last policy asked for, as (policy bytes, matrix)
+        self.policy_matrix_cache = None
+
+    def build_action_matrix(self, action):
+        """
+        Builds the CSR transition matrix for one action.
+
+        Args:
+            action (int): Index of the intended action.
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix of shape (num_states, num_states).
+        """
+        states = np.flatnonzero(~self.walls)
+        row_ind = []
+        col_ind = []
+        data = []
+
+        for successors, prob in zip(self.successors[action], self.probabilities[action]):
+            # Per-state probabilities are zero where a terrain lacks the outcome
+            prob = np.broadcast_to(prob, self.walls.shape)[states]
+            outcome_states = states[prob != 0.0]
+            row_ind.append(outcome_states)
+            col_ind.append(successors[outcome_states])
+            data.append(prob[prob != 0.0])
+
+        # Duplicate entries (e.g. two bounces back onto the same state) are summed
+        return sp.csr_matrix(
+            (np.concatenate(data), (np.concatenate(row_ind), np.concatenate(col_ind))),
+            shape=(self.num_states, self.num_states)
+        )
+
+    def get_policy_matrix(self, policy_arr):
+        """
+        Builds the transition matrix of a fixed policy.
+
+        The matrix of the last policy is cached, so solvers that evaluate the
+        same policy repeatedly (e.g. under different discount factors) only
+        build it once.
+
+        Args:
+            policy_arr (np.ndarray): Action index for every state (negative for walls).
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix whose row s is P(. | s, policy(s)).
+        """
+        actions = np.maximum(np.ravel(policy_arr), 0).astype(np.intp)
+        key = actions.tobytes()
+        if self.policy_matrix_cache is None or self.policy_matrix_cache[0] != key:
+            matrix = self.stacked_matrix[actions * self.num_states + np.arange(self.num_states)]
+            self.policy_matrix_cache = (key, matrix)
+        return self.policy_matrix_cache[1]
+
+    def get_predecessor_index(self):
+        """
+        Returns the reverse-neighbour index of the transition model.
+
+        The predecessors of state s' are all states s that can reach s' in one
+        step under some action, i.e. indices[indptr[s']:indptr[s' + 1]], and
+        probs holds max_a P(s' | s, a) for each of them.
+
+        Returns:
+            tuple: (indptr, indices, probs) arrays in CSR layout.
+        """
+        if self.predecessor_index is None:
+            reachable = self.matrices[0]
+            for matrix in self.matrices[1:]:
+                reachable = reachable.maximum(matrix)
+            reachable = reachable.transpose().tocsr()
+            reachable.sort_indices()
+            self.predecessor_index = (reachable.indptr, reachable.indices, reachable.data)
+        return self.predecessor_index
+
+    def get_dependent_index(self):
+        """
+        Returns the stacked transition matrix in column (CSC) layout.
+
+        The rows a * num_states + s whose expected utility depends on state
+        s' are indices[indptr[s']:indptr[s' + 1]], with P(s' | s, a) in data.
+        Adding data * change to those expected utilities keeps them current
+        when the utility of s' changes by change.
+
+        Returns:
+            tuple: (indptr, indices, data) arrays in CSC layout.
+        """
+        if self.dependent_index is None:
+            columns = self.stacked_matrix.tocsc()
+            columns.sort_indices()
+            self.dependent_index = (columns.indptr, columns.indices, columns.data)
+        return self.dependent_index
+
+    def get_state_block(self, states):
+        """
+        Builds the stacked transition rows of a subset of states.
+
+        Args:
+            states (np.ndarray): Flattened indices of the states.
+
+        Returns:
+            tuple: (states, matrix) where row a * len(states) + i of matrix is P(. | states[i], a).
+        """
+        rows = (np.arange(self.num_actions)[:, np.newaxis] * self.num_states + states).ravel()
+        return states, self.stacked_matrix[rows]
+
+    def get_checkerboard_blocks(self):
+        """
+        Returns the red and black state blocks of the checkerboard ordering.
+
+        When the kernel is a checkerboard kernel (see
+        TransitionKernel.is_checkerboard), every successor of a red state
+        other than itself is black and vice versa, so all red states can be
+        updated at once from the current black utilities and then all black
+        states from the fresh red ones. Other kernels, such as ones with
+        diagonal moves, break this and must not use these blocks.
+
+        Returns:
+            list: [red_block, black_block] as returned by get_state_block.
+        """
+        if self.checkerboard_blocks is None:
+            cols, rows = np.divmod(np.arange(self.num_states), self.num_rows)
+            is_red = (cols + rows) % 2 == 0
+            self.checkerboard_blocks = [
+                self.get_state_block(np.flatnonzero(is_red & ~self.walls)),
+                self.get_state_block(np.flatnonzero(~is_red & ~self.walls)),
+            ]
+        return self.checkerboard_blocks
+
+    def update_state_block(self, util_vec, policy_vec, block, discount=DISCOUNT):
+        """
+        Applies the Bellman update in place to one block of states.
+
+        Args:
+            util_vec (np.ndarray): Flattened utilities, updated in place.
+            policy_vec (np.ndarray): Flattened policy, updated in place.
+            block (tuple): (states, matrix) as returned by get_state_block.
+            discount (float): Discount factor.
+        """
+        states, matrix = block
+        expected = (matrix @ util_vec).reshape(self.num_actions, len(states))
+        action_utils = self.rewards[states] + discount * expected
+        policy_vec[states] = np.argmax(action_utils, axis=0)
+        util_vec[states] = np.max(action_utils, axis=0)
+
+    def get_action_utilities(self, util_arr, discount=DISCOUNT):
+        """
+        Calculates the utility of every action for every state with sparse mat-vecs.
+
+        Args:
+            util_arr (np.ndarray): Current utility values for all states.
+            discount (float): Discount factor.
+
+        Returns:
+            np.ndarray: Action utilities of shape (num_actions, num_cols, num_rows),
+                in the action order of the kernel.
+        """
+        expected = (self.stacked_matrix @ np.ravel(util_arr)).reshape(self.num_actions, self.num_states)
+        action_utils = self.rewards + discount * expected
+        return action_utils.reshape(self.num_actions, self.num_cols, self.num_rows)
+
+    def get_best_utilities(self, util_arr, discount=DISCOUNT):
+        """
+        Calculates the maximum utility and the corresponding action for every state.
+
+        Args:
+            util_arr (np.ndarray): Current utility values for all states.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (best_util, best_policy) arrays. Walls keep a utility of 0 and NO_ACTION.
+        """
+        action_utils = self.get_action_utilities(util_arr, discount)
+        best_policy = np.argmax(action_utils, axis=0).astype(np.int8)
+        best_util = np.max(action_utils, axis=0)
+
+        walls = self.walls.reshape(self.num_cols, self.num_rows)
+        best_util[walls] = 0.0
+        best_policy[walls] = NO_ACTION
+
+        return best_util, best_policy
+
+    def evaluate_policy(self, policy_arr, discount=DISCOUNT, method="direct", initial_util_arr=None):
+        """
+        Calculates the exact utilities of a fixed policy by solving (I - discount * P_pi) U = R.
+
+        Args:
+            policy_arr (np.ndarray): Action index for every state (negative for walls).
+            discount (float): Discount factor.
+            method (str): "direct" for a sparse LU solve, "krylov" for BiCGSTAB,
+                which needs less memory on very large grids.
+            initial_util_arr (np.ndarray): Optional starting guess for the Krylov solver.
+
+        Returns:
+            np.ndarray: Utilities of shape (num_cols, num_rows). Walls are 0.
+        """
+        # Wall rows of P_pi are empty, so with a zero reward their utility solves to 0
+        rewards = np.where(self.walls, 0.0, self.rewards)
+        system = sp.identity(self.num_states, format='csr') - discount * self.get_policy_matrix(policy_arr)
+
+        if method == "direct":
+            util = spla.spsolve(system.tocsc(), rewards)
+        elif method == "krylov":
+            x0 = None if initial_util_arr is None else np.ravel(initial_util_arr)
+            util, info = spla.bicgstab(system, rewards, x0=x0, rtol=KRYLOV_TOLERANCE, atol=0.0)
+            if info != 0:
+                raise RuntimeError(f"Krylov policy evaluation did not converge (info={info})")
+        else:
+            raise ValueError(f"Unknown evaluation method '{method}'")
+
+        return util.reshape(self.num_cols, self.num_rows)
@@ -7,6 +7,9 @@ class Utility:
     """
     Stores an action and utility pair for a given state.
     """
+    
+    __slots__ = ("action", "util")
+    
     def __init__(self, action=None, util=0.0):
         """
         Initialize a utility object.
@@ -0,0 +1,190 @@
+"""
+Array-backed grid of utilities and actions.
+"""
+import numpy as np
+from src.core.actions import Action
+from src.utils.config import NUM_COLS, NUM_ROWS
+
+# Action order used for the action axis of all action-utility arrays and
+# for the action indices stored in policies.
+ACTIONS = [Action.UP, Action.DOWN, Action.LEFT, Action.RIGHT]
+
+# Policy value used for walls (no action)
+NO_ACTION = -1
+
+class UtilityGrid:
+    """
+    Stores the utility and action of every state of a grid.
+
+    Utilities are kept in a (num_cols, num_rows) float64 array and actions
+    in an int8 array of indices into the action set of the transition
+    kernel (ACTIONS by default, NO_ACTION for walls), which vectorized code
+    reads and writes directly. For code that works cell by
+    cell, grid[col][row] yields a UtilityProxy of one cell, and assigning a
+    Utility to grid[col][row] copies its action and value into the arrays.
+    """
+
+    __slots__ = ("utilities", "actions", "action_set")
+
+    def __init__(self, utilities=None, actions=None, shape=None, action_set=None):
+        """
+        Initialize a utility grid, by default all zeros with no actions.
+
+        The given arrays are used as they are, not copied.
+
+        Args:
+            utilities (np.ndarray): Utility values for all states.
+            actions (np.ndarray): Action indices for all states.
+            shape (tuple): Grid shape when no arrays are given (defaults to
+                (NUM_COLS, NUM_ROWS)).
+            action_set (list): Actions the action indices refer to (defaults to ACTIONS).
+        """
+        if shape is None:
+            shape = (NUM_COLS, NUM_ROWS) if utilities is None else np.shape(utilities)
+        self.utilities = np.zeros(shape, dtype=np.float64) if utilities is None else utilities
+        self.actions = np.full(shape, NO_ACTION, dtype=np.int8) if actions is None else actions
+        self.action_set = ACTIONS if action_set is None else action_set
+
+    @property
+    def shape(self):
+        """
+        Grid shape (num_cols, num_rows).
+        """
+        return self.utilities.shape
+
+    def __len__(self):
+        return self.utilities.shape[0]
+
+    def __getitem__(self, col):
+        return UtilityColumn(self, range(len(self))[col])
+
+    def __iter__(self):
+        for col in range(len(self)):
+            yield UtilityColumn(self, col)
+
+    def copy(self):
+        """
+        Returns a copy of the grid with its own arrays.
+
+        Returns:
+            UtilityGrid: The copy.
+        """
+        return UtilityGrid(self.utilities.copy(), self.actions.copy(), action_set=self.action_set)
+
+    def copy_from(self, other):
+        """
+        Copies the utilities and actions of another grid into this one.
+
+        Args:
+            other (UtilityGrid): The grid to copy from.
+        """
+        np.copyto(self.utilities, other.utilities)
+        np.copyto(self.actions, other.actions)
+
+    def get_util(self, col, row):
+        """
+        Returns the utility of one state.
+
+        Args:
+            col (int): Column index of the state.
+            row (int): Row index of the state.
+
+        Returns:
+            float: The utility value.
+        """
+        return self.utilities.item(col, row)
+
+    def set_util(self, col, row, util):
+        """
+        Sets the utility of one state.
+
+        Args:
+            col (int): Column index of the state.
+            row (int): Row index of the state.
+            util (float): The new utility value.
+        """
+        self.utilities[col, row] = util
+
+    def get_action(self, col, row):
+        """
+        Returns the action of one state.
+
+        Args:
+            col (int): Column index of the state.
+            row (int): Row index of the state.
+
+        Returns:
+            Action: The action, or None for walls.
+        """
+        action = self.actions.item(col, row)
+        return None if action == NO_ACTION else self.action_set[action]
+
+    def set_action(self, col, row, action):
+        """
+        Sets the action of one state.
+
+        Args:
+            col (int): Column index of the state.
+            row (int): Row index of the state.
+            action (Action): The new action, or None.
+        """
+        self.actions[col, row] = NO_ACTION if action is None else self.action_set.index(action)
+
+class UtilityColumn:
+    """
+    One column of a UtilityGrid, indexed by row.
+    """
+
+    __slots__ = ("grid", "col")
+
+    def __init__(self, grid, col):
+        self.grid = grid
+        self.col = col
+
+    def __len__(self):
+        return self.grid.utilities.shape[1]
+
+    def __getitem__(self, row):
+        return UtilityProxy(self.grid, self.col, range(len(self))[row])
+
+    def __setitem__(self, row, utility):
+        self.grid.set_util(self.col, row, utility.get_util())
+        self.grid.set_action(self.col, row, utility.get_action())
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield UtilityProxy(self.grid, self.col, row)
+
+class UtilityProxy:
+    """
+    A view of the utility and action of one cell of a UtilityGrid, with the
+    same methods as Utility.
+    """
+
+    __slots__ = ("grid", "col", "row")
+
+    def __init__(self, grid, col, row):
+        self.grid = grid
+        self.col = col
+        self.row = row
+
+    def get_action(self):
+        return self.grid.get_action(self.col, self.row)
+
+    def get_action_str(self):
+        action = self.get_action()
+        if action is None:
+            return "Wall"
+        return str(action)
+
+    def set_action(self, action):
+        self.grid.set_action(self.col, self.row, action)
+
+    def get_util(self):
+        return self.grid.get_util(self.col, self.row)
+
+    def set_util(self, util):
+        self.grid.set_util(self.col, self.row, util)
+
+    def __lt__(self, other):
+        return self.get_util() < other.get_util()
@@ -1,16 +1,15 @@
 """
 Experiment to find optimal EPSILON (c) value for Value Iteration.
-This script runs Value Iteration with different EPSILON values and records the results.
+This script runs Value Iteration once to the tightest EPSILON value and records the
+result at the point each EPSILON value's threshold is met.
 """
 import os
 import sys
-import time
 import copy
 import matplotlib.pyplot as plt
 import numpy as np
 from src.core.grid_environment import GridEnvironment
 from src.algorithms.value_iteration import ValueIteration
-from src.utils.config import DISCOUNT
 
 # Create directory for experiment results
 os.makedirs(r'C:\Users\Aarushi\Desktop\SC4003_Intelligent_Agents\output\part_1_results\find_optimal_c', exist_ok=True)
@@ -36,28 +35,20 @@ print("="*50)
 grid_environment = GridEnvironment()
 grid = grid_environment.get_grid()
 
-# Run value iteration for each EPSILON value
-for epsilon in epsilon_values:
+# Run value iteration once; every larger EPSILON stops earlier on the same sequence
+vi = ValueIteration(grid_environment, epsilons=epsilon_values)
+vi.run()
+# vi.display_results()
+vi.save_utilities()
+
+# Go through the snapshot taken for each EPSILON value
+for snapshot in sorted(vi.epsilon_snapshots, key=lambda snapshot: snapshot['epsilon']):
+    epsilon = snapshot['epsilon']
+    optimal_policy = snapshot['utilities']
+    execution_time = snapshot['elapsed_time']
     print(f"\nTesting EPSILON = {epsilon}")
+    print(f"  Convergence threshold: {snapshot['converge_threshold']:.8f}")
     
-    # Create a modified ValueIteration class that uses our custom EPSILON
-    class ModifiedValueIteration(ValueIteration):
-        def __init__(self, grid_environment, custom_epsilon):
-            super().__init__(grid_environment)
-            # Override the converge threshold with our custom EPSILON
-            self.converge_threshold = custom_epsilon * ((1.0 - DISCOUNT) / DISCOUNT)
-            print(f"  Convergence threshold: {self.converge_threshold:.8f}")
-    
-    # Start timing
-    start_time = time.time()
-    
-    # Run value iteration with current EPSILON
-    vi = ModifiedValueIteration(grid_environment, epsilon)
-    optimal_policy = vi.run()
-    # End timing
-    execution_time = time.time() - start_time
-    # vi.display_results()
-    vi.save_utilities()
     try:
         # Import here to avoid issues if matplotlib is not installed
         from src.utils.grid_visualizer import GridVisualizer
@@ -88,13 +79,13 @@ for epsilon in epsilon_values:
     
     # Store results
     results['epsilon'].append(epsilon)
-    results['iterations'].append(vi.iterations)
+    results['iterations'].append(snapshot['iterations'])
     results['avg_utility'].append(avg_utility)
     results['max_utility'].append(max_utility)
     results['execution_time'].append(execution_time)
-    results['converge_threshold'].append(vi.converge_threshold)
+    results['converge_threshold'].append(snapshot['converge_threshold'])
     
-    print(f"  Iterations: {vi.iterations}")
+    print(f"  Iterations: {snapshot['iterations']}")
     print(f"  Average utility: {avg_utility:.4f}")
     print(f"  Maximum utility: {max_utility:.4f}")
     print(f"  Execution time: {execution_time:.4f} seconds")
@@ -107,7 +98,7 @@ for epsilon in epsilon_values:
         f.write(f"Max Utility = {max_utility}\n")
         f.write(f"Max Utility = {max_utility}\n")
         f.write(f"Execution time = {execution_time}\n")
-        f.write(f"Iterations = {vi.iterations}\n\n")
+        f.write(f"Iterations = {snapshot['iterations']}\n\n")
         f.write("Utilities Grid:\n")
         for row in range(len(grid[0])):
             for col in range(len(grid)):
@@ -8,6 +8,8 @@ import sys
 from src.core.grid_environment import GridEnvironment
 from src.algorithms.value_iteration import ValueIteration
 from src.algorithms.policy_iteration import PolicyIteration
+from src.utils.utility_history import UtilityHistory
+from src.algorithms.linear_programming import LinearProgramming
 from src.utils.config import (
     NUM_COLS, NUM_ROWS
 )
@@ -19,14 +21,37 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='MDP solution with Value Iteration and Policy Iteration')
     parser.add_argument('--algorithm', type=str, default='both',
-                        choices=['value', 'policy', 'both'],
-                        help='Algorithm to run (value, policy, or both)')
+                        choices=['value', 'policy', 'both', 'linear'],
+                        help='Algorithm to run (value, policy, both, or linear for the exact LP solver)')
+    parser.add_argument('--backend', type=str, default='object',
+                        choices=list(ValueIteration.BACKENDS),
+                        help='Value Iteration backend (object, numpy, sparse, parallel or numba)')
+    parser.add_argument('--evaluation', type=str, default='iterative',
+                        choices=list(PolicyIteration.EVALUATIONS),
+                        help='Policy Iteration evaluation method (iterative, direct, krylov or adaptive)')
+    parser.add_argument('--stopping', type=str, default='delta',
+                        choices=list(ValueIteration.STOPPINGS),
+                        help='Value Iteration stopping rule (delta or span)')
+    parser.add_argument('--action-elimination', action='store_true',
+                        help='Drop provably suboptimal actions (Value Iteration, object backend)')
+    parser.add_argument('--retention', type=str, default='full',
+                        choices=list(UtilityHistory.RETENTIONS),
+                        help='Iterations kept in the utility history (full, every, last, cells or none)')
+    parser.add_argument('--retention-size', type=int, default=1,
+                        help='Keep every Nth iteration (every) or the last N iterations (last)')
+    parser.add_argument('--retention-cells', type=str, nargs='+', default=None,
+                        help='Cells kept by the cells retention, as col,row pairs')
+    parser.add_argument('--history-path', type=str, default=None,
+                        help='Stream the utility history to .npy files with this path prefix')
     parser.add_argument('--visualize', action='store_true',
                         help='Generate visualizations of the results')
     parser.add_argument('--no-visualize', action='store_true',
                     help='Disable visualizations')
     
     args = parser.parse_args()
+    retention_cells = None
+    if args.retention_cells:
+        retention_cells = [tuple(int(index) for index in cell.split(',')) for cell in args.retention_cells]
     
     # Ensure output directory exists
     os.makedirs('output', exist_ok=True)
@@ -70,7 +95,12 @@ def main():
         print("Running Value Iteration")
         print("="*50)
         
-        value_iteration = ValueIteration(grid_environment)
+        value_iteration = ValueIteration(grid_environment, backend=args.backend,
+                                         action_elimination=args.action_elimination,
+                                         stopping=args.stopping, retention=args.retention,
+                                         retention_size=args.retention_size,
+                                         retention_cells=retention_cells,
+                                         history_path=args.history_path and f"{args.history_path}_value")
         value_policy = value_iteration.run()
         value_iteration.display_results()
         value_iteration.save_utilities()
@@ -95,12 +125,25 @@ def main():
             except Exception as e:
                 print(f"Error generating visualization: {e}")
     
+    if args.algorithm == 'linear':
+        print("\n" + "="*50)
+        print("Running Linear Programming")
+        print("="*50)
+        
+        linear_programming = LinearProgramming(grid_environment)
+        linear_programming.run()
+        linear_programming.display_results()
+        linear_programming.save_utilities()
+    
     if args.algorithm in ['policy', 'both']:
         print("\n" + "="*50)
         print("Running Policy Iteration")
         print("="*50)
         
-        policy_iteration = PolicyIteration(grid_environment)
+        policy_iteration = PolicyIteration(grid_environment, evaluation=args.evaluation,
+                                           retention=args.retention, retention_size=args.retention_size,
+                                           retention_cells=retention_cells,
+                                           history_path=args.history_path and f"{args.history_path}_policy")
         policy_policy = policy_iteration.run()
         policy_iteration.display_results()
         policy_iteration.save_utilities()
@@ -0,0 +1,73 @@
+"""
+Experiment on the sensitivity of the optimal policy to the white-square reward.
+This script solves one scenario per white reward (and optionally per discount factor)
+in a single Batch Value Iteration run and reports how the policy and utilities change.
+"""
+import argparse
+import os
+import time
+import numpy as np
+from src.core.grid_environment import GridEnvironment
+from src.algorithms.batch_value_iteration import BatchValueIteration
+from src.utils.config import (
+    NUM_COLS, NUM_ROWS, WHITE_REWARD, DISCOUNT, AGENT_START_COL, AGENT_START_ROW
+)
+
+def main():
+    """
+    Main entry point.
+    """
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='Reward sensitivity study with Batch Value Iteration')
+    parser.add_argument('--min-reward', type=float, default=-1.0,
+                        help='Smallest white-square reward')
+    parser.add_argument('--max-reward', type=float, default=0.0,
+                        help='Largest white-square reward')
+    parser.add_argument('--num-rewards', type=int, default=1000,
+                        help='Number of white-square rewards to solve')
+    parser.add_argument('--discounts', type=float, nargs='+', default=[DISCOUNT],
+                        help='Discount factors to solve each reward with')
+    parser.add_argument('--use-ratios', action='store_true',
+                        help='Generate a random grid based on the 6x6 ratios')
+
+    args = parser.parse_args()
+
+    # Ensure output directory exists
+    os.makedirs('output', exist_ok=True)
+
+    # Create grid environment
+    grid_environment = GridEnvironment(use_ratios=args.use_ratios, seed=42)
+    rewards = grid_environment.get_reward_array()
+    walls = grid_environment.get_wall_mask()
+    white = (rewards == WHITE_REWARD) & ~walls
+
+    # One scenario per (discount, white reward) pair
+    white_rewards = np.linspace(args.min_reward, args.max_reward, args.num_rewards)
+    scenarios = [(discount, white_reward) for discount in args.discounts for white_reward in white_rewards]
+    batch_rewards = np.stack([np.where(white, white_reward, rewards) for _, white_reward in scenarios])
+    batch_discounts = np.array([discount for discount, _ in scenarios])
+
+    batch_value_iteration = BatchValueIteration(batch_rewards, walls, batch_discounts)
+    start_time = time.time()
+    util_arr, policy_arr = batch_value_iteration.run()
+    elapsed_time = time.time() - start_time
+    batch_value_iteration.display_results()
+
+    sb = f"\n---- Reward Sensitivity ({NUM_ROWS}x{NUM_COLS} Grid, {len(scenarios)} scenarios, {elapsed_time:.4f}s) -----\n"
+    for discount in args.discounts:
+        indices = [i for i, (d, _) in enumerate(scenarios) if d == discount]
+
+        # Report the rewards at which the optimal policy changes
+        sb += f"Discount {discount}:\n"
+        for prev, curr in zip(indices, indices[1:]):
+            num_changes = int(np.count_nonzero(policy_arr[curr] != policy_arr[prev]))
+            if num_changes > 0:
+                sb += (f"  White reward {scenarios[curr][1]:8.4f} | Policy changes: {num_changes:>3} "
+                       f"| Start utility: {util_arr[curr][AGENT_START_COL][AGENT_START_ROW]:.4f}\n")
+
+    with open('output/reward_sensitivity.txt', 'a') as file:
+        file.write(sb)
+    print(sb)
+
+if __name__ == "__main__":
+    main()
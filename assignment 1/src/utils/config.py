@@ -45,6 +45,10 @@ ACTION_SYMBOLS = {
     "DOWN": "v",
     "LEFT": "<",
     "RIGHT": ">",
+    "UP_LEFT": "^<",
+    "UP_RIGHT": "^>",
+    "DOWN_LEFT": "v<",
+    "DOWN_RIGHT": "v>",
     "WALL": "Wall"
 }
 
@@ -18,14 +18,14 @@ class DisplayManager:
         
         Args:
             grid (list): The grid environment.
-            util_arr (list): Utility values for all states.
+            util_arr (UtilityGrid): Utility values for all states.
         """
         sb = DisplayManager.frame_title("Utility Values of States")
         
         for col in range(NUM_COLS):
             for row in range(NUM_ROWS):
                 if not grid[col][row].is_wall:
-                    util = f"{util_arr[col][row].get_util():.8g}"
+                    util = f"{util_arr.get_util(col, row):.8g}"
                     sb += f"({col}, {row}): {util}\n"
         
         print(sb)
@@ -44,6 +44,37 @@ class DisplayManager:
             file.write(sb)
         print(sb)
     
+    @staticmethod
+    def display_active_action_counts(counts):
+        """
+        Display the number of actions evaluated in each iteration.
+        
+        Args:
+            counts (list): Number of active actions over all states, per iteration.
+        """
+        sb = DisplayManager.frame_title("Active Action Count")
+        if counts:
+            sb += f"First iteration\t\t:\t{counts[0]}\n"
+            sb += f"Last iteration\t\t:\t{counts[-1]}\n"
+            sb += f"Total evaluated\t\t:\t{sum(counts)} of {counts[0] * len(counts)}\n"
+        print(sb)
+    
+    @staticmethod
+    def display_history_usage(history):
+        """
+        Display how much of the utility history was kept and its memory use.
+        
+        Args:
+            history (UtilityHistory): The utility history of a run.
+        """
+        sb = DisplayManager.frame_title("Utility History")
+        sb += f"Retention\t\t:\t{history.retention}\n"
+        sb += f"Iterations kept\t\t:\t{len(history)} of {history.num_iterations}\n"
+        sb += f"Memory\t\t\t:\t{history.nbytes / 1024:.1f} KiB ({history.allocated_nbytes / 1024:.1f} KiB allocated)\n"
+        if history.path is not None:
+            sb += f"Spilled to disk\t\t:\t{history.disk_nbytes / 1024:.1f} KiB ({history.path}_*.npy)\n"
+        print(sb)
+    
     @staticmethod
     def display_experiment_setup(is_value_iteration, converge_threshold=0.0):
         """
@@ -5,7 +5,6 @@ import os
 import csv
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.utils.config import NUM_COLS, NUM_ROWS
 
 class FileManager:
     """
@@ -13,54 +12,65 @@ class FileManager:
     """
     
     @staticmethod
-    def write_to_file(lst_utilities, file_name):
+    def write_to_file(history, file_name):
         """
         Write utilities to a CSV file.
         
         Args:
-            lst_utilities (list): List of utility arrays.
+            history (UtilityHistory): Utility estimates of the kept iterations.
             file_name (str): Name of the file to write to.
         """
+        if len(history) == 0:
+            print(f"No utility history kept, skipping {file_name}")
+            return
+        
         # Create output directory if it doesn't exist
         os.makedirs('output', exist_ok=True)
         
-        rows = []
-        
-        for col in range(NUM_COLS):
-            for row in range(NUM_ROWS):
-                # Extract utilities for this state across all iterations
-                state_utilities = [util_arr[col][row].get_util() for util_arr in lst_utilities]
-                rows.append(state_utilities)
-        
-        # Write to CSV
+        # Write to CSV, one row per kept state with its utilities across the kept iterations
+        state_utilities = FileManager.get_state_utilities(history)
         with open(f'output/{file_name}.csv', 'w', newline='') as f:
             writer = csv.writer(f)
-            for row in rows:
-                writer.writerow([f"{val:.3f}" for val in row])
+            for utilities in state_utilities:
+                writer.writerow([f"{val:.3f}" for val in utilities])
         
         # Also generate the utility plot
-        FileManager.plot_utilities(lst_utilities, file_name)
+        FileManager.plot_utilities(history, file_name)
         
     @staticmethod
-    def plot_utilities(lst_utilities, file_name):
+    def get_state_utilities(history):
+        """
+        Reads the utilities of every kept state across the kept iterations at once.
+        
+        Args:
+            history (UtilityHistory): Utility estimates of the kept iterations.
+        
+        Returns:
+            np.ndarray: Array of shape (num_cells, iterations), one row per
+                cell of history.get_cells(), in the same order.
+        """
+        return history.get_utilities().reshape(len(history), -1).T
+    
+    @staticmethod
+    def plot_utilities(history, file_name):
         """
         Plot utility estimates as a function of iterations.
         
         Args:
-            lst_utilities (list): List of utility arrays.
+            history (UtilityHistory): Utility estimates of the kept iterations.
             file_name (str): Name of the file to save the plot to.
         """
         plt.figure(figsize=(12, 8))
         
         # Extract data for plot
-        iterations = range(1, len(lst_utilities) + 1)
+        iterations = history.get_iterations()
+        kept_states = history.get_cells()
+        state_utilities = FileManager.get_state_utilities(history)
         
-        # Plot utility for each state
-        for col in range(NUM_COLS):
-            for row in range(NUM_ROWS):
-                label = f"State({col}, {row})"
-                values = [util_arr[col][row].get_util() for util_arr in lst_utilities]
-                plt.plot(iterations, values, label=label)
+        # Plot utility for each kept state
+        for (col, row), utilities in zip(kept_states, state_utilities):
+            label = f"State({col}, {row})"
+            plt.plot(iterations, utilities, label=label)
         
         plt.xlabel('Number of iterations')
         plt.ylabel('Utility estimates')
@@ -78,9 +88,10 @@ class FileManager:
         key_states = [(0, 0), (2, 0), (5, 0), (1, 1), (2, 3), (5, 5)]
         
         for col, row in key_states:
+            if (col, row) not in kept_states:
+                continue
             label = f"State({col}, {row})"
-            values = [util_arr[col][row].get_util() for util_arr in lst_utilities]
-            plt.plot(iterations, values, label=label, linewidth=2)
+            plt.plot(iterations, state_utilities[kept_states.index((col, row))], label=label, linewidth=2)
         
         plt.xlabel('Number of iterations')
         plt.ylabel('Utility estimates')
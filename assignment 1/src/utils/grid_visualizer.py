@@ -6,6 +6,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import Rectangle
 from src.core.actions import Action
+from src.core.transition_kernel import MOVE_OFFSETS
+from src.utils.utility_history import UtilityHistory
 from src.utils.config import NUM_COLS, NUM_ROWS, GREEN_SQUARES, BROWN_SQUARES, WALLS_SQUARES
 
 class GridVisualizer:
@@ -20,10 +22,15 @@ class GridVisualizer:
         
         Args:
             grid (list): The grid environment
-            util_arr (list): Utility values for all states
+            util_arr (UtilityGrid or UtilityHistory): Utility values for all
+                states, or a utility history whose last iteration is drawn
             title (str): Title for the visualization
             filename (str): Filename to save the visualization (without the path)
         """
+        # Draw the last iteration of a history
+        if isinstance(util_arr, UtilityHistory):
+            util_arr = util_arr.get_utility_array(-1, grid.environment.get_actions())
+        
         # Create a figure with a specific size
         plt.figure(figsize=(12, 10))
         
@@ -73,8 +80,8 @@ class GridVisualizer:
                     continue
                 
                 # Get action and utility
-                action = util_arr[col][row].get_action()
-                utility = util_arr[col][row].get_util()
+                action = util_arr.get_action(col, row)
+                utility = util_arr.get_util(col, row)
                 
                 # Action text at top
                 plt.text(col + 0.5, row + 0.15, f"{action.value if action else 'None'}", 
@@ -92,6 +99,11 @@ class GridVisualizer:
                     plt.annotate('', xy=(col + 0.35, row + 0.5), xytext=(col + 0.65, row + 0.5), arrowprops=arrow_props)
                 elif action == Action.RIGHT:
                     plt.annotate('', xy=(col + 0.65, row + 0.5), xytext=(col + 0.35, row + 0.5), arrowprops=arrow_props)
+                elif action is not None:
+                    # Diagonal moves of custom transition kernels
+                    d_col, d_row = MOVE_OFFSETS[action]
+                    plt.annotate('', xy=(col + 0.5 + 0.1 * d_col, row + 0.5 + 0.1 * d_row),
+                                 xytext=(col + 0.5 - 0.1 * d_col, row + 0.5 - 0.1 * d_row), arrowprops=arrow_props)
         
         # Set the limits and aspect ratio
         plt.xlim(0, NUM_COLS)
@@ -128,8 +140,8 @@ class GridVisualizer:
         
         Args:
             grid (list): The grid environment
-            value_policy (list): Utility values from value iteration
-            policy_policy (list): Utility values from policy iteration
+            value_policy (UtilityGrid): Utility values from value iteration
+            policy_policy (UtilityGrid): Utility values from policy iteration
             title (str): Title for the visualization
             filename (str): Filename to save the visualization
         """
@@ -183,8 +195,8 @@ class GridVisualizer:
                         continue
                     
                     # Get action and utility
-                    action = policy_arr[col][row].get_action()
-                    utility = policy_arr[col][row].get_util()
+                    action = policy_arr.get_action(col, row)
+                    utility = policy_arr.get_util(col, row)
                     
                     # Action text at top
                     ax.text(col + 0.5, row + 0.15, f"{action.value if action else 'None'}", 
@@ -202,6 +214,11 @@ class GridVisualizer:
                         ax.annotate('', xy=(col + 0.35, row + 0.5), xytext=(col + 0.65, row + 0.5), arrowprops=arrow_props)
                     elif action == Action.RIGHT:
                         ax.annotate('', xy=(col + 0.65, row + 0.5), xytext=(col + 0.35, row + 0.5), arrowprops=arrow_props)
+                    elif action is not None:
+                        # Diagonal moves of custom transition kernels
+                        d_col, d_row = MOVE_OFFSETS[action]
+                        ax.annotate('', xy=(col + 0.5 + 0.1 * d_col, row + 0.5 + 0.1 * d_row),
+                                    xytext=(col + 0.5 - 0.1 * d_col, row + 0.5 - 0.1 * d_row), arrowprops=arrow_props)
             
             # Set the limits and aspect ratio
             ax.set_xlim(0, NUM_COLS)
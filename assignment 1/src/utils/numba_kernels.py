@@ -0,0 +1,324 @@
+"""
+Optional Numba-compiled kernels for MDP algorithms.
+"""
+import heapq
+import numpy as np
+from src.utils.config import DISCOUNT
+from src.utils.vectorized_utility_manager import NO_ACTION
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+def _compile(func):
+    """
+    Compiles a kernel with Numba when it is installed.
+
+    Compiled kernels are cached on disk next to this module, so only the
+    first run after a change pays the compile time. Without Numba the
+    kernel stays a plain Python function.
+
+    Args:
+        func (callable): The kernel.
+
+    Returns:
+        callable: The compiled kernel, or func itself.
+    """
+    if HAS_NUMBA:
+        return njit(cache=True)(func)
+    return func
+
+@_compile
+def _backup_state(state, util, rewards, indptr, indices, data, num_states, num_actions, discount):
+    """
+    Calculates the maximum utility and the corresponding action of one state.
+
+    The transition rows are those of TransitionModel.stacked_matrix, and the
+    sums run in the same order as its sparse mat-vec.
+
+    Returns:
+        tuple: (utility, action index)
+    """
+    best_util = -np.inf
+    best_action = NO_ACTION
+    for action in range(num_actions):
+        row = action * num_states + state
+        expected = 0.0
+        for k in range(indptr[row], indptr[row + 1]):
+            expected += data[k] * util[indices[k]]
+
+        action_util = rewards[state] + discount * expected
+        if action_util > best_util:
+            best_util = action_util
+            best_action = action
+    return best_util, best_action
+
+@_compile
+def _bellman_backup(util, new_util, new_policy, rewards, walls, indptr, indices, data, num_actions, discount):
+    """
+    Applies one Jacobi Bellman update to every state.
+
+    Returns:
+        float: The maximum utility change over all non-wall states.
+    """
+    num_states = util.shape[0]
+    delta = -np.inf
+    for state in range(num_states):
+        if walls[state]:
+            new_util[state] = 0.0
+            new_policy[state] = NO_ACTION
+            continue
+
+        best_util, best_action = _backup_state(
+            state, util, rewards, indptr, indices, data, num_states, num_actions, discount
+        )
+        new_util[state] = best_util
+        new_policy[state] = best_action
+        delta = max(delta, abs(best_util - util[state]))
+    return delta
+
+@_compile
+def _improve_policy(util, policy, new_util, rewards, walls, indptr, indices, data, num_actions, discount, tolerance):
+    """
+    Applies one Bellman update and switches every state whose best action
+    beats its policy action by more than the tolerance.
+
+    Returns:
+        int: The number of states whose action changed.
+    """
+    num_states = util.shape[0]
+    num_changes = 0
+    for state in range(num_states):
+        if walls[state]:
+            new_util[state] = 0.0
+            continue
+
+        best_util, best_action = _backup_state(
+            state, util, rewards, indptr, indices, data, num_states, num_actions, discount
+        )
+        new_util[state] = best_util
+
+        row = policy[state] * num_states + state
+        expected = 0.0
+        for k in range(indptr[row], indptr[row + 1]):
+            expected += data[k] * util[indices[k]]
+
+        if best_util > rewards[state] + discount * expected + tolerance:
+            policy[state] = best_action
+            num_changes += 1
+    return num_changes
+
+@_compile
+def _evaluate_policy(util, policy, rewards, walls, indptr, indices, data, discount, max_sweeps, tolerance):
+    """
+    Runs simplified Bellman updates of a fixed policy until the largest
+    change is below the tolerance or max_sweeps is reached.
+
+    Returns:
+        tuple: (utilities, number of sweeps)
+    """
+    num_states = util.shape[0]
+    new_util = np.empty_like(util)
+    sweeps = 0
+    while sweeps < max_sweeps:
+        residual = 0.0
+        for state in range(num_states):
+            if walls[state]:
+                new_util[state] = 0.0
+                continue
+
+            row = policy[state] * num_states + state
+            expected = 0.0
+            for k in range(indptr[row], indptr[row + 1]):
+                expected += data[k] * util[indices[k]]
+
+            new_util[state] = rewards[state] + discount * expected
+            residual = max(residual, abs(new_util[state] - util[state]))
+
+        util, new_util = new_util, util
+        sweeps += 1
+        if residual < tolerance:
+            break
+    return util, sweeps
+
+@_compile
+def _get_best_expected_utility(state, expected, rewards, num_states, num_actions, discount):
+    """
+    Calculates the maximum utility and the corresponding action of one state from its expected utilities.
+
+    Returns:
+        tuple: (utility, action index)
+    """
+    best_util = -np.inf
+    best_action = NO_ACTION
+    for action in range(num_actions):
+        action_util = rewards[state] + discount * expected[action * num_states + state]
+        if action_util > best_util:
+            best_util = action_util
+            best_action = action
+    return best_util, best_action
+
+@_compile
+def _sweep_by_priority(util, policy, priority, expected, rewards, walls, col_indptr, col_indices, col_data,
+                       pred_indptr, pred_indices, num_actions, discount, threshold):
+    """
+    Backs up states in order of priority until every priority is below the threshold.
+
+    Same steps as PrioritizedSweeping._sweep, so the results are identical.
+
+    Returns:
+        int: The number of state backups.
+    """
+    num_states = util.shape[0]
+    heap = [(0.0, 0)]
+    heap.pop()
+    for state in range(num_states):
+        if priority[state] >= threshold:
+            heap.append((-priority[state], state))
+    heapq.heapify(heap)
+
+    backups = 0
+    while len(heap) > 0:
+        neg_residual, state = heapq.heappop(heap)
+
+        # Skip entries whose priority has been updated since they were pushed
+        if -neg_residual != priority[state]:
+            continue
+
+        best_util, best_action = _get_best_expected_utility(
+            state, expected, rewards, num_states, num_actions, discount
+        )
+        change = best_util - util[state]
+        util[state] = best_util
+        policy[state] = best_action
+        priority[state] = 0.0
+        backups += 1
+
+        for k in range(col_indptr[state], col_indptr[state + 1]):
+            expected[col_indices[k]] += col_data[k] * change
+
+        for k in range(pred_indptr[state], pred_indptr[state + 1]):
+            pred = pred_indices[k]
+            if walls[pred]:
+                continue
+
+            pred_util, _ = _get_best_expected_utility(pred, expected, rewards, num_states, num_actions, discount)
+            priority[pred] = abs(pred_util - util[pred])
+            if priority[pred] >= threshold:
+                heapq.heappush(heap, (-priority[pred], pred))
+    return backups
+
+class CompiledUtilityManager:
+    """
+    Manages utilities for MDP algorithms with Numba-compiled loops over the
+    flat CSR arrays of a TransitionModel.
+
+    Meant for work that does not vectorize cleanly. Callers should check
+    HAS_NUMBA and keep their NumPy path as the fallback, since the kernels
+    run as (slow) plain Python without Numba.
+    """
+
+    @staticmethod
+    def get_best_utilities(transition_model, util_arr, discount=DISCOUNT):
+        """
+        Calculates the maximum utility and the corresponding action for every state.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            util_arr (np.ndarray): Current utility values for all states.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (best_util, best_policy) arrays. Walls keep a utility of 0 and NO_ACTION.
+        """
+        matrix = transition_model.stacked_matrix
+        best_util = np.empty(transition_model.num_states, dtype=np.float64)
+        best_policy = np.empty(transition_model.num_states, dtype=np.int8)
+        _bellman_backup(
+            np.ravel(util_arr).astype(np.float64), best_util, best_policy,
+            transition_model.rewards, transition_model.walls,
+            matrix.indptr, matrix.indices, matrix.data, transition_model.num_actions, discount
+        )
+        shape = (transition_model.num_cols, transition_model.num_rows)
+        return best_util.reshape(shape), best_policy.reshape(shape)
+
+    @staticmethod
+    def improve_policy(transition_model, util_arr, policy_arr, discount=DISCOUNT, tolerance=0.0):
+        """
+        Applies one Bellman update and greedily improves a policy.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            util_arr (np.ndarray): Current utility values for all states.
+            policy_arr (np.ndarray): Current policy.
+            discount (float): Discount factor.
+            tolerance (float): Minimum utility gain for a policy change.
+
+        Returns:
+            tuple: (best_util, policy, num_changes), where policy is a new array.
+        """
+        matrix = transition_model.stacked_matrix
+        best_util = np.empty(transition_model.num_states, dtype=np.float64)
+        policy = np.ravel(policy_arr).astype(np.int8)
+        num_changes = _improve_policy(
+            np.ravel(util_arr).astype(np.float64), policy, best_util,
+            transition_model.rewards, transition_model.walls,
+            matrix.indptr, matrix.indices, matrix.data, transition_model.num_actions, discount, tolerance
+        )
+        shape = (transition_model.num_cols, transition_model.num_rows)
+        return best_util.reshape(shape), policy.reshape(shape), num_changes
+
+    @staticmethod
+    def evaluate_policy(transition_model, util_arr, policy_arr, max_sweeps, tolerance=0.0, discount=DISCOUNT):
+        """
+        Runs simplified Bellman updates of a fixed policy.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            util_arr (np.ndarray): Starting utilities.
+            policy_arr (np.ndarray): Policy to evaluate.
+            max_sweeps (int): Maximum number of sweeps.
+            tolerance (float): Stop once the largest change of a sweep is below this.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (util_arr, sweeps)
+        """
+        matrix = transition_model.stacked_matrix
+        util, sweeps = _evaluate_policy(
+            np.ravel(util_arr).astype(np.float64), np.ravel(policy_arr).astype(np.int8),
+            transition_model.rewards, transition_model.walls,
+            matrix.indptr, matrix.indices, matrix.data, discount, max_sweeps, tolerance
+        )
+        return util.reshape(transition_model.num_cols, transition_model.num_rows), sweeps
+
+    @staticmethod
+    def sweep_by_priority(transition_model, util_vec, policy_vec, priority_vec, expected_vec, threshold,
+                          discount=DISCOUNT):
+        """
+        Runs prioritized sweeping in place on flat utility, policy and priority arrays.
+
+        Args:
+            transition_model (TransitionModel): The environment's transition model.
+            util_vec (np.ndarray): Flattened utilities, updated in place.
+            policy_vec (np.ndarray): Flattened policy, updated in place.
+            priority_vec (np.ndarray): Flattened residuals, updated in place.
+            expected_vec (np.ndarray): Expected next-state utility of every
+                row of the stacked transition matrix, updated in place.
+            threshold (float): Priorities below this are not backed up.
+            discount (float): Discount factor.
+
+        Returns:
+            int: The number of state backups.
+        """
+        col_indptr, col_indices, col_data = transition_model.get_dependent_index()
+        pred_indptr, pred_indices, _ = transition_model.get_predecessor_index()
+
+        # Heap entries hold 64-bit state indices
+        return _sweep_by_priority(
+            util_vec, policy_vec, priority_vec, expected_vec, transition_model.rewards, transition_model.walls,
+            col_indptr, col_indices, col_data,
+            pred_indptr, pred_indices.astype(np.int64), transition_model.num_actions, discount, threshold
+        )
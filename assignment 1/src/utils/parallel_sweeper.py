@@ -0,0 +1,256 @@
+"""
+Multi-process tiled Bellman sweeps over shared memory.
+"""
+import multiprocessing as mp
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from src.utils.config import DISCOUNT
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager
+
+# Seconds the main process waits for the workers to finish a sweep
+SWEEP_TIMEOUT = 60.0
+
+# Seconds between checks that the other processes are still alive while waiting
+POLL_INTERVAL = 0.1
+
+def _attach(name, shape, dtype):
+    """
+    Attaches to a shared memory block and views it as an array.
+
+    Args:
+        name (str): Name of the shared memory block.
+        shape (tuple): Shape of the array.
+        dtype: NumPy dtype of the array.
+
+    Returns:
+        tuple: (shared_memory, array)
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _sweep_worker(names, shape, num_workers, col_start, col_end, worker_id, start, done, stop, parity, discount):
+    """
+    Worker process that owns the columns [col_start, col_end) of the grid.
+
+    Each sweep reads utility buffer `parity` and writes buffer `1 - parity`.
+    The one-column halo on each side of the tile is read straight from the
+    shared buffer, so nothing is pickled between sweeps. The worker exits
+    when it is stopped or when the main process has gone away.
+
+    Args:
+        names (dict): Shared memory block names.
+        shape (tuple): Grid shape (num_cols, num_rows).
+        num_workers (int): Total number of workers.
+        col_start (int): First column of the tile.
+        col_end (int): One past the last column of the tile.
+        worker_id (int): Index of this worker's delta slot.
+        start (multiprocessing.Semaphore): Released by the main process to start a sweep.
+        done (multiprocessing.Semaphore): Released by every worker that finished the sweep.
+        stop (multiprocessing.Value): Set by the main process when the solve is done.
+        parity (multiprocessing.Value): Index of the buffer to read this sweep.
+        discount (float): Discount factor.
+    """
+    layouts = {
+        'util': ((2,) + shape, np.float64),
+        'policy': ((2,) + shape, np.int8),
+        'rewards': (shape, np.float64),
+        'walls': (shape, np.bool_),
+        'deltas': ((num_workers,), np.float64),
+    }
+    blocks = {}
+    arrays = {}
+    for key, (array_shape, dtype) in layouts.items():
+        blocks[key], arrays[key] = _attach(names[key], array_shape, dtype)
+
+    util_bufs = arrays['util']
+    policy_bufs = arrays['policy']
+    rewards = arrays['rewards']
+    walls = arrays['walls']
+    deltas = arrays['deltas']
+
+    # Tile plus a one-column halo on each side (where the grid has one)
+    halo_start = max(col_start - 1, 0)
+    halo_end = min(col_end + 1, shape[0])
+    inner = slice(col_start - halo_start, col_end - halo_start)
+    window = slice(halo_start, halo_end)
+    tile = slice(col_start, col_end)
+
+    parent = os.getppid()
+    try:
+        while True:
+            while not start.acquire(timeout=POLL_INTERVAL):
+                if os.getppid() != parent:
+                    return
+            if stop.value:
+                break
+
+            src = parity.value
+            best_util, best_policy = VectorizedUtilityManager.get_best_utilities(
+                util_bufs[src][window], rewards[window], walls[window], discount
+            )
+
+            # Halo results are discarded; only the tile's own states are written
+            util_bufs[1 - src][tile] = best_util[inner]
+            policy_bufs[1 - src][tile] = best_policy[inner]
+            deltas[worker_id] = VectorizedUtilityManager.get_max_delta(
+                best_util[inner], util_bufs[src][tile], walls[tile]
+            )
+
+            done.release()
+    finally:
+        # Drop the array views before closing the blocks they point into
+        del util_bufs, policy_bufs, rewards, walls, deltas
+        arrays.clear()
+        for shm in blocks.values():
+            shm.close()
+
+class ParallelSweeper:
+    """
+    Runs Jacobi Bellman sweeps with one worker process per column tile.
+
+    Utilities and policies live in double-buffered shared memory blocks, so
+    workers only synchronize on semaphores between sweeps. Every state is
+    updated with the same arithmetic as VectorizedUtilityManager, so results
+    are identical to the serial numpy backend. A sweep raises a RuntimeError
+    instead of hanging when a worker fails or stops responding.
+    """
+
+    def __init__(self, rewards, walls, num_workers=None, discount=DISCOUNT, timeout=SWEEP_TIMEOUT):
+        """
+        Allocate the shared buffers and start the workers.
+
+        Args:
+            rewards (np.ndarray): Reward array of shape (num_cols, num_rows).
+            walls (np.ndarray): Wall mask of shape (num_cols, num_rows).
+            num_workers (int): Number of worker processes (defaults to the CPU count).
+            discount (float): Discount factor.
+            timeout (float): Seconds to wait for the workers to finish a
+                sweep before it is abandoned.
+        """
+        self.shape = rewards.shape
+        num_cols = self.shape[0]
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_cols))
+
+        self.blocks = {}
+        self.util_bufs = self._allocate('util', (2,) + self.shape, np.float64)
+        self.policy_bufs = self._allocate('policy', (2,) + self.shape, np.int8)
+        self.rewards = self._allocate('rewards', self.shape, np.float64)
+        self.walls = self._allocate('walls', self.shape, np.bool_)
+        self.deltas = self._allocate('deltas', (num_workers,), np.float64)
+
+        self.util_bufs[:] = 0.0
+        self.policy_bufs[:] = -1
+        self.rewards[:] = rewards
+        self.walls[:] = walls
+
+        names = {key: shm.name for key, shm in self.blocks.items()}
+
+        # A barrier would hang for good on a worker killed while waiting on it
+        self.timeout = timeout
+        self.starts = [mp.Semaphore(0) for _ in range(num_workers)]
+        self.done = mp.Semaphore(0)
+        self.stop = mp.Value('b', 0)
+        self.parity = mp.Value('b', 0)
+
+        # Split the columns into nearly equal contiguous tiles
+        bounds = np.linspace(0, num_cols, num_workers + 1).astype(int)
+        self.workers = [
+            mp.Process(
+                target=_sweep_worker,
+                args=(names, self.shape, num_workers, int(bounds[i]), int(bounds[i + 1]), i,
+                      self.starts[i], self.done, self.stop, self.parity, discount),
+                daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def _allocate(self, key, shape, dtype):
+        """
+        Allocates a shared memory block and views it as an array.
+
+        Args:
+            key (str): Name of the buffer.
+            shape (tuple): Shape of the array.
+            dtype: NumPy dtype of the array.
+
+        Returns:
+            np.ndarray: The array backed by the new block.
+        """
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self.blocks[key] = shm
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def sweep(self, parity):
+        """
+        Runs one Jacobi sweep reading buffer `parity` and writing buffer `1 - parity`.
+
+        Args:
+            parity (int): Index of the buffer holding the current utilities.
+
+        Returns:
+            float: The maximum utility change over all non-wall states.
+        """
+        self.parity.value = parity
+        for start in self.starts:
+            start.release()
+
+        # Wait for every tile to finish, checking that no worker died meanwhile
+        deadline = time.monotonic() + self.timeout
+        for _ in self.workers:
+            while not self.done.acquire(timeout=POLL_INTERVAL):
+                if any(worker.exitcode is not None for worker in self.workers):
+                    self._fail("a worker exited")
+                if time.monotonic() > deadline:
+                    self._fail(f"the workers did not finish within {self.timeout}s")
+        return float(np.max(self.deltas))
+
+    def _fail(self, reason):
+        """
+        Stops the workers and raises the error of a failed sweep.
+
+        Args:
+            reason (str): What went wrong.
+        """
+        self._stop_workers()
+        exitcodes = [worker.exitcode for worker in self.workers]
+        raise RuntimeError(f"Parallel sweep failed, {reason} (worker exit codes {exitcodes})")
+
+    def _stop_workers(self):
+        """
+        Tells every worker to exit, killing any that do not.
+        """
+        self.stop.value = 1
+        for start in self.starts:
+            start.release()
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+    def close(self):
+        """
+        Stops the workers and releases the shared memory.
+        """
+        if not self.blocks:
+            return
+        self._stop_workers()
+
+        del self.util_bufs, self.policy_bufs, self.rewards, self.walls, self.deltas
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
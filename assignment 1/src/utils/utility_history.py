@@ -0,0 +1,422 @@
+"""
+Preallocated history of utility and policy estimates.
+"""
+import os
+import struct
+import numpy as np
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager
+
+class UtilityHistory:
+    """
+    Stores utility and policy estimates per iteration in NumPy buffers.
+
+    Utilities are kept in a (capacity, num_cols, num_rows) float64 (or
+    float32) array and policies in an int8 array of the same shape holding
+    indices into ACTIONS (NO_ACTION for walls). The buffers start small and
+    double in capacity when full, so recording an iteration costs one array
+    copy instead of a grid of Python objects, and at most half of the
+    allocated memory is ever unused.
+
+    The retention mode decides which iterations are kept:
+        "full" keeps every iteration.
+        "every" keeps every size-th iteration, starting with the first.
+        "last" keeps only the last size iterations in a ring buffer.
+        "cells" keeps every iteration, but only for the given cells.
+        "none" keeps nothing and only counts iterations.
+
+    With a spill path, kept iterations are streamed to two .npy files
+    ({path}_utilities.npy and {path}_policies.npy) instead of being held in
+    memory. Their fixed-length headers are rewritten with the final shape
+    whenever the history is read and on close(), and readers get read-only
+    memory maps, kept until the next append, so memory use stays constant
+    however long the run.
+    """
+
+    RETENTIONS = ("full", "every", "last", "cells", "none")
+
+    # Capacity of the first buffers in iterations, and the most memory they may take
+    INITIAL_CAPACITY = 16
+    INITIAL_NBYTES = 16 * 1024 * 1024
+
+    # Size of the .npy header of spill files, a multiple of 64 as in NumPy's own files
+    HEADER_SIZE = 128
+
+    def __init__(self, shape, dtype=np.float64, initial_capacity=INITIAL_CAPACITY, retention="full", size=1,
+                 cells=None, path=None):
+        """
+        Allocate an empty history.
+
+        Args:
+            shape (tuple): Grid shape (num_cols, num_rows).
+            dtype: Utility dtype, np.float64 or np.float32.
+            initial_capacity (int): Number of iterations the first buffers
+                hold, lowered so they take at most INITIAL_NBYTES (but hold
+                at least one iteration).
+            retention (str): Retention mode, one of RETENTIONS.
+            size (int): Decimation interval ("every") or number of
+                iterations kept ("last").
+            cells (list): (col, row) cells to keep ("cells").
+            path (str): Optional path prefix of the spill files.
+        """
+        if retention not in self.RETENTIONS:
+            raise ValueError(f"Unknown retention '{retention}', expected one of {self.RETENTIONS}")
+        if retention in ("every", "last") and (size is None or size < 1):
+            raise ValueError(f"The {retention} retention needs a size of at least 1")
+        if retention == "cells" and not cells:
+            raise ValueError("The cells retention needs at least one cell")
+        if path is not None and retention in ("last", "none"):
+            raise ValueError(f"The {retention} retention cannot be spilled to disk")
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.retention = retention
+        self.size = size
+        self.cells = [tuple(cell) for cell in cells] if retention == "cells" else None
+        self.path = path
+        self.spill_files = None
+        self.spill_maps = None
+        self.num_iterations = 0
+        self.num_recorded = 0
+        self.length = 0
+
+        # Kept cells are stored side by side instead of as a grid
+        record_shape = self.shape
+        if self.cells is not None:
+            record_shape = (len(self.cells),)
+            self.cell_cols, self.cell_rows = (np.array(index) for index in zip(*self.cells))
+
+        self.record_shape = record_shape
+        self.record_nbytes = int(np.prod(record_shape)) * (self.dtype.itemsize + 1)
+
+        initial_capacity = max(1, min(initial_capacity, self.INITIAL_NBYTES // max(self.record_nbytes, 1)))
+        capacity = {"none": 0, "last": size}.get(retention, initial_capacity)
+        self.iteration_numbers = np.empty(capacity, dtype=np.int64)
+
+        # Spilled histories only keep the iteration numbers in memory
+        if path is not None:
+            self.spill_files = (
+                self._open_spill_file(f"{path}_utilities.npy", self.dtype),
+                self._open_spill_file(f"{path}_policies.npy", np.dtype(np.int8)),
+            )
+            capacity = 0
+        self.utilities = np.empty((capacity,) + record_shape, dtype=self.dtype)
+        self.policies = np.empty((capacity,) + record_shape, dtype=np.int8)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        """
+        Returns one kept iteration.
+
+        Args:
+            index (int): Index among the kept iterations (negative indices
+                count from the end).
+
+        Returns:
+            tuple: (util_arr, policy_arr) views into the buffers.
+        """
+        if self.cells is not None:
+            raise ValueError("The history only keeps selected cells, not whole grids")
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"History index {index} out of range for {self.length} iterations")
+
+        utilities, policies = self._get_buffers()
+        slot = self._get_slot(index)
+        return utilities[slot], policies[slot]
+
+    @property
+    def nbytes(self):
+        """
+        Memory taken by the kept iterations, in bytes.
+        """
+        if self.spill_files is not None:
+            return self.length * self.iteration_numbers.itemsize
+        return self.length * (self.record_nbytes + self.iteration_numbers.itemsize)
+
+    @property
+    def allocated_nbytes(self):
+        """
+        Memory allocated for the history buffers, used or not, in bytes.
+        """
+        return self.utilities.nbytes + self.policies.nbytes + self.iteration_numbers.nbytes
+
+    @property
+    def disk_nbytes(self):
+        """
+        Size of the spilled utilities and policies, in bytes.
+        """
+        if self.spill_files is None:
+            return 0
+        return self.length * self.record_nbytes
+
+    def _open_spill_file(self, file_name, dtype):
+        """
+        Creates a spill file holding an empty .npy array.
+
+        Args:
+            file_name (str): Path of the file.
+            dtype (np.dtype): Dtype of the stored array.
+
+        Returns:
+            file: The file, open for appending records.
+        """
+        os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+        spill_file = open(file_name, "wb+")
+        self._write_header(spill_file, dtype)
+        return spill_file
+
+    def _write_header(self, spill_file, dtype):
+        """
+        Writes the .npy header of a spill file for the current length.
+
+        The header is padded to HEADER_SIZE, so rewriting it never moves the data.
+
+        Args:
+            spill_file (file): The spill file.
+            dtype (np.dtype): Dtype of the stored array.
+        """
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(dtype),
+            'fortran_order': False,
+            'shape': (self.length,) + self.record_shape,
+        })
+        # 10 bytes of magic string and header length precede the header
+        header = header.ljust(self.HEADER_SIZE - 11) + "\n"
+        if len(header) != self.HEADER_SIZE - 10:
+            raise ValueError(f"Spill file header does not fit in {self.HEADER_SIZE} bytes")
+
+        spill_file.seek(0)
+        spill_file.write(np.lib.format.magic(1, 0) + struct.pack("<H", len(header)) + header.encode("latin1"))
+        spill_file.seek(0, os.SEEK_END)
+
+    def _sync(self):
+        """
+        Rewrites the headers of the spill files for the current length and flushes them.
+        """
+        for spill_file, dtype in zip(self.spill_files, (self.dtype, np.dtype(np.int8))):
+            if not spill_file.closed:
+                self._write_header(spill_file, dtype)
+                spill_file.flush()
+
+    def _get_buffers(self):
+        """
+        Returns the utility and policy buffers, memory-mapped from disk when spilled.
+
+        Returns:
+            tuple: (utilities, policies) arrays.
+        """
+        if self.spill_files is None:
+            return self.utilities, self.policies
+        if self.length == 0:
+            return self.utilities, self.policies
+
+        if self.spill_maps is None:
+            self._sync()
+            self.spill_maps = tuple(np.load(spill_file.name, mmap_mode="r") for spill_file in self.spill_files)
+        return self.spill_maps
+
+    def close(self):
+        """
+        Fixes up the headers of the spill files and closes them.
+
+        The history stays readable; further iterations can no longer be recorded.
+        """
+        if self.spill_files is None:
+            return
+        self._sync()
+        for spill_file in self.spill_files:
+            spill_file.close()
+
+    def _get_slot(self, index):
+        """
+        Maps an index among the kept iterations to a buffer slot.
+        """
+        if self.retention == "last" and self.num_recorded > self.size:
+            return (self.num_recorded + index) % self.size
+        return index
+
+    def _order(self, arr):
+        """
+        Returns the kept entries of a buffer from oldest to newest.
+        """
+        if self.retention == "last" and self.num_recorded > self.size:
+            return np.roll(arr, -(self.num_recorded % self.size), axis=0)
+        return arr[:self.length]
+
+    def _reserve(self):
+        """
+        Doubles the capacity of the buffers when they are full.
+        """
+        if self.length < len(self.iteration_numbers):
+            return
+
+        capacity = max(2 * len(self.iteration_numbers), 1)
+        iteration_numbers = np.empty(capacity, dtype=np.int64)
+        iteration_numbers[:self.length] = self.iteration_numbers[:self.length]
+        self.iteration_numbers = iteration_numbers
+        if self.spill_files is not None:
+            return
+
+        utilities = np.empty((capacity,) + self.record_shape, dtype=self.dtype)
+        policies = np.empty((capacity,) + self.record_shape, dtype=np.int8)
+        utilities[:self.length] = self.utilities[:self.length]
+        policies[:self.length] = self.policies[:self.length]
+        self.utilities = utilities
+        self.policies = policies
+
+    def _next_slot(self):
+        """
+        Counts an iteration and picks the buffer slot to record it in.
+
+        Returns:
+            int: The slot, or None when the iteration is not kept.
+        """
+        self.num_iterations += 1
+        if self.retention == "none":
+            return None
+        if self.retention == "every" and (self.num_iterations - 1) % self.size != 0:
+            return None
+
+        if self.retention == "last":
+            slot = self.num_recorded % self.size
+        else:
+            self._reserve()
+            slot = self.num_recorded
+
+        self.num_recorded += 1
+        self.length = min(self.num_recorded, len(self.iteration_numbers))
+        self.iteration_numbers[slot] = self.num_iterations
+        return slot
+
+    def append(self, util_arr, policy_arr):
+        """
+        Records the utility and policy arrays of one iteration.
+
+        Args:
+            util_arr (np.ndarray): Utility values for all states.
+            policy_arr (np.ndarray): Action indices for all states.
+        """
+        slot = self._next_slot()
+        if slot is None:
+            return
+
+        if self.cells is not None:
+            util_arr = util_arr[self.cell_cols, self.cell_rows]
+            policy_arr = policy_arr[self.cell_cols, self.cell_rows]
+        self._store(slot, util_arr, policy_arr)
+
+    def _store(self, slot, util_arr, policy_arr):
+        """
+        Writes one kept iteration to its buffer slot, or to the end of the spill files.
+
+        Args:
+            slot (int): The buffer slot.
+            util_arr (np.ndarray): Utility values of the kept cells.
+            policy_arr (np.ndarray): Action indices of the kept cells.
+        """
+        if self.spill_files is None:
+            self.utilities[slot] = util_arr
+            self.policies[slot] = policy_arr
+            return
+
+        # The memory maps no longer cover every iteration
+        self.spill_maps = None
+        utilities_file, policies_file = self.spill_files
+        utilities_file.write(np.ascontiguousarray(util_arr, dtype=self.dtype).tobytes())
+        policies_file.write(np.ascontiguousarray(policy_arr, dtype=np.int8).tobytes())
+
+    def append_utilities(self, util_arr):
+        """
+        Records a UtilityGrid as one iteration.
+
+        Args:
+            util_arr (UtilityGrid): The utilities and policy of the iteration.
+        """
+        self.append(util_arr.utilities, util_arr.actions)
+
+    def get_cells(self):
+        """
+        Returns the cells whose utilities are kept.
+
+        Returns:
+            list: (col, row) tuples.
+        """
+        if self.cells is not None:
+            return self.cells
+        return [(col, row) for col in range(self.shape[0]) for row in range(self.shape[1])]
+
+    def get_iterations(self):
+        """
+        Returns the 1-based iteration numbers of the kept iterations.
+
+        Returns:
+            np.ndarray: Iteration numbers, oldest first.
+        """
+        return self._order(self.iteration_numbers)
+
+    def get_utilities(self):
+        """
+        Returns the utilities of the kept iterations.
+
+        Returns:
+            np.ndarray: Array of shape (iterations, num_cols, num_rows), or
+                (iterations, num_cells) with the cells retention. Read-only
+                and memory-mapped when the history is spilled.
+        """
+        return self._order(self._get_buffers()[0])
+
+    def get_policies(self):
+        """
+        Returns the policies of the kept iterations.
+
+        Returns:
+            np.ndarray: Array of the same shape as get_utilities().
+        """
+        return self._order(self._get_buffers()[1])
+
+    def get_state_utilities(self, col, row):
+        """
+        Returns the utility of one state across the kept iterations.
+
+        Args:
+            col (int): Column index of the state.
+            row (int): Row index of the state.
+
+        Returns:
+            np.ndarray: Utilities of shape (iterations,).
+        """
+        if self.cells is not None:
+            if (col, row) not in self.cells:
+                raise KeyError(f"State ({col}, {row}) is not kept in the history")
+            return self.get_utilities()[:, self.cells.index((col, row))]
+        return self.get_utilities()[:, col, row]
+
+    def get_utility_array(self, index=-1, action_set=None):
+        """
+        Converts one kept iteration into a UtilityGrid.
+
+        Args:
+            index (int): Index among the kept iterations (defaults to the last one).
+            action_set (list): Actions the policy indices refer to (defaults to ACTIONS).
+
+        Returns:
+            UtilityGrid: The utilities and policy of the iteration.
+        """
+        util_arr, policy_arr = self[index]
+        return VectorizedUtilityManager.to_utility_array(util_arr, policy_arr, action_set)
+
+    def clear(self):
+        """
+        Forgets all recorded iterations, keeping the buffers.
+        """
+        self.num_iterations = 0
+        self.num_recorded = 0
+        self.length = 0
+        if self.spill_files is not None:
+            self.spill_maps = None
+            for spill_file in self.spill_files:
+                spill_file.truncate(self.HEADER_SIZE)
+            self._sync()
@@ -1,310 +1,273 @@
 """
 Fixed utility manager for MDP algorithms.
 """
-import copy
-import numpy as np
-from src.core.actions import Action
 from src.core.utility import Utility
-from src.utils.config import NUM_COLS, NUM_ROWS, PROB_INTENT, PROB_LEFT, PROB_RIGHT, DISCOUNT, K
+from src.core.utility_grid import ACTIONS
+from src.utils.config import DISCOUNT, K
 
 class UtilityManager:
     """
     Manages utilities for MDP algorithms.
+    
+    The cell-by-cell updates work on flat lists indexed by state
+    (col * num_rows + row): utility values and rewards as floats, actions as
+    indices into the action set of the transition kernel, and the outcomes
+    of every state as regrouped by get_state_successors from the successor
+    table of the environment. A backup is then a weighted sum over a few
+    list lookups, with wall and edge bounces already resolved, whatever the
+    kernel.
     """
     
     @staticmethod
-    def get_best_utility(col, row, curr_util_arr, grid):
+    def get_state_successors(successor_table, probabilities):
         """
-        Calculates the utility for each possible action and returns the action with maximum utility.
+        Regroups a successor index table by state for cell-by-cell updates.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            successor_table (np.ndarray): Table of shape (num_actions, num_outcomes,
+                num_states), as returned by GridEnvironment.get_successor_table.
+            probabilities (np.ndarray): Outcome probabilities of shape
+                (num_actions, num_outcomes), or (num_actions, num_outcomes,
+                num_states) when they differ per state.
             
         Returns:
-            Utility: The utility object with the best action and value.
+            list: successors[state][action] is the list of (probability, resulting state)
+                outcomes, in kernel order and without zero-probability outcomes.
         """
-        utilities = []
-        
-        # Calculate utility for each action
-        up_util = UtilityManager.get_action_up_utility(col, row, curr_util_arr, grid)
-        down_util = UtilityManager.get_action_down_utility(col, row, curr_util_arr, grid)
-        left_util = UtilityManager.get_action_left_utility(col, row, curr_util_arr, grid)
-        right_util = UtilityManager.get_action_right_utility(col, row, curr_util_arr, grid)
-        
-        # Create utility objects for each action
-        utilities.append(Utility(Action.UP, up_util))
-        utilities.append(Utility(Action.DOWN, down_util))
-        utilities.append(Utility(Action.LEFT, left_util))
-        utilities.append(Utility(Action.RIGHT, right_util))
-        
-        # Return the action with the highest utility
-        return max(utilities, key=lambda u: u.get_util())
+        if probabilities.ndim == 3:
+            state_probabilities = probabilities.transpose(2, 0, 1).tolist()
+        else:
+            state_probabilities = [probabilities.tolist()] * successor_table.shape[2]
+        return [
+            [[(prob, successor) for prob, successor in zip(action_probs, action_successors) if prob != 0.0]
+             for action_probs, action_successors in zip(probs, state_successors)]
+            for probs, state_successors in zip(state_probabilities, successor_table.transpose(2, 0, 1).tolist())
+        ]
     
     @staticmethod
-    def get_fixed_utility(action, col, row, action_util_arr, grid):
+    def get_best_utility(state, curr_util_arr, rewards, successors, actions=None, action_set=None):
         """
-        Calculates the utility for the given action.
+        Calculates the utility for each possible action and returns the action with maximum utility.
         
         Args:
-            action (Action): The action to calculate utility for.
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            action_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            state (int): Flattened index of the state.
+            curr_util_arr (list): Current utility values for all states.
+            rewards (list): Rewards of all states.
+            successors (list): Successors of all states, from get_state_successors.
+            actions (list): Optional subset of action indices to consider (defaults to all).
+            action_set (list): Actions the indices refer to (defaults to ACTIONS).
             
         Returns:
-            Utility: The utility object with the given action and calculated value.
+            Utility: The utility object with the best action and value.
         """
-        if action == Action.UP:
-            util = UtilityManager.get_action_up_utility(col, row, action_util_arr, grid)
-            return Utility(Action.UP, util)
-        elif action == Action.DOWN:
-            util = UtilityManager.get_action_down_utility(col, row, action_util_arr, grid)
-            return Utility(Action.DOWN, util)
-        elif action == Action.LEFT:
-            util = UtilityManager.get_action_left_utility(col, row, action_util_arr, grid)
-            return Utility(Action.LEFT, util)
-        elif action == Action.RIGHT:
-            util = UtilityManager.get_action_right_utility(col, row, action_util_arr, grid)
-            return Utility(Action.RIGHT, util)
+        if actions is None:
+            actions = range(len(successors[state]))
+        if action_set is None:
+            action_set = ACTIONS
+        utilities = UtilityManager.get_action_utilities(state, curr_util_arr, rewards, successors, actions)
         
-        return None
+        # Return the action with the highest utility
+        best = UtilityManager.get_best_index(utilities)
+        return Utility(action_set[actions[best]], utilities[best])
     
     @staticmethod
-    def estimate_next_utilities(util_arr, grid):
+    def get_best_index(utilities):
         """
-        Simplified Bellman update to produce the next utility estimate.
+        Returns the index of the highest utility, the first one on ties.
         
         Args:
-            util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            utilities (list): Utility values.
             
         Returns:
-            list: Updated utility values for all states.
+            int: Index of the highest utility.
         """
-        curr_util_arr = [[Utility() for _ in range(NUM_ROWS)] for _ in range(NUM_COLS)]
-        new_util_arr = [[Utility(util_arr[col][row].get_action(), util_arr[col][row].get_util()) 
-                        for row in range(NUM_ROWS)] for col in range(NUM_COLS)]
-        
-        k = 0
-        while k < K:
-            UtilityManager.update_utilities(new_util_arr, curr_util_arr)
-            
-            # For each state
-            for row in range(NUM_ROWS):
-                for col in range(NUM_COLS):
-                    if not grid[col][row].is_wall:
-                        # Updates the utility based on the action stated in the policy
-                        action = curr_util_arr[col][row].get_action()
-                        new_util_arr[col][row] = UtilityManager.get_fixed_utility(
-                            action, col, row, curr_util_arr, grid
-                        )
-            k += 1
-            
-        return new_util_arr
+        return max(range(len(utilities)), key=utilities.__getitem__)
     
     @staticmethod
-    def get_action_up_utility(col, row, curr_util_arr, grid):
+    def get_action_utilities(state, curr_util_arr, rewards, successors, actions=None, out=None):
         """
-        Calculates the utility for attempting to move up.
+        Calculates the utility of each of the given actions.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
+            state (int): Flattened index of the state.
             curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            rewards (list): Rewards of all states.
+            successors (list): Successors of all states, from get_state_successors.
+            actions (list): Optional subset of action indices to consider (defaults to all).
+            out (list): Optional list with one slot per action that receives the
+                utilities, so sweeps can reuse it instead of building a new list.
             
         Returns:
-            float: The utility value.
+            list: Utility values, one per action, in the order of actions.
         """
-        action_up_utility = 0.0
-        
-        # Intends to move up (80% probability)
-        action_up_utility += PROB_INTENT * UtilityManager.move_up(col, row, curr_util_arr, grid)
-        
-        # Intends to move up, but moves left instead (10% probability)
-        # Note: When facing up, left is to the west
-        action_up_utility += PROB_LEFT * UtilityManager.move_left(col, row, curr_util_arr, grid)
-        
-        # Intends to move up, but moves right instead (10% probability)
-        # Note: When facing up, right is to the east
-        action_up_utility += PROB_RIGHT * UtilityManager.move_right(col, row, curr_util_arr, grid)
-        
-        # Final utility
-        action_up_utility = grid[col][row].get_reward() + DISCOUNT * action_up_utility
-        
-        return action_up_utility
+        if actions is None:
+            actions = range(len(successors[state]))
+        if out is None:
+            out = [0.0] * len(actions)
+        
+        reward = rewards[state]
+        outcomes = successors[state]
+        for index, action in enumerate(actions):
+            # Same outcome order as the vectorized managers, so the floating point results are identical
+            expected = 0.0
+            for prob, successor in outcomes[action]:
+                expected += prob * curr_util_arr[successor]
+            out[index] = reward + DISCOUNT * expected
+        return out
     
     @staticmethod
-    def get_action_down_utility(col, row, curr_util_arr, grid):
+    def eliminate_actions(active_actions, action_utilities, span, states):
         """
-        Calculates the utility for attempting to move down.
+        Permanently drops actions that are provably suboptimal.
         
-        Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
-            
-        Returns:
-            float: The utility value.
-        """
-        action_down_utility = 0.0
-        
-        # Intends to move down (80% probability)
-        action_down_utility += PROB_INTENT * UtilityManager.move_down(col, row, curr_util_arr, grid)
-        
-        # Intends to move down, but moves right instead (10% probability)
-        # Note: When facing down, right is to the west
-        action_down_utility += PROB_LEFT * UtilityManager.move_right(col, row, curr_util_arr, grid)
+        Since U + min(d) / (1 - DISCOUNT) <= U* <= U + max(d) / (1 - DISCOUNT),
+        Q*(s, a) lies between Q(s, a) + DISCOUNT * min(d) / (1 - DISCOUNT) and
+        Q(s, a) + DISCOUNT * max(d) / (1 - DISCOUNT), with Q computed from U. An
+        action whose Q value trails the best one by more than
+        DISCOUNT * span(d) / (1 - DISCOUNT) can therefore never be optimal.
         
-        # Intends to move down, but moves left instead (10% probability)
-        # Note: When facing down, left is to the east
-        action_down_utility += PROB_RIGHT * UtilityManager.move_left(col, row, curr_util_arr, grid)
-        
-        # Final utility
-        action_down_utility = grid[col][row].get_reward() + DISCOUNT * action_down_utility
-        
-        return action_down_utility
-    
-    @staticmethod
-    def get_action_left_utility(col, row, curr_util_arr, grid):
-        """
-        Calculates the utility for attempting to move left.
+        The dropped actions are deleted from the lists of both arguments, so
+        the utility lists keep one slot per active action.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
-            
-        Returns:
-            float: The utility value.
+            active_actions (list): Active action indices of every state, updated in place.
+            action_utilities (list): Utility values of the active actions of every state,
+                computed from U, updated in place.
+            span (float): Span of TU - U, as returned by VectorizedUtilityManager.get_span_bounds.
+            states (list): Flattened indices of the non-wall states.
         """
-        action_left_utility = 0.0
-        
-        # Intends to move left (80% probability)
-        action_left_utility += PROB_INTENT * UtilityManager.move_left(col, row, curr_util_arr, grid)
-        
-        # Intends to move left, but moves down instead (10% probability)
-        # Note: When facing left, left is to the south
-        action_left_utility += PROB_LEFT * UtilityManager.move_down(col, row, curr_util_arr, grid)
+        margin = DISCOUNT * span / (1 - DISCOUNT)
         
-        # Intends to move left, but moves up instead (10% probability)
-        # Note: When facing left, right is to the north
-        action_left_utility += PROB_RIGHT * UtilityManager.move_up(col, row, curr_util_arr, grid)
-        
-        # Final utility
-        action_left_utility = grid[col][row].get_reward() + DISCOUNT * action_left_utility
-        
-        return action_left_utility
-    
-    @staticmethod
-    def get_action_right_utility(col, row, curr_util_arr, grid):
-        """
-        Calculates the utility for attempting to move right.
-        
-        Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+        for state in states:
+            actions = active_actions[state]
+            utilities = action_utilities[state]
+            best_util = max(utilities)
             
-        Returns:
-            float: The utility value.
-        """
-        action_right_utility = 0.0
-        
-        # Intends to move right (80% probability)
-        action_right_utility += PROB_INTENT * UtilityManager.move_right(col, row, curr_util_arr, grid)
-        
-        # Intends to move right, but moves up instead (10% probability)
-        # Note: When facing right, left is to the north
-        action_right_utility += PROB_LEFT * UtilityManager.move_up(col, row, curr_util_arr, grid)
-        
-        # Intends to move right, but moves down instead (10% probability)
-        # Note: When facing right, right is to the south
-        action_right_utility += PROB_RIGHT * UtilityManager.move_down(col, row, curr_util_arr, grid)
-        
-        # Final utility
-        action_right_utility = grid[col][row].get_reward() + DISCOUNT * action_right_utility
-        
-        return action_right_utility
+            # Delete from the back so the remaining indices stay valid
+            for index in range(len(actions) - 1, -1, -1):
+                if best_util - utilities[index] > margin:
+                    del actions[index]
+                    del utilities[index]
     
     @staticmethod
-    def move_up(col, row, curr_util_arr, grid):
+    def get_fixed_utility(action, state, action_util_arr, rewards, successors, action_set=None):
         """
-        Attempts to move up.
+        Calculates the utility for the given action.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            action (int): Index of the action to calculate utility for.
+            state (int): Flattened index of the state.
+            action_util_arr (list): Current utility values for all states.
+            rewards (list): Rewards of all states.
+            successors (list): Successors of all states, from get_state_successors.
+            action_set (list): Actions the indices refer to (defaults to ACTIONS).
             
         Returns:
-            float: The utility value of the resulting state.
+            Utility: The utility object with the given action and calculated value.
         """
-        if row - 1 >= 0 and not grid[col][row - 1].is_wall:
-            return curr_util_arr[col][row - 1].get_util()
-        return curr_util_arr[col][row].get_util()
+        if action_set is None:
+            action_set = ACTIONS
+        util = UtilityManager.get_action_util(action, state, action_util_arr, rewards, successors)
+        return Utility(action_set[action], util)
     
     @staticmethod
-    def move_down(col, row, curr_util_arr, grid):
+    def get_action_util(action, state, action_util_arr, rewards, successors):
         """
-        Attempts to move down.
+        Calculates the utility value of the given action without creating a Utility object.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            action (int): Index of the action to calculate utility for.
+            state (int): Flattened index of the state.
+            action_util_arr (list): Current utility values for all states.
+            rewards (list): Rewards of all states.
+            successors (list): Successors of all states, from get_state_successors.
             
         Returns:
-            float: The utility value of the resulting state.
+            float: The utility value.
         """
-        if row + 1 < NUM_ROWS and not grid[col][row + 1].is_wall:
-            return curr_util_arr[col][row + 1].get_util()
-        return curr_util_arr[col][row].get_util()
+        expected = 0.0
+        for prob, successor in successors[state][action]:
+            expected += prob * action_util_arr[successor]
+        return rewards[state] + DISCOUNT * expected
     
     @staticmethod
-    def move_left(col, row, curr_util_arr, grid):
+    def estimate_next_utilities(util_arr, policy, rewards, successors, states, next_util_arr=None, scratch_arrs=None,
+                                policy_outcomes=None):
         """
-        Attempts to move left.
+        Simplified Bellman update to produce the next utility estimate.
+        
+        The first K - 1 updates alternate between two scratch lists of
+        utility values instead of copying the utilities after every update,
+        and the last one writes next_util_arr. next_util_arr starts as a copy
+        of util_arr, but only the non-wall entries of the scratch lists are
+        written, so their wall entries must already match util_arr.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            util_arr (list): Current utility values for all states.
+            policy (list): Action index of every state.
+            rewards (list): Rewards of all states.
+            successors (list): Successors of all states, from get_state_successors.
+            states (list): Flattened indices of the non-wall states, in update order.
+            next_util_arr (list): Optional buffer that receives the updated
+                utilities (defaults to a new list).
+            scratch_arrs (tuple): Optional pair of lists for the intermediate
+                updates (defaults to two new lists).
+            policy_outcomes (list): Optional list with one slot per state in
+                states that receives the outcomes of its policy action
+                (defaults to a new list).
             
         Returns:
-            float: The utility value of the resulting state.
+            list: Updated utility values for all states, next_util_arr when given.
         """
-        if col - 1 >= 0 and not grid[col - 1][row].is_wall:
-            return curr_util_arr[col - 1][row].get_util()
-        return curr_util_arr[col][row].get_util()
+        if next_util_arr is None:
+            next_util_arr = list(util_arr)
+        else:
+            next_util_arr[:] = util_arr
+        if scratch_arrs is None:
+            scratch_arrs = (list(util_arr), list(util_arr))
+        if policy_outcomes is None:
+            policy_outcomes = [None] * len(states)
+        
+        # The outcomes of each state under its policy action
+        index = 0
+        for state in states:
+            policy_outcomes[index] = successors[state][policy[state]]
+            index += 1
+        
+        curr_util_arr = util_arr
+        k = 0
+        while k < K:
+            target_arr = next_util_arr if k == K - 1 else scratch_arrs[k % 2]
+            
+            # Updates the utility of each state based on the action stated in the policy
+            for state, outcomes in zip(states, policy_outcomes):
+                expected = 0.0
+                for prob, successor in outcomes:
+                    expected += prob * curr_util_arr[successor]
+                target_arr[state] = rewards[state] + DISCOUNT * expected
+            
+            # The last update becomes the current estimate
+            curr_util_arr = target_arr
+            k += 1
+            
+        return next_util_arr
     
     @staticmethod
-    def move_right(col, row, curr_util_arr, grid):
+    def get_flat_views(util_arr):
         """
-        Attempts to move right.
+        Returns writable flat views of the utility and action arrays of a grid.
+        
+        Indexing the views reads and writes single Python numbers straight in
+        the arrays, so cell-by-cell sweeps can update a UtilityGrid in place
+        without converting it to lists and back.
         
         Args:
-            col (int): Column index of the state.
-            row (int): Row index of the state.
-            curr_util_arr (list): Current utility values for all states.
-            grid (list): The grid environment.
+            util_arr (UtilityGrid): The grid, whose arrays must be contiguous.
             
         Returns:
-            float: The utility value of the resulting state.
+            tuple: (utility view, action view), indexed by flattened state.
         """
-        if col + 1 < NUM_COLS and not grid[col + 1][row].is_wall:
-            return curr_util_arr[col + 1][row].get_util()
-        return curr_util_arr[col][row].get_util()
+        return memoryview(util_arr.utilities.reshape(-1)), memoryview(util_arr.actions.reshape(-1))
     
     @staticmethod
     def update_utilities(src, dest):
@@ -312,9 +275,7 @@ class UtilityManager:
         Copy the contents from the source array to the destination array.
         
         Args:
-            src (list): Source array.
-            dest (list): Destination array.
+            src (UtilityGrid): Source array.
+            dest (UtilityGrid): Destination array.
         """
-        for col in range(NUM_COLS):
-            for row in range(NUM_ROWS):
-                dest[col][row] = copy.deepcopy(src[col][row])
\ No newline at end of file
+        dest.copy_from(src)
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Vectorized utility manager for MDP algorithms.
+"""
+import numpy as np
+from src.core.utility_grid import UtilityGrid, ACTIONS, NO_ACTION
+from src.utils.config import PROB_INTENT, PROB_LEFT, PROB_RIGHT, DISCOUNT
+
+# ACTIONS matches the order in which UtilityManager.get_best_utility compares
+# actions, so ties are broken the same way by np.argmax.
+
+class VectorizedUtilityManager:
+    """
+    Manages utilities for MDP algorithms using whole-grid NumPy arrays.
+
+    Utilities, rewards and the wall mask are stored as arrays of shape
+    (NUM_COLS, NUM_ROWS), indexed [col][row] like the rest of the project.
+    Policies are stored as int8 arrays of indices into ACTIONS.
+    """
+
+    @staticmethod
+    def get_move_utilities(util_arr, walls):
+        """
+        Calculates the utility of the resulting state for each move direction.
+
+        Moving into a wall or off the grid leaves the agent where it is.
+
+        Args:
+            util_arr (np.ndarray): Current utility values for all states.
+            walls (np.ndarray): Wall mask.
+
+        Returns:
+            tuple: (up, down, left, right) arrays of resulting-state utilities.
+        """
+        up = util_arr.copy()
+        up[..., :, 1:] = np.where(walls[..., :, :-1], util_arr[..., :, 1:], util_arr[..., :, :-1])
+
+        down = util_arr.copy()
+        down[..., :, :-1] = np.where(walls[..., :, 1:], util_arr[..., :, :-1], util_arr[..., :, 1:])
+
+        left = util_arr.copy()
+        left[..., 1:, :] = np.where(walls[..., :-1, :], util_arr[..., 1:, :], util_arr[..., :-1, :])
+
+        right = util_arr.copy()
+        right[..., :-1, :] = np.where(walls[..., 1:, :], util_arr[..., :-1, :], util_arr[..., 1:, :])
+
+        return up, down, left, right
+
+    @staticmethod
+    def get_action_utilities(util_arr, rewards, walls, discount=DISCOUNT, successors=None, probabilities=None):
+        """
+        Calculates the utility of every action for every state in one sweep.
+
+        With a successor table the resulting-state utilities are gathered
+        from it, which works for any transition kernel; otherwise they are
+        worked out by shifting the grid, for the default kernel only.
+
+        Args:
+            util_arr (np.ndarray): Current utility values for all states.
+            rewards (np.ndarray): Reward array.
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+            successors (np.ndarray): Optional successor index table of the
+                grid, as returned by GridEnvironment.get_successor_table
+                (gathers are fastest with np.intp indices).
+            probabilities (np.ndarray): Outcome probabilities of shape
+                (num_actions, num_outcomes), or (num_actions, num_outcomes,
+                num_states) for per-state weights, required with successors.
+
+        Returns:
+            np.ndarray: Action utilities of shape (num_actions,) + util_arr.shape,
+                in the action order of the kernel (ACTIONS by default).
+        """
+        if successors is not None:
+            flat = util_arr.reshape(util_arr.shape[:-2] + (-1,))
+            action_utils = VectorizedUtilityManager.get_expected_utilities(flat, successors, probabilities)
+            return rewards + discount * action_utils.reshape((len(successors),) + util_arr.shape)
+
+        action_utils = np.empty((len(ACTIONS),) + util_arr.shape, dtype=np.float64)
+
+        up, down, left, right = VectorizedUtilityManager.get_move_utilities(util_arr, walls)
+
+        # Same outcome order as the default kernel, so the floating point
+        # results are identical to the successor table path
+        action_utils[0] = PROB_INTENT * up + PROB_LEFT * left + PROB_RIGHT * right
+        action_utils[1] = PROB_INTENT * down + PROB_LEFT * right + PROB_RIGHT * left
+        action_utils[2] = PROB_INTENT * left + PROB_LEFT * down + PROB_RIGHT * up
+        action_utils[3] = PROB_INTENT * right + PROB_LEFT * up + PROB_RIGHT * down
+
+        return rewards + discount * action_utils
+
+    @staticmethod
+    def get_expected_utilities(util_vec, successors, probabilities):
+        """
+        Calculates the expected next-state utility of every action through a successor table.
+
+        Args:
+            util_vec (np.ndarray): Flattened utility values of all states,
+                with any leading batch axes.
+            successors (np.ndarray): Successor index table of shape
+                (num_actions, num_outcomes, num_updated), for all states or a
+                subset of them.
+            probabilities (np.ndarray): Outcome probabilities of shape
+                (num_actions, num_outcomes), or (num_actions, num_outcomes,
+                num_updated) for per-state weights.
+
+        Returns:
+            np.ndarray: Expected utilities of shape
+                (num_actions,) + util_vec.shape[:-1] + (num_updated,).
+        """
+        expected_utils = np.empty(
+            (len(successors),) + util_vec.shape[:-1] + (successors.shape[-1],), dtype=np.float64
+        )
+        for index, (action_successors, action_probs) in enumerate(zip(successors, probabilities)):
+            # Outcomes are added in kernel order, so the default kernel matches the grid shifts.
+            # Per-state weights are applied as they are, zero or not.
+            # The gathered utilities are scaled in place to save a temporary.
+            expected = util_vec.take(action_successors[0], axis=-1)
+            expected *= action_probs[0]
+            for outcome in range(1, len(action_probs)):
+                weights = action_probs[outcome]
+                if weights.ndim or weights != 0.0:
+                    gathered = util_vec.take(action_successors[outcome], axis=-1)
+                    gathered *= weights
+                    expected += gathered
+            expected_utils[index] = expected
+        return expected_utils
+
+    @staticmethod
+    def get_best_state_utilities(util_vec, rewards, successors, probabilities, discount=DISCOUNT):
+        """
+        Calculates the maximum utility and the corresponding action for a subset of the states.
+
+        Args:
+            util_vec (np.ndarray): Flattened utility values of all states.
+            rewards (np.ndarray): Rewards of the updated states.
+            successors (np.ndarray): Successor table columns of the updated
+                states, of shape (num_actions, num_outcomes, num_updated).
+            probabilities (np.ndarray): Outcome probabilities, restricted to
+                the updated states when they are per-state.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (best_util, best_policy) arrays of the updated states.
+        """
+        action_utils = rewards + discount * VectorizedUtilityManager.get_expected_utilities(
+            util_vec, successors, probabilities
+        )
+        return np.max(action_utils, axis=0), np.argmax(action_utils, axis=0).astype(np.int8)
+
+    @staticmethod
+    def get_best_utilities(util_arr, rewards, walls, discount=DISCOUNT, successors=None, probabilities=None):
+        """
+        Calculates the maximum utility and the corresponding action for every state.
+
+        Args:
+            util_arr (np.ndarray): Current utility values for all states.
+            rewards (np.ndarray): Reward array.
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+            successors (np.ndarray): Optional successor index table of the grid.
+            probabilities (np.ndarray): Outcome probabilities, required with successors.
+
+        Returns:
+            tuple: (best_util, best_policy) arrays. Walls keep a utility of 0 and NO_ACTION.
+        """
+        action_utils = VectorizedUtilityManager.get_action_utilities(
+            util_arr, rewards, walls, discount, successors, probabilities
+        )
+        best_policy = np.argmax(action_utils, axis=0).astype(np.int8)
+        best_util = np.max(action_utils, axis=0)
+
+        best_util[walls] = 0.0
+        best_policy[walls] = NO_ACTION
+
+        return best_util, best_policy
+
+    @staticmethod
+    def get_max_delta(new_util_arr, curr_util_arr, walls, out=None):
+        """
+        Calculates the largest utility change over all non-wall states.
+
+        Args:
+            new_util_arr (np.ndarray): Updated utility values.
+            curr_util_arr (np.ndarray): Previous utility values.
+            walls (np.ndarray): Wall mask.
+            out (np.ndarray): Optional scratch array of the same shape that
+                receives the changes, so sweeps can reuse it.
+
+        Returns:
+            float: The maximum absolute change.
+        """
+        if walls.all():
+            return float('-inf')
+        if out is None:
+            return float(np.max(np.abs(new_util_arr - curr_util_arr)[~walls]))
+
+        # Changes are never negative, so zeroing the walls leaves the maximum alone
+        np.subtract(new_util_arr, curr_util_arr, out=out)
+        np.abs(out, out=out)
+        out[walls] = 0.0
+        return float(np.max(out))
+
+    @staticmethod
+    def get_span_bounds(new_util_arr, curr_util_arr, walls, discount=DISCOUNT):
+        """
+        Calculates the MacQueen bounds on the optimal utilities.
+
+        With d = new - curr over all non-wall states, the optimal utilities satisfy
+        new + discount * min(d) / (1 - discount) <= U* <= new + discount * max(d) / (1 - discount).
+
+        Args:
+            new_util_arr (np.ndarray): Updated utility values.
+            curr_util_arr (np.ndarray): Previous utility values.
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+
+        Returns:
+            tuple: (span, lower_bounds, upper_bounds), where span is max(d) - min(d).
+                Walls get bounds of 0.
+        """
+        if walls.all():
+            return 0.0, np.zeros(walls.shape), np.zeros(walls.shape)
+
+        diff = (new_util_arr - curr_util_arr)[~walls]
+        min_diff = float(np.min(diff))
+        max_diff = float(np.max(diff))
+
+        lower_bounds = np.where(walls, 0.0, new_util_arr + discount * min_diff / (1 - discount))
+        upper_bounds = np.where(walls, 0.0, new_util_arr + discount * max_diff / (1 - discount))
+        return max_diff - min_diff, lower_bounds, upper_bounds
+
+    @staticmethod
+    def get_bound_midpoint(new_util_arr, curr_util_arr, walls, discount=DISCOUNT):
+        """
+        Calculates the midpoint of the MacQueen bounds on the optimal utilities.
+
+        With d = new - curr over all non-wall states, this is
+        new + discount * (min(d) + max(d)) / (2 * (1 - discount)), which is
+        within half the gap between the bounds of the optimal utilities.
+
+        Args:
+            new_util_arr (np.ndarray): Updated utility values.
+            curr_util_arr (np.ndarray): Previous utility values.
+            walls (np.ndarray): Wall mask.
+            discount (float): Discount factor.
+
+        Returns:
+            np.ndarray: The midpoint utilities. Walls get 0.
+        """
+        if walls.all():
+            return np.zeros(walls.shape)
+
+        diff = (new_util_arr - curr_util_arr)[~walls]
+        shift = discount * (float(np.min(diff)) + float(np.max(diff))) / (2 * (1 - discount))
+        return np.where(walls, 0.0, new_util_arr + shift)
+
+    @staticmethod
+    def to_utility_array(util_arr, policy_arr, action_set=None):
+        """
+        Converts utility and policy arrays into a UtilityGrid.
+
+        Args:
+            util_arr (np.ndarray): Utility values for all states.
+            policy_arr (np.ndarray): Action indices for all states.
+            action_set (list): Actions the indices refer to (defaults to ACTIONS).
+
+        Returns:
+            UtilityGrid: A grid holding copies of the arrays.
+        """
+        return UtilityGrid(
+            np.array(util_arr, dtype=np.float64), np.array(policy_arr, dtype=np.int8), action_set=action_set
+        )
@@ -0,0 +1,24 @@
+"""
+Shared fixtures for the test suite.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.grid_environment import GridEnvironment
+from src.algorithms.linear_programming import LinearProgramming
+
+
+@pytest.fixture
+def env():
+    """The assignment's 6x6 grid environment."""
+    return GridEnvironment()
+
+
+@pytest.fixture
+def optimal(env):
+    """The exact optimal utilities and policy of the default grid, solved as a linear program."""
+    return LinearProgramming(env).run()
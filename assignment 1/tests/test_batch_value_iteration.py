@@ -0,0 +1,92 @@
+"""
+Tests that batched value iteration matches separate value iteration runs.
+"""
+import functools
+import types
+
+import numpy as np
+import pytest
+
+import src.algorithms.value_iteration as value_iteration
+from src.algorithms.batch_value_iteration import BatchValueIteration
+from src.algorithms.value_iteration import ValueIteration
+from src.core.actions import Action
+from src.core.grid_environment import GridEnvironment
+from src.core.transition_kernel import TransitionKernel
+from src.utils import config
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager
+
+
+def make_environment(seed, size=8):
+    """A random size x size grid with the given seed."""
+    grid_config = types.ModuleType("grid_config")
+    grid_config.__dict__.update(config.__dict__)
+    grid_config.NUM_COLS = grid_config.NUM_ROWS = size
+    return GridEnvironment(grid_config, use_ratios=True, seed=seed)
+
+
+def run_value_iteration(env, discount, monkeypatch):
+    """A numpy-backend ValueIteration run, with the configured discount patched to the given one."""
+    with monkeypatch.context() as patch:
+        patch.setattr(value_iteration, "DISCOUNT", discount)
+        patch.setattr(VectorizedUtilityManager, "get_best_utilities", staticmethod(
+            functools.partial(VectorizedUtilityManager.get_best_utilities, discount=discount)
+        ))
+        vi = ValueIteration(env, backend="numpy")
+        return vi.run(), vi.iterations
+
+
+@pytest.fixture
+def environments():
+    """Grids with different rewards and walls."""
+    return [make_environment(seed) for seed in range(3)]
+
+
+def test_matches_separate_runs(environments, monkeypatch):
+    discounts = np.array([0.9, 0.95, config.DISCOUNT])
+    rewards, walls = BatchValueIteration.stack_environments(environments)
+    assert not (walls[0] == walls[1]).all()
+
+    batch = BatchValueIteration(rewards, walls, discounts)
+    batch.run()
+
+    for index, (env, discount) in enumerate(zip(environments, discounts)):
+        expected, iterations = run_value_iteration(env, discount, monkeypatch)
+        result = batch.get_utility_array(index)
+
+        assert batch.iterations[index] == iterations
+        assert np.array_equal(result.utilities, expected.utilities)
+        assert np.array_equal(result.actions, expected.actions)
+
+
+def test_converged_scenario_stops_changing(environments):
+    rewards, walls = BatchValueIteration.stack_environments(environments[:2])
+    batch = BatchValueIteration(rewards, walls, [0.5, config.DISCOUNT])
+    util_arr, policy_arr = batch.run()
+
+    # The first scenario leaves the batch long before the second one
+    assert batch.iterations[0] < batch.iterations[1]
+    assert batch.active_counts[0] == 2 and batch.active_counts[-1] == 1
+    assert len(batch.active_counts) == batch.iterations[1]
+
+    # and keeps the result it had when it converged
+    alone = BatchValueIteration(rewards[:1], walls[:1], 0.5)
+    alone_util_arr, alone_policy_arr = alone.run()
+    assert alone.iterations[0] == batch.iterations[0]
+    assert np.array_equal(util_arr[0], alone_util_arr[0])
+    assert np.array_equal(policy_arr[0], alone_policy_arr[0])
+
+
+def test_shared_walls_and_discount_broadcast(env):
+    rewards = np.stack([env.get_reward_array(), 2.0 * env.get_reward_array()])
+    batch = BatchValueIteration(rewards, env.get_wall_mask())
+    util_arr, _ = batch.run()
+
+    expected = ValueIteration(env, backend="numpy").run()
+    assert np.array_equal(util_arr[0], expected.utilities)
+
+
+def test_rejects_non_default_kernel(environments):
+    environments[0].set_kernel(TransitionKernel.slip(actions=list(Action)))
+    with pytest.raises(ValueError):
+        BatchValueIteration.stack_environments(environments)
@@ -0,0 +1,26 @@
+"""
+Tests that discount continuation reaches the optimal utilities at the final discount.
+"""
+import numpy as np
+import pytest
+
+from src.algorithms.discount_continuation import DiscountContinuation
+from src.utils.config import DISCOUNT, EPSILON
+
+DISCOUNTS = [0.9, 0.95, 0.98, DISCOUNT]
+
+
+@pytest.mark.parametrize("method, tolerance", [("value", EPSILON), ("policy", 1e-6)])
+def test_final_discount_reaches_optimal_utilities(env, optimal, method, tolerance):
+    solver = DiscountContinuation(env, DISCOUNTS, method=method)
+    results = solver.run()
+    result = solver.get_utility_array(len(DISCOUNTS) - 1)
+
+    assert [r['discount'] for r in results] == DISCOUNTS
+    assert np.max(np.abs(result.utilities - optimal.utilities)) < tolerance
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+def test_rejects_decreasing_discounts(env):
+    with pytest.raises(ValueError):
+        DiscountContinuation(env, [DISCOUNT, 0.9])
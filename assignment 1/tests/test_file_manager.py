@@ -0,0 +1,30 @@
+"""
+Tests for writing utility histories to CSV.
+"""
+import csv
+
+import numpy as np
+import pytest
+
+from src.utils.file_manager import FileManager
+from src.utils.utility_history import UtilityHistory
+
+SHAPE = (6, 6)
+
+
+@pytest.mark.parametrize("retention, cells", [("full", None), ("cells", [(0, 0), (2, 3), (5, 5)])])
+def test_csv_rows_match_state_utilities(tmp_path, monkeypatch, retention, cells):
+    monkeypatch.chdir(tmp_path)
+    history = UtilityHistory(SHAPE, retention=retention, cells=cells, path=str(tmp_path / "spill"))
+    rng = np.random.default_rng(0)
+    for _ in range(12):
+        history.append(rng.normal(size=SHAPE), np.zeros(SHAPE, dtype=np.int8))
+
+    FileManager.write_to_file(history, "history")
+
+    with open(tmp_path / "output" / "history.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == len(history.get_cells())
+    for (col, row), csv_row in zip(history.get_cells(), rows):
+        assert csv_row == [f"{val:.3f}" for val in history.get_state_utilities(col, row)]
+    assert (tmp_path / "output" / "history_key_states_plot.png").exists()
@@ -0,0 +1,27 @@
+"""
+Tests that the linear program solves the Bellman optimality equations.
+"""
+import numpy as np
+import pytest
+
+from src.algorithms.linear_programming import LinearProgramming
+
+
+def test_solution_is_bellman_fixed_point(env, optimal):
+    walls = env.get_wall_mask()
+    best_util_arr, best_policy_arr = env.get_transition_model().get_best_utilities(optimal.utilities)
+
+    assert np.max(np.abs(best_util_arr - optimal.utilities)[~walls]) < 1e-6
+    assert np.array_equal(best_policy_arr[~walls], optimal.actions[~walls])
+
+
+@pytest.mark.parametrize("method", ["highs-ds", "highs-ipm"])
+def test_methods_agree(env, optimal, method):
+    result = LinearProgramming(env, method=method).run()
+
+    assert np.allclose(result.utilities, optimal.utilities, rtol=0.0, atol=1e-6)
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+def test_max_error_of_optimal_utilities_is_zero(env, optimal):
+    assert LinearProgramming(env).get_max_error(optimal) < 1e-6
@@ -0,0 +1,39 @@
+"""
+Tests for multigrid value iteration.
+"""
+import numpy as np
+
+from src.algorithms.multigrid_value_iteration import MultigridValueIteration
+from src.algorithms.value_iteration import ValueIteration
+from src.utils.config import EPSILON
+
+
+def test_reaches_optimal_utilities(env, optimal):
+    result = MultigridValueIteration(env).run()
+
+    assert np.abs(result.utilities - optimal.utilities).max() < EPSILON
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+def test_needs_fewer_sweeps_than_value_iteration(env):
+    solver = MultigridValueIteration(env)
+    solver.run()
+    vi = ValueIteration(env, backend="numpy", retention="none")
+    vi.run()
+
+    assert sum(stats['sweeps'] for stats in solver.level_stats) < vi.iterations / 10
+
+
+def test_restrict_and_prolong_keep_walls():
+    rewards = np.arange(15, dtype=np.float64).reshape(5, 3)
+    walls = np.zeros((5, 3), dtype=bool)
+    walls[0:2, 0:2] = True
+
+    coarse_rewards, coarse_walls = MultigridValueIteration.restrict(rewards, walls)
+    assert coarse_walls.shape == (3, 2)
+    assert coarse_walls[0, 0]
+    assert coarse_rewards[2, 1] == rewards[4, 2]
+
+    fine = MultigridValueIteration.prolong(np.ones(coarse_walls.shape), walls)
+    assert fine.shape == walls.shape
+    assert np.all(fine[walls] == 0.0) and np.all(fine[~walls] == 1.0)
@@ -0,0 +1,53 @@
+"""
+Tests for the shared-memory parallel sweeper.
+"""
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from src.utils.parallel_sweeper import ParallelSweeper
+from src.utils.vectorized_utility_manager import VectorizedUtilityManager
+
+
+def test_sweep_matches_numpy(env):
+    rewards = env.get_reward_array()
+    walls = env.get_wall_mask()
+    with ParallelSweeper(rewards, walls, num_workers=3) as sweeper:
+        sweeper.sweep(0)
+        expected, policy = VectorizedUtilityManager.get_best_utilities(np.zeros(walls.shape), rewards, walls)
+        assert np.array_equal(sweeper.util_bufs[1], expected)
+        assert np.array_equal(sweeper.policy_bufs[1], policy)
+
+
+def test_dead_worker_raises_instead_of_hanging(env):
+    sweeper = ParallelSweeper(env.get_reward_array(), env.get_wall_mask(), num_workers=2, timeout=5.0)
+    try:
+        sweeper.sweep(0)
+        sweeper.workers[0].kill()
+        sweeper.workers[0].join()
+
+        start = time.time()
+        with pytest.raises(RuntimeError, match="exit codes"):
+            sweeper.sweep(1)
+        assert time.time() - start < 5.0
+        assert all(not worker.is_alive() for worker in sweeper.workers)
+    finally:
+        start = time.time()
+        sweeper.close()
+        assert time.time() - start < 5.0
+
+
+def test_unresponsive_worker_times_out(env):
+    sweeper = ParallelSweeper(env.get_reward_array(), env.get_wall_mask(), num_workers=2, timeout=1.0)
+    try:
+        os.kill(sweeper.workers[1].pid, signal.SIGSTOP)
+        start = time.time()
+        with pytest.raises(RuntimeError, match="did not finish"):
+            sweeper.sweep(0)
+        assert time.time() - start < 5.0
+    finally:
+        sweeper.close()
+        sweeper.close()
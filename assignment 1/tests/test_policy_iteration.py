@@ -0,0 +1,28 @@
+"""
+Tests that every policy evaluation method reaches the optimal policy.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from src.algorithms.policy_iteration import PolicyIteration
+
+
+@pytest.mark.parametrize("evaluation", ["direct", "krylov"])
+def test_exact_evaluation_reaches_optimal_utilities(env, optimal, evaluation):
+    random.seed(0)
+    result = PolicyIteration(env, evaluation=evaluation).run()
+
+    assert np.allclose(result.utilities, optimal.utilities, rtol=0.0, atol=1e-6)
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+@pytest.mark.parametrize("evaluation", ["iterative", "adaptive"])
+def test_approximate_evaluation_reaches_optimal_policy(env, optimal, evaluation):
+    random.seed(0)
+    result = PolicyIteration(env, evaluation=evaluation).run()
+
+    # Truncated evaluation stops once the policy is stable, not at U*
+    assert np.array_equal(result.actions, optimal.actions)
+
@@ -0,0 +1,60 @@
+"""
+Tests for prioritized sweeping and its incremental repair.
+"""
+import numpy as np
+import pytest
+
+import src.algorithms.prioritized_sweeping as prioritized_sweeping
+from src.algorithms.linear_programming import LinearProgramming
+from src.algorithms.prioritized_sweeping import PrioritizedSweeping
+from src.algorithms.value_iteration import ValueIteration
+from src.utils.config import EPSILON
+
+EDITS = [(3, 3, -0.04, True), (1, 4, 1.0, False)]
+
+
+@pytest.fixture(params=["numba", "python"])
+def backend(request, monkeypatch):
+    """Runs a test with the compiled sweep and with the pure Python one."""
+    if request.param == "python":
+        monkeypatch.setattr(prioritized_sweeping, "HAS_NUMBA", False)
+    return request.param
+
+
+def test_reaches_optimal_utilities(env, optimal, backend):
+    result = PrioritizedSweeping(env).run()
+
+    assert np.abs(result.utilities - optimal.utilities).max() < EPSILON
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+def test_fewer_backups_than_value_iteration(env, backend):
+    solver = PrioritizedSweeping(env)
+    solver.run()
+    vi = ValueIteration(env, backend="numpy", retention="none")
+    vi.run()
+
+    num_states = int(np.count_nonzero(~env.get_wall_mask()))
+    assert solver.backups < vi.iterations * num_states
+
+
+def test_residuals_end_below_threshold(env, backend):
+    solver = PrioritizedSweeping(env)
+    solver.run()
+
+    assert max(solver.priority) < solver.converge_threshold
+
+
+def test_repair_matches_fresh_solve(env, backend):
+    solver = PrioritizedSweeping(env)
+    solver.run()
+    repaired = solver.repair(EDITS)
+
+    optimal = LinearProgramming(env).run()
+    fresh_solver = PrioritizedSweeping(env)
+    fresh = fresh_solver.run()
+
+    assert np.abs(repaired.utilities - optimal.utilities).max() < EPSILON
+    assert np.abs(repaired.utilities - fresh.utilities).max() < EPSILON
+    assert np.array_equal(repaired.actions, fresh.actions)
+    assert solver.backups < fresh_solver.backups
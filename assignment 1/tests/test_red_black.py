@@ -0,0 +1,38 @@
+"""
+Tests for the red-black update ordering of value iteration.
+"""
+import numpy as np
+import pytest
+
+from src.algorithms.value_iteration import ValueIteration
+from src.core.actions import Action
+from src.core.transition_kernel import TransitionKernel
+
+
+@pytest.mark.parametrize("backend", ["numpy", "sparse"])
+def test_red_black_matches_object_backend(env, backend):
+    reference = ValueIteration(env, ordering="red_black")
+    expected = reference.run()
+    vi = ValueIteration(env, backend=backend, ordering="red_black")
+    result = vi.run()
+
+    assert vi.iterations == reference.iterations
+    assert np.allclose(result.utilities, expected.utilities, rtol=0.0, atol=1e-9)
+    assert np.array_equal(result.actions, expected.actions)
+
+
+def test_red_black_with_terrain_matches_object_backend(env):
+    shape = env.get_wall_mask().shape
+    env.set_slip_maps(np.full(shape, 0.7), np.full(shape, 0.1), np.full(shape, 0.1), stay=np.full(shape, 0.1))
+    expected = ValueIteration(env, ordering="red_black").run()
+    result = ValueIteration(env, backend="numpy", ordering="red_black").run()
+
+    assert np.array_equal(result.utilities, expected.utilities)
+    assert np.array_equal(result.actions, expected.actions)
+
+
+def test_red_black_rejects_diagonal_kernels(env):
+    env.set_kernel(TransitionKernel.slip(actions=list(Action)))
+    assert not env.kernel.is_checkerboard()
+    with pytest.raises(ValueError, match="checkerboard"):
+        ValueIteration(env, ordering="red_black")
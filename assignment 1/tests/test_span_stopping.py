@@ -0,0 +1,30 @@
+"""
+Tests for the span stopping rule of value iteration.
+"""
+import numpy as np
+import pytest
+
+from src.algorithms.value_iteration import ValueIteration
+from src.utils.config import EPSILON
+
+
+@pytest.mark.parametrize("backend", ["object", "numpy", "sparse", "numba", "parallel"])
+def test_span_stopped_utilities_lie_within_bounds(env, optimal, backend):
+    vi = ValueIteration(env, backend=backend, stopping="span", num_workers=2)
+    result = vi.run()
+    walls = env.get_wall_mask()
+
+    assert np.all(vi.lower_bounds[~walls] <= optimal.utilities[~walls] + 1e-9)
+    assert np.all(optimal.utilities[~walls] <= vi.upper_bounds[~walls] + 1e-9)
+    assert np.all(vi.lower_bounds[~walls] <= result.utilities[~walls])
+    assert np.all(result.utilities[~walls] <= vi.upper_bounds[~walls])
+    assert np.abs(result.utilities - optimal.utilities).max() < EPSILON
+    assert np.array_equal(result.actions, optimal.actions)
+
+
+def test_span_history_records_returned_utilities(env):
+    vi = ValueIteration(env, backend="numpy", stopping="span")
+    result = vi.run()
+
+    assert np.array_equal(vi.history[-1][0], result.utilities)
+    assert not np.array_equal(vi.raw_utilities, result.utilities)
@@ -0,0 +1,98 @@
+"""
+Tests that solvers agree with the linear program under non-default transition kernels.
+"""
+import numpy as np
+import pytest
+
+from src.algorithms.linear_programming import LinearProgramming
+from src.algorithms.policy_iteration import PolicyIteration
+from src.algorithms.value_iteration import ValueIteration
+from src.core.actions import Action
+from src.core.transition_kernel import TerrainKernel, TransitionKernel
+from src.utils.config import EPSILON
+
+
+def solve_exact(env):
+    """Solves the environment as a linear program."""
+    return LinearProgramming(env).run()
+
+
+def assert_greedy(env, result, optimal):
+    """Asserts that every action of result is optimal with respect to U* (ties allowed)."""
+    walls = env.get_wall_mask()
+    action_utils = env.get_transition_model().get_action_utilities(optimal.utilities)
+    chosen = np.take_along_axis(action_utils, np.maximum(result.actions, 0)[np.newaxis].astype(np.intp), axis=0)[0]
+    assert np.all((action_utils.max(axis=0) - chosen)[~walls] < 1e-6)
+
+
+@pytest.fixture
+def diagonal_env(env):
+    """The default grid with all eight moves."""
+    env.set_kernel(TransitionKernel.slip(actions=list(Action)))
+    return env
+
+
+@pytest.mark.parametrize("backend", ["object", "numpy", "sparse", "numba"])
+def test_diagonal_value_iteration_matches_lp(diagonal_env, backend):
+    optimal = solve_exact(diagonal_env)
+    vi = ValueIteration(diagonal_env, backend=backend)
+    result = vi.run()
+
+    assert np.max(np.abs(result.utilities - optimal.utilities)) < EPSILON + vi.converge_threshold
+    assert_greedy(diagonal_env, result, optimal)
+
+
+def test_diagonal_policy_iteration_matches_lp(diagonal_env):
+    optimal = solve_exact(diagonal_env)
+    result = PolicyIteration(diagonal_env, evaluation="direct").run()
+
+    assert np.allclose(result.utilities, optimal.utilities, rtol=0.0, atol=1e-6)
+    assert_greedy(diagonal_env, result, optimal)
+
+
+def test_terrain_matches_lp(env):
+    terrain = np.random.default_rng(0).integers(0, 2, size=env.get_wall_mask().shape)
+    env.set_terrain(terrain, [TransitionKernel.slip(), TransitionKernel.slip(intent=0.6, stay=0.2)])
+    optimal = solve_exact(env)
+
+    vi = ValueIteration(env, backend="numpy")
+    result = vi.run()
+    assert np.max(np.abs(result.utilities - optimal.utilities)) < EPSILON + vi.converge_threshold
+    assert_greedy(env, result, optimal)
+
+    result = PolicyIteration(env, evaluation="direct").run()
+    assert np.allclose(result.utilities, optimal.utilities, rtol=0.0, atol=1e-6)
+
+
+def test_slip_maps_match_lp(env):
+    shape = env.get_wall_mask().shape
+    intent = np.linspace(0.5, 0.9, shape[0] * shape[1]).reshape(shape)
+    env.set_slip_maps(intent, (1.0 - intent) / 2, (1.0 - intent) / 2)
+    optimal = solve_exact(env)
+
+    vi = ValueIteration(env, backend="sparse")
+    result = vi.run()
+    assert np.max(np.abs(result.utilities - optimal.utilities)) < EPSILON + vi.converge_threshold
+    assert_greedy(env, result, optimal)
+
+
+def test_kernels_are_hashable():
+    diagonal = TransitionKernel.slip(actions=list(Action))
+    kernels = {TransitionKernel.slip(): "default", TransitionKernel.slip(): "default", diagonal: "diagonal"}
+    assert len(kernels) == 2
+    assert kernels[TransitionKernel.slip(actions=list(Action))] == "diagonal"
+
+    # Reordering the actions changes what policy indices mean
+    reordered = TransitionKernel.slip(actions=list(reversed(list(Action))))
+    assert reordered != diagonal
+
+
+def test_terrain_kernels_are_hashable():
+    terrain = np.array([[0, 1], [1, 0]])
+    kernels = [TransitionKernel.slip(), TransitionKernel.slip(intent=0.6, stay=0.2)]
+    first = TerrainKernel(terrain, kernels)
+    second = TerrainKernel(terrain.astype(np.int32), list(kernels))
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second, TerrainKernel(1 - terrain, kernels)}) == 2
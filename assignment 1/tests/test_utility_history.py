@@ -0,0 +1,107 @@
+"""
+Tests for the utility history and its retention modes.
+"""
+import numpy as np
+import pytest
+
+from src.utils.utility_history import UtilityHistory
+
+SHAPE = (3, 2)
+NUM_ITERATIONS = 40
+
+
+def record(history, num_iterations=NUM_ITERATIONS):
+    """Appends iterations whose utilities all equal the 1-based iteration number."""
+    for iteration in range(1, num_iterations + 1):
+        history.append(np.full(SHAPE, float(iteration)), np.full(SHAPE, iteration % 4, dtype=np.int8))
+    return history
+
+
+@pytest.fixture(params=[False, True], ids=["memory", "spilled"])
+def path(request, tmp_path):
+    """Runs a test with an in-memory history and with one spilled to disk."""
+    return str(tmp_path / "history") if request.param else None
+
+
+def test_full_keeps_every_iteration(path):
+    history = record(UtilityHistory(SHAPE, path=path))
+
+    assert len(history) == NUM_ITERATIONS
+    assert np.array_equal(history.get_iterations(), np.arange(1, NUM_ITERATIONS + 1))
+    assert np.array_equal(history.get_state_utilities(2, 1), np.arange(1, NUM_ITERATIONS + 1))
+    util_arr, policy_arr = history[-1]
+    assert np.all(util_arr == NUM_ITERATIONS) and np.all(policy_arr == NUM_ITERATIONS % 4)
+
+
+def test_every_keeps_decimated_iterations(path):
+    history = record(UtilityHistory(SHAPE, retention="every", size=7, path=path))
+
+    assert np.array_equal(history.get_iterations(), np.arange(1, NUM_ITERATIONS + 1, 7))
+    assert np.array_equal(history.get_utilities()[:, 0, 0], np.arange(1, NUM_ITERATIONS + 1, 7))
+
+
+def test_cells_keeps_selected_cells(path):
+    history = record(UtilityHistory(SHAPE, retention="cells", cells=[(0, 1), (2, 0)], path=path))
+
+    assert history.get_utilities().shape == (NUM_ITERATIONS, 2)
+    assert np.array_equal(history.get_state_utilities(2, 0), np.arange(1, NUM_ITERATIONS + 1))
+    with pytest.raises(KeyError):
+        history.get_state_utilities(1, 1)
+
+
+def test_last_keeps_a_ring_of_iterations():
+    history = record(UtilityHistory(SHAPE, retention="last", size=5))
+
+    assert len(history) == 5
+    assert np.array_equal(history.get_iterations(), np.arange(NUM_ITERATIONS - 4, NUM_ITERATIONS + 1))
+    assert np.array_equal(history.get_state_utilities(0, 0), np.arange(NUM_ITERATIONS - 4, NUM_ITERATIONS + 1))
+    assert history.get_utility_array(-1).utilities[0, 0] == NUM_ITERATIONS
+
+
+def test_none_only_counts_iterations():
+    history = record(UtilityHistory(SHAPE, retention="none"))
+
+    assert len(history) == 0
+    assert history.num_iterations == NUM_ITERATIONS
+    assert history.nbytes == 0
+
+
+def test_spilled_history_reads_back_after_close(tmp_path):
+    path = str(tmp_path / "history")
+    history = record(UtilityHistory(SHAPE, path=path))
+    history.close()
+
+    assert np.load(f"{path}_utilities.npy").shape == (NUM_ITERATIONS,) + SHAPE
+    assert np.array_equal(history.get_state_utilities(1, 1), np.arange(1, NUM_ITERATIONS + 1))
+    assert history.disk_nbytes == NUM_ITERATIONS * 6 * 9
+
+
+def test_spilled_reads_share_one_memory_map_until_the_next_append(tmp_path):
+    history = record(UtilityHistory(SHAPE, path=str(tmp_path / "history")))
+
+    first = history.get_utilities()
+    assert np.shares_memory(history.get_utilities(), first)
+    history.append(np.zeros(SHAPE), np.zeros(SHAPE, dtype=np.int8))
+    assert len(history.get_utilities()) == NUM_ITERATIONS + 1
+
+
+def test_buffers_grow_geometrically_from_a_small_start():
+    history = UtilityHistory(SHAPE)
+    assert len(history.iteration_numbers) == UtilityHistory.INITIAL_CAPACITY
+
+    record(history)
+    assert len(history.iteration_numbers) == 64
+    assert history.nbytes == NUM_ITERATIONS * (6 * 9 + 8)
+    assert history.allocated_nbytes == 64 * (6 * 9 + 8)
+
+
+def test_first_buffers_are_capped_in_bytes():
+    shape = (1024, 1024)
+    history = UtilityHistory(shape)
+
+    assert history.allocated_nbytes <= UtilityHistory.INITIAL_NBYTES + 64
+    assert len(history.iteration_numbers) >= 1
+    history.append(np.zeros(shape), np.zeros(shape, dtype=np.int8))
+    history.append(np.ones(shape), np.ones(shape, dtype=np.int8))
+    assert np.array_equal(history.get_iterations(), [1, 2])
+    assert history[1][0][5, 5] == 1.0
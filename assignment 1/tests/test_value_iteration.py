@@ -0,0 +1,77 @@
+"""
+Tests that every value iteration backend and ordering agrees with the object backend.
+"""
+import numpy as np
+import pytest
+
+import src.algorithms.value_iteration as value_iteration
+from src.algorithms.value_iteration import ValueIteration
+from src.utils.config import EPSILON
+
+
+@pytest.fixture
+def reference(env):
+    """The object backend's Jacobi solve with its iteration count."""
+    vi = ValueIteration(env)
+    return vi.run(), vi.iterations
+
+
+@pytest.mark.parametrize("backend", ["numpy", "sparse", "numba", "parallel"])
+def test_backend_matches_object_backend(env, reference, backend):
+    expected, iterations = reference
+    vi = ValueIteration(env, backend=backend, num_workers=2)
+    result = vi.run()
+
+    assert vi.iterations == iterations
+    assert np.allclose(result.utilities, expected.utilities, rtol=0.0, atol=1e-9)
+    assert np.array_equal(result.actions, expected.actions)
+    assert len(vi.history) == iterations
+
+
+def test_numba_backend_warns_without_numba(env, reference, monkeypatch):
+    monkeypatch.setattr(value_iteration, "HAS_NUMBA", False)
+    with pytest.warns(RuntimeWarning, match="Numba is not installed"):
+        vi = ValueIteration(env, backend="numba")
+
+    assert vi.backend == "numpy"
+    assert np.array_equal(vi.run().utilities, reference[0].utilities)
+
+
+@pytest.mark.parametrize("backend, ordering", [
+    ("object", "gauss_seidel"),
+    ("object", "red_black"),
+    ("numpy", "red_black"),
+    ("sparse", "red_black"),
+])
+def test_ordering_reaches_same_policy(env, optimal, reference, backend, ordering):
+    expected, iterations = reference
+    vi = ValueIteration(env, backend=backend, ordering=ordering)
+    result = vi.run()
+
+    # The returned utilities are those the last sweep started from
+    assert vi.iterations <= iterations
+    assert np.abs(result.utilities - optimal.utilities).max() < EPSILON + vi.converge_threshold
+    assert np.array_equal(result.actions, expected.actions)
+
+
+def test_action_elimination_matches_plain_sweeps(env, reference):
+    expected, iterations = reference
+    vi = ValueIteration(env, action_elimination=True)
+    result = vi.run()
+
+    assert vi.iterations == iterations
+    assert np.array_equal(result.utilities, expected.utilities)
+    assert np.array_equal(result.actions, expected.actions)
+    assert vi.active_action_counts[-1] < vi.active_action_counts[0]
+
+
+@pytest.mark.parametrize("backend", ["object", "numpy"])
+def test_epsilon_sweep_matches_separate_runs(env, backend):
+    vi = ValueIteration(env, backend=backend, epsilons=[0.5, 0.05])
+    vi.run()
+
+    for snapshot in vi.epsilon_snapshots:
+        single = ValueIteration(env, backend=backend, epsilons=[snapshot['epsilon']])
+        result = single.run()
+        assert snapshot['iterations'] == single.iterations
+        assert np.array_equal(snapshot['utilities'].utilities, result.utilities)